@@ -14,36 +14,137 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 login_manager = LoginManager()
-
-# create the app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
-
-# configure the database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///portfolio.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-app.config["UPLOAD_FOLDER"] = "static/uploads"
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
-
-# initialize extensions
-db.init_app(app)
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
 login_manager.login_message = 'Please log in to access this page.'
 
-# Add custom Jinja2 filters
-@app.template_filter('nl2br')
+def load_config(app):
+    """Read the deployment settings from environment variables"""
+    # configure the database; engine options are derived per backend in database.py
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///portfolio.db")
+    app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", 5))
+    app.config["DB_MAX_OVERFLOW"] = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    app.config["SQLITE_MMAP_SIZE"] = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    app.config["UPLOAD_FOLDER"] = "static/uploads"
+    app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
+    app.config["IMAGE_WORKERS"] = int(os.environ.get("IMAGE_WORKERS", 2))
+    # Like counters are buffered in memory and written at most this often (seconds)
+    app.config["LIKE_FLUSH_INTERVAL"] = float(os.environ.get("LIKE_FLUSH_INTERVAL", 1.0))
+    app.config["PROJECTS_PER_PAGE"] = int(os.environ.get("PROJECTS_PER_PAGE", 24))
+    app.config["ADMIN_PROJECTS_PER_PAGE"] = int(os.environ.get("ADMIN_PROJECTS_PER_PAGE", 50))
+    # Server-Sent Events: open streams per worker process and how often counter deltas are pushed.
+    # Each stream holds a gthread request thread, so keep this at most a quarter of gunicorn's --threads
+    app.config["LIVE_MAX_STREAMS"] = int(os.environ.get("LIVE_MAX_STREAMS", 16))
+    app.config["LIVE_COALESCE_INTERVAL"] = float(os.environ.get("LIVE_COALESCE_INTERVAL", 1.0))
+    # Related projects stored per project, refreshed in the background after edits
+    app.config["RELATED_TOP_K"] = int(os.environ.get("RELATED_TOP_K", 3))
+    # Per-project activity is buffered and folded into hourly/daily rollups at most this often (seconds)
+    app.config["ROLLUP_FLUSH_INTERVAL"] = float(os.environ.get("ROLLUP_FLUSH_INTERVAL", 10.0))
+    app.config["ROLLUP_HOURLY_RETENTION_DAYS"] = int(os.environ.get("ROLLUP_HOURLY_RETENTION_DAYS", 14))
+    # Trending on the home page: projects shown and the activity window they are ranked over
+    app.config["TRENDING_LIMIT"] = int(os.environ.get("TRENDING_LIMIT", 3))
+    app.config["TRENDING_WINDOW_HOURS"] = int(os.environ.get("TRENDING_WINDOW_HOURS", 72))
+    app.config["COMMENTS_PER_PAGE"] = int(os.environ.get("COMMENTS_PER_PAGE", 20))
+    # Password hashing runs in a small process pool; profile is fast, standard or strong (see auth.py)
+    app.config["PASSWORD_HASH_PROFILE"] = os.environ.get("PASSWORD_HASH_PROFILE", "standard")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    # Sign-in throttling: memory (per process) or sqlite (shared by the workers on one host)
+    app.config["RATE_LIMIT_BACKEND"] = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+    app.config["LOGIN_LIMIT_PER_IP"] = int(os.environ.get("LOGIN_LIMIT_PER_IP", 20))
+    app.config["LOGIN_LIMIT_PER_EMAIL"] = int(os.environ.get("LOGIN_LIMIT_PER_EMAIL", 5))
+    app.config["LOGIN_LIMIT_PERIOD"] = int(os.environ.get("LOGIN_LIMIT_PERIOD", 300))
+    # Seconds a worker may serve cached About content / session users before re-checking their version stamps
+    app.config["LOCAL_CACHE_CHECK_INTERVAL"] = float(os.environ.get("LOCAL_CACHE_CHECK_INTERVAL", 2.0))
+    app.config["NOTIFICATIONS_PER_PAGE"] = int(os.environ.get("NOTIFICATIONS_PER_PAGE", 50))
+    # Read notifications older than this are deleted in the background (0 keeps them forever)
+    app.config["NOTIFICATION_RETENTION_DAYS"] = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 90))
+    # Flush listing pages to the client while rows are still being fetched
+    app.config["STREAM_LISTINGS"] = os.environ.get("STREAM_LISTINGS", "").lower() in ("1", "true", "yes")
+    # Rendered-page cache for anonymous visitors: "memory", "sqlite" (shared by workers) or "none"
+    app.config["RESPONSE_CACHE_BACKEND"] = os.environ.get("RESPONSE_CACHE_BACKEND", "memory")
+    app.config["RESPONSE_CACHE_TTL"] = int(os.environ.get("RESPONSE_CACHE_TTL", 300))
+    # Browser/CDN freshness for anonymous pages; they revalidate with ETags afterwards
+    app.config["HTTP_CACHE_MAX_AGE"] = int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+    # Rendered project cards, keyed by (id, updated_at, counters)
+    app.config["FRAGMENT_CACHE_ENABLED"] = os.environ.get("FRAGMENT_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+    # SQL/template timing per endpoint, shown on /admin/perf and /metrics
+    app.config["PERF_ENABLED"] = os.environ.get("PERF_ENABLED", "1").lower() in ("1", "true", "yes")
+    app.config["PERF_SLOW_QUERY_MS"] = float(os.environ.get("PERF_SLOW_QUERY_MS", 250))
+    app.config["PERF_METRICS_TOKEN"] = os.environ.get("PERF_METRICS_TOKEN")
+
+def create_app(config=None):
+    """Build the application without touching the database.
+
+    Schema creation and sample data live in `flask init-db` / `flask seed`,
+    so importing the app (gunicorn workers, `--preload`, scripts) only pays
+    for module imports. Background workers start lazily in each process.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
+    load_config(app)
+    if config:
+        app.config.update(config)
+
+    # Imported here so `import app` stays cheap for modules that only need db
+    import conditional
+    import commands
+    import database
+    import tags
+    from auth import password_hasher, rate_limiter
+    from assets import asset_manifest
+    from cache import response_cache
+    from events import outbox_worker
+    from fragments import fragment_cache
+    from images import image_pipeline
+    from likes import like_engine
+    from live import live_hub
+    from local_cache import local_cache
+    from notifications import notification_compactor
+    from perf import perf_monitor
+    from related import related_index
+    from rollups import activity_rollups
+    from routes import bp
+    from stats import site_stats_buffer
+    from storage import upload_url
+
+    # initialize extensions
+    database.init_app(app)
+    login_manager.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    local_cache.init_app(app)
+    response_cache.init_app(app)
+    asset_manifest.init_app(app)
+    conditional.init_app(app)
+    perf_monitor.init_app(app)
+    image_pipeline.init_app(app)
+    outbox_worker.init_app(app)
+    like_engine.init_app(app)
+    site_stats_buffer.init_app(app)
+    activity_rollups.init_app(app)
+    live_hub.init_app(app)
+    notification_compactor.init_app(app)
+    tags.init_app(app)
+    related_index.init_app(app)
+    commands.init_app(app)
+
+    app.register_blueprint(bp)
+    app.add_template_global(upload_url)
+    app.add_template_filter(nl2br_filter, 'nl2br')
+    app.add_template_filter(truncate_words_filter, 'truncate_words')
+    # Last, so precompiling sees every global and filter registered above
+    fragment_cache.init_app(app)
+    return app
+
+# Custom Jinja2 filters
 def nl2br_filter(s):
     """Convert newlines to HTML line breaks"""
     if s is None:
         return s
     return s.replace('\n', '<br>\n')
 
-@app.template_filter('truncate_words')
 def truncate_words_filter(s, length=50, end='...'):
     """Truncate text by word count"""
     if s is None:
@@ -55,130 +156,5 @@ def truncate_words_filter(s, length=50, end='...'):
 
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
-    return User.query.get(int(user_id))
-
-with app.app_context():
-    # Import models to ensure tables are created
-    import models
-    import routes
-    
-    db.create_all()
-    
-    # Create admin user if it doesn't exist
-    admin_user = models.User.query.filter_by(email='admin@portfolio.com').first()
-    if not admin_user:
-        from werkzeug.security import generate_password_hash
-        admin = models.User(
-            username='admin',
-            email='admin@portfolio.com',
-            password_hash=generate_password_hash('admin123'),
-            is_admin=True
-        )
-        db.session.add(admin)
-        
-        # Create default about content
-        default_about = """<h3>Welcome to My Digital Portfolio</h3>
-<p>I'm a passionate software developer with expertise in creating innovative web solutions. With several years of experience in full-stack development, I specialize in building scalable applications using modern technologies.</p>
-
-<h4>Technical Skills</h4>
-<ul>
-<li><strong>Frontend:</strong> HTML5, CSS3, JavaScript, React, Vue.js, Bootstrap</li>
-<li><strong>Backend:</strong> Python (Flask, Django), Node.js, Express</li>
-<li><strong>Databases:</strong> PostgreSQL, MongoDB, SQLite</li>
-<li><strong>Tools & Technologies:</strong> Git, Docker, AWS, Linux</li>
-</ul>
-
-<h4>What I Do</h4>
-<p>I enjoy tackling complex problems and turning ideas into reality through code. My approach combines technical excellence with user-centered design to create applications that are both powerful and intuitive.</p>
-
-<h4>Let's Connect</h4>
-<p>I'm always interested in discussing new opportunities, collaborating on exciting projects, or simply connecting with fellow developers. Feel free to reach out!</p>"""
-
-        about_content = models.About.query.first()
-        if not about_content:
-            about = models.About(content=default_about)
-            db.session.add(about)
-        
-        # Create sample projects for demonstration
-        sample_projects = [
-            {
-                'title': 'E-commerce Platform',
-                'description': 'A full-stack e-commerce solution with user authentication, product management, shopping cart, and payment integration.',
-                'content': '''<h3>Project Overview</h3>
-<p>This comprehensive e-commerce platform was built using modern web technologies to provide a seamless shopping experience for users while offering powerful management tools for administrators.</p>
-
-<h4>Key Features</h4>
-<ul>
-<li>User registration and authentication system</li>
-<li>Product catalog with search and filtering</li>
-<li>Shopping cart and wishlist functionality</li>
-<li>Secure payment processing with Stripe</li>
-<li>Order tracking and history</li>
-<li>Admin dashboard for product and order management</li>
-<li>Responsive design for all devices</li>
-</ul>
-
-<h4>Technical Implementation</h4>
-<p>Built with React.js frontend, Node.js/Express backend, and PostgreSQL database. Implemented JWT authentication, integrated payment APIs, and deployed on AWS with CI/CD pipeline.</p>''',
-                'category': 'web',
-                'tags': 'React, Node.js, PostgreSQL, Stripe, AWS',
-                'is_published': True,
-                'is_featured': True
-            },
-            {
-                'title': 'Task Management Mobile App',
-                'description': 'A cross-platform mobile application for task management with real-time sync, team collaboration, and productivity analytics.',
-                'content': '''<h3>About This Project</h3>
-<p>A comprehensive task management solution designed to help teams and individuals organize their work efficiently with real-time collaboration features.</p>
-
-<h4>Features</h4>
-<ul>
-<li>Create and organize tasks with priorities and due dates</li>
-<li>Team collaboration with shared projects</li>
-<li>Real-time synchronization across devices</li>
-<li>Progress tracking and analytics</li>
-<li>Offline functionality</li>
-<li>Push notifications for deadlines</li>
-</ul>
-
-<h4>Development</h4>
-<p>Developed using React Native for cross-platform compatibility, with Firebase for real-time database and authentication.</p>''',
-                'category': 'mobile',
-                'tags': 'React Native, Firebase, JavaScript, Mobile',
-                'is_published': True,
-                'is_featured': False
-            },
-            {
-                'title': 'Data Analytics Dashboard',
-                'description': 'Interactive dashboard for visualizing business metrics and KPIs with real-time data processing and custom reporting.',
-                'content': '''<h3>Dashboard Overview</h3>
-<p>An advanced analytics platform that transforms raw business data into actionable insights through interactive visualizations and comprehensive reporting.</p>
-
-<h4>Capabilities</h4>
-<ul>
-<li>Real-time data ingestion and processing</li>
-<li>Interactive charts and graphs</li>
-<li>Custom KPI tracking</li>
-<li>Automated report generation</li>
-<li>User role management</li>
-<li>Export functionality</li>
-</ul>
-
-<h4>Technology Stack</h4>
-<p>Built with Python (Flask), D3.js for visualizations, and PostgreSQL for data storage. Implements data pipeline with ETL processes for various data sources.</p>''',
-                'category': 'data',
-                'tags': 'Python, Flask, D3.js, PostgreSQL, Analytics',
-                'is_published': True,
-                'is_featured': True
-            }
-        ]
-        
-        existing_projects = models.Project.query.count()
-        if existing_projects == 0:
-            for project_data in sample_projects:
-                project = models.Project(**project_data)
-                db.session.add(project)
-        
-        db.session.commit()
-        print("Admin user and sample content created: admin@portfolio.com / admin123")
+    from local_cache import load_session_user
+    return load_session_user(user_id)
@@ -0,0 +1,252 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from flask import current_app, url_for
+
+try:
+    import brotli
+except ImportError:  # declared in pyproject.toml; an environment without it only gets gzip variants
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Files under static/ that go through the pipeline
+SOURCE_DIRS = ('css', 'js')
+MANIFEST_NAME = 'manifest.json'
+
+# Encodings we precompress, in order of preference, with their file suffix
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Quoted strings and url() bodies are copied verbatim; comments are dropped
+_CSS_VERBATIM_RE = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|url\([^)]*\)|/\*.*?\*/''', re.S | re.I)
+_CSS_PLACEHOLDER_RE = re.compile(r'\x00(\d+)\x00')
+
+def minify_css(source):
+    """Drop comments and redundant whitespace; selectors, values and strings are untouched"""
+    kept = []
+
+    def set_aside(match):
+        if match.group(0).startswith('/*'):
+            return ''
+        kept.append(match.group(0))
+        return f'\x00{len(kept) - 1}\x00'
+
+    source = _CSS_VERBATIM_RE.sub(set_aside, source)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    source = source.replace(';}', '}').strip()
+    return _CSS_PLACEHOLDER_RE.sub(lambda match: kept[int(match.group(1))], source)
+
+# Keywords after which a '/' starts a regex literal rather than a division
+REGEX_KEYWORDS = frozenset('return typeof case in of void delete throw new instanceof do else yield await'.split())
+# Punctuation after which a '/' starts a regex literal
+REGEX_PUNCTUATION = frozenset('(,=:[!&|?{};+-*%<>~^')
+
+def minify_js(source):
+    """Whitespace-only minification: comments, indentation and blank lines go.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly
+    as before, and string, template and regex literals are copied as-is.
+    A '/' starts a regex where an expression may begin (after an operator,
+    an opening bracket or a keyword such as `return`) and is a division
+    after a value.
+    """
+    out = []
+    i, n = 0, len(source)
+    regex_allowed = True
+    while i < n:
+        char = source[i]
+        if char in '\'"`':
+            end = _literal_end(source, i)
+            out.append(source[i:end])
+            i, regex_allowed = end, False
+        elif source.startswith('//', i):
+            i = source.find('\n', i)
+            i = n if i == -1 else i
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif char == '/' and regex_allowed:
+            end = _regex_end(source, i)
+            out.append(source[i:end])
+            i, regex_allowed = end, False
+        elif char.isalnum() or char in '_$':
+            end = i + 1
+            while end < n and (source[end].isalnum() or source[end] in '_$'):
+                end += 1
+            word = source[i:end]
+            out.append(word)
+            i, regex_allowed = end, word in REGEX_KEYWORDS
+        elif char == '\n':
+            while out and out[-1] in (' ', '\t'):
+                out.pop()
+            if out and out[-1] != '\n':
+                out.append('\n')
+            i += 1
+            while i < n and source[i] in ' \t':
+                i += 1
+        else:
+            out.append(char)
+            if not char.isspace():
+                regex_allowed = char in REGEX_PUNCTUATION
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+def _literal_end(source, i):
+    """Index just past the string or template literal opening at source[i]"""
+    quote, n = source[i], len(source)
+    i += 1
+    while i < n and source[i] != quote:
+        if source[i] == '\\':
+            i += 2
+        elif quote == '`' and source.startswith('${', i):
+            i = _substitution_end(source, i + 2)
+        else:
+            i += 1
+    return min(i + 1, n)
+
+def _substitution_end(source, i):
+    """Index just past the '}' closing a template `${` substitution that starts at source[i]"""
+    depth, n = 1, len(source)
+    while i < n:
+        char = source[i]
+        if char in '\'"`':
+            i = _literal_end(source, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if not depth:
+                return i + 1
+        i += 1
+    return n
+
+def _regex_end(source, i):
+    """Index just past the regex literal opening at source[i], flags included"""
+    n = len(source)
+    in_class = False
+    i += 1
+    while i < n and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < n and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return i
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+def build_assets(static_folder, output_dir):
+    """Minify, fingerprint and precompress static CSS/JS; returns the manifest.
+
+    Writes <output_dir>/<dir>/<name>.<hash><ext> plus .br and .gz
+    siblings (.gz only if brotli is missing), and <output_dir>/manifest.json mapping
+    each source path (e.g. "css/style.css") to its fingerprinted path.
+    """
+    manifest = {}
+    for directory in SOURCE_DIRS:
+        source_dir = os.path.join(static_folder, directory)
+        if not os.path.isdir(source_dir):
+            continue
+        for name in sorted(os.listdir(source_dir)):
+            stem, ext = os.path.splitext(name)
+            minify = MINIFIERS.get(ext)
+            if minify is None or '.min' in stem:
+                continue
+            with open(os.path.join(source_dir, name), encoding='utf-8') as handle:
+                data = minify(handle.read()).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            target = f'{directory}/{stem}.{digest}{ext}'
+            _write_variants(os.path.join(output_dir, target), data)
+            manifest[f'{directory}/{name}'] = target
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+def _write_variants(path, data):
+    # Fingerprinted names never change content, so existing files are reused
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    variants = [(path, data), (path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((path + '.br', brotli.compress(data, quality=11)))
+    for target, content in variants:
+        with open(target + '.tmp', 'wb') as handle:
+            handle.write(content)
+        os.replace(target + '.tmp', target)
+
+class AssetManifest:
+    """Resolves static paths to fingerprinted build outputs for templates"""
+
+    def __init__(self, app=None):
+        self.entries = {}
+        self.output_dir = None
+        self._files = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_OUTPUT_DIR', os.path.join(app.static_folder, 'dist'))
+        app.extensions['assets'] = self
+        self.output_dir = app.config['ASSETS_OUTPUT_DIR']
+        self.load()
+        app.add_template_global(self.asset_url)
+
+    def load(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_NAME)) as handle:
+                self.entries = json.load(handle)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._files = set(self.entries.values())
+        return self.entries
+
+    def asset_url(self, filename):
+        """Fingerprinted URL for a static file, or the plain static URL before a build"""
+        built = self.entries.get(filename)
+        if built is None:
+            return url_for('static', filename=filename)
+        return url_for('main.asset', filename=built)
+
+    def resolve(self, filename, accept_encodings):
+        """(path, content encoding) of the best variant of a built file, or None.
+
+        Only files listed in the manifest are served, so the route cannot
+        be used to read anything else from the output directory.
+        """
+        if filename not in self._files:
+            return None
+        path = os.path.join(self.output_dir, filename)
+        for encoding, suffix in ENCODINGS:
+            if accept_encodings[encoding] and os.path.exists(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+def rebuild(app=None):
+    """Build into the configured output directory and reload the manifest"""
+    app = app or current_app
+    manifest = build_assets(app.static_folder, app.config['ASSETS_OUTPUT_DIR'])
+    asset_manifest.load()
+    logger.info('Built %d static assets', len(manifest))
+    return manifest
+
+asset_manifest = AssetManifest()
@@ -0,0 +1,253 @@
+import logging
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Named cost profiles; PASSWORD_HASH_METHOD overrides the profile with any werkzeug method string
+HASH_PROFILES = {
+    'fast': 'pbkdf2:sha256:100000',      # tests, benchmarks, very small hosts
+    'standard': 'scrypt:32768:8:1',      # werkzeug's default
+    'strong': 'scrypt:65536:8:1',
+}
+
+class HashingUnavailable(Exception):
+    """Raised when the hashing pool is saturated; the caller should ask the client to retry"""
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool.
+
+    scrypt/pbkdf2 are CPU-bound; in a separate process they don't hold the
+    GIL, so the worker's other threads keep serving pages. At most
+    PASSWORD_HASH_MAX_PENDING jobs are queued per worker process; beyond
+    that HashingUnavailable is raised instead of piling up requests.
+    The pool is created lazily per process, like the image pipeline's.
+    Workers are spawned, so scripts that hash passwords need an
+    ``if __name__ == '__main__'`` guard or PASSWORD_HASH_WORKERS = 0.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self.method = HASH_PROFILES['standard']
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_PROFILE', 'standard')
+        app.config.setdefault('PASSWORD_HASH_METHOD', None)
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 8)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10)
+        app.extensions['password_hasher'] = self
+        self.method = app.config['PASSWORD_HASH_METHOD'] or HASH_PROFILES[app.config['PASSWORD_HASH_PROFILE']]
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING'])
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """(matches, needs_rehash): needs_rehash is True when pwhash uses other parameters"""
+        if not pwhash:
+            return False, False
+        matches = self._run(_verify, pwhash, password)
+        return matches, matches and pwhash.split('$', 1)[0] != self.method
+
+    def _run(self, function, *args):
+        config = current_app.config
+        if not config['PASSWORD_HASH_WORKERS']:
+            return function(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailable()
+        try:
+            future = self._get_executor(config['PASSWORD_HASH_WORKERS']).submit(function, *args)
+            return future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+        except FutureTimeout:
+            raise HashingUnavailable()
+        except BrokenProcessPool:
+            # A pool process died (killed, or an unguarded __main__ script); start a fresh pool next time
+            logger.exception('Password hashing pool broke')
+            with self._lock:
+                self._executor = None
+            raise HashingUnavailable()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self, workers):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn: forking a threaded server process can copy held locks into the child
+                self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                self._pid = os.getpid()
+            return self._executor
+
+class MemoryRateLimitBackend:
+    """Per-process counters: key -> {window index: hits}.
+
+    Keys whose windows have both ended are swept out at most once a
+    minute, and past max_keys the least recently hit keys are evicted, so
+    a flood of random emails or addresses can't grow memory without bound.
+    """
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()  # key -> (expires_at, counts), least recently hit first
+        self._swept_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def hit(self, key, window, increment, period):
+        with self._lock:
+            entry = self._windows.pop(key, None)
+            counts = entry[1] if entry is not None else {}
+            for old in [index for index in counts if index < window - 1]:
+                del counts[old]
+            counts[window] = counts.get(window, 0) + increment
+            # Once the next window has ended too, neither counter matters any more
+            self._windows[key] = ((window + 2) * period, counts)
+            result = counts.get(window - 1, 0), counts[window]
+            self._evict()
+            return result
+
+    def _evict(self):
+        if time.monotonic() - self._swept_at >= self.SWEEP_INTERVAL:
+            now = time.time()
+            for key in [key for key, (expires_at, _) in self._windows.items() if expires_at <= now]:
+                del self._windows[key]
+            self._swept_at = time.monotonic()
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+
+    def __len__(self):
+        return len(self._windows)
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+class SQLiteRateLimitBackend:
+    """File-backed counters shared by every worker process on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit (
+                    key TEXT NOT NULL, window INTEGER NOT NULL, hits INTEGER NOT NULL,
+                    PRIMARY KEY (key, window)) WITHOUT ROWID""")
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def hit(self, key, window, increment, period):
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            if increment:
+                connection.execute('INSERT INTO rate_limit (key, window, hits) VALUES (?, ?, ?) '
+                                   'ON CONFLICT (key, window) DO UPDATE SET hits = hits + excluded.hits',
+                                   (key, window, increment))
+            rows = dict(connection.execute('SELECT window, hits FROM rate_limit WHERE key = ? AND window >= ?',
+                                           (key, window - 1)).fetchall())
+            connection.execute('DELETE FROM rate_limit WHERE key = ? AND window < ?', (key, window - 1))
+        return rows.get(window - 1, 0), rows.get(window, 0)
+
+    def clear(self):
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM rate_limit')
+
+class RateLimiter:
+    """Sliding-window rate limiting with two fixed windows per key.
+
+    The estimate is this window's hits plus the previous window's hits
+    weighted by how much of it still overlaps the sliding window, which
+    needs two counters per key instead of a log of timestamps.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATE_LIMIT_BACKEND', 'memory')
+        app.config.setdefault('RATE_LIMIT_MAX_KEYS', 100000)
+        app.config.setdefault('RATE_LIMIT_PATH', os.path.join(app.instance_path, 'rate_limit.sqlite'))
+        app.config.setdefault('LOGIN_LIMIT_PER_IP', 20)
+        app.config.setdefault('LOGIN_LIMIT_PER_EMAIL', 5)
+        app.config.setdefault('LOGIN_LIMIT_PERIOD', 300)
+        app.extensions['rate_limiter'] = self
+        kind = app.config['RATE_LIMIT_BACKEND']
+        if kind == 'sqlite':
+            self.backend = SQLiteRateLimitBackend(app.config['RATE_LIMIT_PATH'])
+        elif kind == 'memory':
+            self.backend = MemoryRateLimitBackend(app.config['RATE_LIMIT_MAX_KEYS'])
+        else:
+            self.backend = None
+
+    def hit(self, key, limit, period):
+        """Count one attempt; returns 0 if allowed, else seconds until the client may retry.
+
+        The attempt is counted and the counters read back in one backend
+        call, so concurrent attempts can't all pass the check before any
+        of them is counted. Rejected attempts are taken back out again, so
+        a client that backs off gets through once the window slides past
+        its earlier attempts.
+        """
+        if self.backend is None or not limit:
+            return 0
+        now = time.time()
+        window = int(now // period)
+        overlap = 1 - (now % period) / period
+        previous, current = self.backend.hit(key, window, 1, period)
+        # Hits before this one
+        current -= 1
+        if previous * overlap + current >= limit:
+            self.backend.hit(key, window, -1, period)
+            self.rejected += 1
+            if current >= limit:
+                # Blocked at least until this window ends and its hits start fading out
+                return math.ceil(period - now % period)
+            # The previous window's share fades linearly; wait until it drops below the remaining headroom
+            return max(1, math.ceil((overlap - (limit - current) / previous) * period))
+        return 0
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+def throttle_login(ip, email):
+    """Seconds the client has to wait before another sign-in attempt, or 0"""
+    config = current_app.config
+    period = config['LOGIN_LIMIT_PERIOD']
+    # The per-IP limit is checked first so a blocked client doesn't use up the account's allowance
+    return (rate_limiter.hit(f'login-ip:{ip}', config['LOGIN_LIMIT_PER_IP'], period)
+            or rate_limiter.hit(f'login-email:{(email or "").strip().lower()}', config['LOGIN_LIMIT_PER_EMAIL'], period))
+
+password_hasher = PasswordHasher()
+rate_limiter = RateLimiter()
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+class PeriodicWorker:
+    """Daemon thread that calls run_once() every interval seconds.
+
+    The thread is started lazily with ensure_started() and restarted in a
+    forked child, so every gunicorn worker gets its own. run_once() runs
+    inside an app context and returns True when more work is already
+    waiting, in which case it is called again without sleeping.
+    """
+
+    name = 'periodic-worker'
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.app = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def ensure_started(self, app):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self.app = app
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._stopping.is_set():
+            more = False
+            try:
+                with self.app.app_context():
+                    more = self.run_once()
+            except Exception:
+                logger.exception('%s iteration failed', self.name)
+            if not more:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
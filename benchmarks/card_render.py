@@ -0,0 +1,110 @@
+"""Card-heavy pages with and without the project card fragment cache, plus template compile cost.
+
+Usage: python benchmarks/card_render.py [--projects 300] [--requests 200]
+Seeds a throwaway SQLite database with tagged projects, then requests
+/, /projects and /admin/projects (as admin) with the response cache off,
+first rendering every card from its macro and then from the fragment
+cache (warmed by one request). Also times compiling all templates from
+source vs. loading them from the Jinja bytecode cache. Prints mean and
+p95 milliseconds per page as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+WORDS = 'python flask react django postgres redis docker api dashboard mobile search realtime'.split()
+
+def timed(client, path, requests):
+    durations = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        durations.append(time.perf_counter() - started)
+        assert response.status_code == 200, (path, response.status_code)
+    durations.sort()
+    return {'mean_ms': round(1000 * sum(durations) / len(durations), 2),
+            'p95_ms': round(1000 * durations[int(0.95 * (len(durations) - 1))], 2)}
+
+def compile_times(app):
+    from jinja2 import FileSystemBytecodeCache
+    from fragments import precompile_templates
+    cache_dir = tempfile.mkdtemp(prefix='jinja-bench-')
+    results = {}
+    for label in ('from_source', 'from_bytecode'):
+        # Same filters and globals, but an empty in-memory template cache
+        env = app.jinja_env.overlay(bytecode_cache=FileSystemBytecodeCache(cache_dir))
+        env.cache.clear()
+        started = time.perf_counter()
+        count = precompile_templates(env)
+        results[label + '_ms'] = round(1000 * (time.perf_counter() - started), 2)
+    results['templates'] = count
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=300)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='card-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from schema import init_db
+    from cache import MemoryCacheBackend
+    from fragments import fragment_cache
+    from models import Project, User
+    from tags import backfill_tags
+    app = create_app({'WTF_CSRF_ENABLED': False, 'PERF_ENABLED': False})
+    with app.app_context():
+        init_db()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rng = random.Random(7)
+    with app.app_context():
+        db.session.execute(db.insert(Project), [{
+            'title': ' '.join(rng.sample(WORDS, 3)).title(),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(40)),
+            'content': 'benchmark',
+            'category': 'web',
+            'tags': ', '.join(rng.sample(WORDS, 4)),
+            'is_published': True,
+            'is_featured': i % 50 == 0,
+            'demo_url': 'https://example.com',
+            'github_url': 'https://github.com/example/example',
+        } for i in range(args.projects)])
+        admin = User(username='bench-admin', email='admin@example.com', is_admin=True)
+        admin.set_password('bench')
+        db.session.add(admin)
+        db.session.commit()
+        backfill_tags()
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'admin@example.com', 'password': 'bench'})
+    anonymous = app.test_client()
+    pages = {'/': anonymous, '/projects': anonymous, '/admin/projects': client}
+
+    report = {'projects': args.projects, 'requests': args.requests, 'pages': {}}
+    cache_backend = fragment_cache.backend or MemoryCacheBackend(4096)
+    for label, backend in (('uncached', None), ('fragment_cache', cache_backend)):
+        fragment_cache.backend = backend
+        for path, page_client in pages.items():
+            page_client.get(path)
+            report['pages'].setdefault(path, {})[label] = timed(page_client, path, args.requests)
+    for results in report['pages'].values():
+        results['speedup'] = round(results['uncached']['mean_ms'] / results['fragment_cache']['mean_ms'], 2)
+    report['fragment_cache'] = {'hits': fragment_cache.hits, 'misses': fragment_cache.misses}
+    report['template_compile'] = compile_times(app)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Concurrent read/write throughput on SQLite: default journal vs. tuned engine settings.
+
+Usage: python benchmarks/db_concurrency.py [--readers 4] [--writers 2] [--seconds 5]
+           [--projects 500] [--comments 5000]
+Seeds one throwaway database per profile, then runs --readers and
+--writers worker processes (like gunicorn workers) against it for
+--seconds. Readers load a page of published projects and the comments
+of a random project; writers add a comment and commit, which also
+updates the project counter (the site totals are flushed in batches). "default" is the rollback
+journal with synchronous=FULL and no mmap; "tuned" is what database.py
+configures (WAL, synchronous=NORMAL, busy_timeout, mmap_size).
+Prints operations/second and lock errors per profile as JSON.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'default': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_MMAP_SIZE': 0},
+    'tuned': {},
+}
+
+def make_app(db_path, profile):
+    sys.path.insert(0, ROOT)
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    from app import create_app
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'PERF_ENABLED': False}
+    config.update(PROFILES[profile])
+    app = create_app(config)
+    logging.getLogger().setLevel(logging.WARNING)
+    return app
+
+def seed(db_path, profile, args):
+    from app import db
+    from schema import init_db
+    from models import Comment, Project, User
+    app = make_app(db_path, profile)
+    with app.app_context():
+        init_db()
+        db.session.execute(db.insert(User), [
+            {'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'x'} for i in range(50)
+        ])
+        db.session.execute(db.insert(Project), [
+            {'title': f'Project {i}', 'description': 'benchmark', 'content': 'benchmark ' * 50,
+             'category': 'web', 'is_published': i % 10 != 0, 'is_featured': i % 20 == 0}
+            for i in range(args.projects)
+        ])
+        user_ids = db.session.execute(db.select(User.id)).scalars().all()
+        project_ids = db.session.execute(db.select(Project.id)).scalars().all()
+        rng = random.Random(0)
+        db.session.execute(db.insert(Comment), [
+            {'content': 'seed comment', 'user_id': rng.choice(user_ids), 'project_id': rng.choice(project_ids)}
+            for _ in range(args.comments)
+        ])
+        db.session.commit()
+        Project.reconcile_counters()
+
+def worker(db_path, profile, role, seconds, start, results):
+    from sqlalchemy.exc import OperationalError
+    from app import db
+    from models import Comment, Project, User
+    app = make_app(db_path, profile)
+    rng = random.Random(os.getpid())
+    ops = errors = 0
+    with app.app_context():
+        project_ids = db.session.execute(db.select(Project.id)).scalars().all()
+        user_ids = db.session.execute(db.select(User.id)).scalars().all()
+        db.session.rollback()
+        start.wait()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            try:
+                if role == 'reader':
+                    Project.query.filter_by(is_published=True).order_by(Project.created_at.desc()).limit(24).all()
+                    (Comment.query.filter_by(project_id=rng.choice(project_ids))
+                     .order_by(Comment.created_at.desc()).limit(20).all())
+                    db.session.rollback()
+                else:
+                    db.session.add(Comment(content='benchmark comment', user_id=rng.choice(user_ids),
+                                           project_id=rng.choice(project_ids)))
+                    db.session.commit()
+                ops += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put((role, ops, errors))
+
+def run(profile, args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix='db-concurrency-'), 'bench.db')
+    seed(db_path, profile, args)
+
+    context = multiprocessing.get_context('spawn')
+    start = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(db_path, profile, role, args.seconds, start, results))
+                 for role in ['reader'] * args.readers + ['writer'] * args.writers]
+    for process in processes:
+        process.start()
+    # Give every worker time to import and connect before the clock starts
+    time.sleep(3)
+    start.set()
+    totals = {'reader': [0, 0], 'writer': [0, 0]}
+    for _ in processes:
+        role, ops, errors = results.get()
+        totals[role][0] += ops
+        totals[role][1] += errors
+    for process in processes:
+        process.join()
+    return {
+        'reads_per_second': round(totals['reader'][0] / args.seconds, 1),
+        'writes_per_second': round(totals['writer'][0] / args.seconds, 1),
+        'read_errors': totals['reader'][1],
+        'write_errors': totals['writer'][1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    report = {'readers': args.readers, 'writers': args.writers, 'seconds': args.seconds}
+    for profile in args.profiles:
+        report[profile] = run(profile, args)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Query count of the project page: checks read_models.PROJECT_DETAIL_QUERY_BUDGET.
+
+Usage: python benchmarks/detail_queries.py [--comments 200]
+Seeds a throwaway SQLite database with one project commented on by many
+distinct users, renders /project/<id> as an anonymous visitor and as a
+logged-in user (response cache disabled), and counts the SQL statements
+issued from load_project_detail() until the template has rendered, so
+session and conditional-GET lookups are left out. Prints the counts as JSON and exits with
+status 1 if either exceeds the budget. tests/test_project_detail.py
+asserts the same budget under pytest.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--comments', type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='detail-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'null'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from flask import template_rendered
+    from sqlalchemy import event
+    import routes
+    from app import create_app, db
+    from schema import init_db
+    from models import Comment, Project, User
+    from read_models import PROJECT_DETAIL_QUERY_BUDGET
+    app = create_app()
+    with app.app_context():
+        init_db()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        project = Project(title='Popular', description='Benchmark target', is_published=True, category='web', tags='Python, Flask')
+        db.session.add(project)
+        db.session.flush()
+        db.session.execute(db.insert(User), [
+            {'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'x'}
+            for i in range(args.comments)
+        ])
+        user_ids = db.session.execute(db.select(User.id).where(User.username.like('bench%'))).scalars().all()
+        for user_id in user_ids:
+            db.session.add(Comment(content='Nice work', user_id=user_id, project_id=project.id))
+        db.session.commit()
+        project_id = project.id
+        viewer = db.session.get(User, user_ids[0])
+        viewer.set_password('bench')
+        db.session.commit()
+
+    statements = []
+    counting = {'thread': None}
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        # Only the request's own statements; background workers share the engine
+        if counting['thread'] == threading.get_ident():
+            statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count)
+
+    load_project_detail = routes.load_project_detail
+
+    def counted_load(*args, **kwargs):
+        counting['thread'] = threading.get_ident()
+        return load_project_detail(*args, **kwargs)
+
+    def _stop_counting(sender, template, context, **extra):
+        counting['thread'] = None
+
+    routes.load_project_detail = counted_load
+    template_rendered.connect(_stop_counting, app)
+
+    def measure(client):
+        statements.clear()
+        response = client.get(f'/project/{project_id}')
+        assert response.status_code == 200, response.status_code
+        return len(statements)
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    anonymous = app.test_client()
+    logged_in = app.test_client()
+    logged_in.post('/login', data={'email': 'bench0@example.com', 'password': 'bench'})
+
+    report = {'budget': PROJECT_DETAIL_QUERY_BUDGET, 'comments': args.comments,
+              'anonymous': measure(anonymous), 'logged_in': measure(logged_in)}
+    print(json.dumps(report, indent=2))
+    if max(report['anonymous'], report['logged_in']) > PROJECT_DETAIL_QUERY_BUDGET:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
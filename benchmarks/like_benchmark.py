@@ -0,0 +1,101 @@
+"""Like throughput under concurrent clicks: ORM toggle vs. coalescing LikeEngine.
+
+Usage: python benchmarks/like_benchmark.py [--users 300] [--threads 8] [--clicks 4000]
+Seeds a throwaway SQLite database with one popular project and many users,
+then has --threads workers toggle likes on it. The "orm" path is the old
+request body (SELECT the Like, add/delete it, commit, re-count); "engine"
+is like_engine.toggle() plus commit with counters flushed in batches.
+Prints toggles/second and the final like_count check as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--clicks', type=int, default=4000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='like-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from schema import init_db
+    from likes import like_engine
+    from models import Like, Project, User
+    app = create_app()
+    with app.app_context():
+        init_db()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        db.session.execute(db.insert(User), [
+            {'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'x'}
+            for i in range(args.users)
+        ])
+        project = Project(title='Popular', description='Benchmark target', is_published=True)
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+        user_ids = [user_id for (user_id,) in db.session.execute(db.select(User.id).where(User.username.like('bench%')))]
+
+    def orm_toggle(user_id):
+        existing = Like.query.filter_by(user_id=user_id, project_id=project_id).first()
+        if existing:
+            db.session.delete(existing)
+        else:
+            db.session.add(Like(user_id=user_id, project_id=project_id))
+        db.session.commit()
+        return Like.query.filter_by(project_id=project_id).count()
+
+    def engine_toggle(user_id):
+        like_engine.toggle(user_id, project_id)
+        db.session.commit()
+
+    def run(toggle):
+        per_thread = args.clicks // args.threads
+        errors = []
+
+        def worker(offset):
+            with app.app_context():
+                for i in range(per_thread):
+                    try:
+                        toggle(user_ids[(offset + i * args.threads) % len(user_ids)])
+                    except Exception as exc:
+                        db.session.rollback()
+                        errors.append(repr(exc))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            like_engine.flush()
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            stored = db.session.get(Project, project_id).like_count
+            actual = Like.query.filter_by(project_id=project_id).count()
+            db.session.execute(db.delete(Like))
+            db.session.execute(db.update(Project).values(like_count=0))
+            db.session.commit()
+        toggles = per_thread * args.threads
+        return {'seconds': round(elapsed, 3), 'toggles_per_second': round(toggles / elapsed),
+                'errors': len(errors), 'like_count': stored, 'likes': actual}
+
+    report = {'threads': args.threads, 'clicks': args.clicks,
+              'orm': run(orm_toggle), 'engine': run(engine_toggle)}
+    report['engine']['counter_flushes'] = like_engine.flushes
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Load test of the main public and admin routes against a seeded database.
+
+Usage: python benchmarks/load_test.py [--users 500] [--projects 2000] [--comments 20000]
+           [--likes 50000] [--notifications 10000] [--requests 200] [--concurrency 4]
+           [--db PATH] [--seed-only] [--base-url URL] [--output FILE] [--baseline FILE]
+
+Seeds a SQLite database (a throwaway one unless --db names a file; an
+existing --db file is reused as-is) with bulk inserts, then drives
+/, /projects?search=, /project/<id>, /like_project/<id> and /admin and
+prints per-scenario p50/p95/p99 latency, requests/second and SQL queries
+per request as JSON.
+
+Requests go through app.test_client() by default, with the response
+cache off so every request does its real work. To measure a real
+server instead, seed with --db PATH --seed-only, start it with
+DATABASE_URL=sqlite:///PATH (e.g. gunicorn main:app), then rerun with
+--db PATH --base-url http://127.0.0.1:8000; queries per request are only
+available in-process. --baseline compares against a previous --output
+file and exits with status 1 when a scenario's p95 or queries per
+request regressed by more than --tolerance.
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+WORDS = ('python flask react vue django postgres sqlite redis docker kubernetes aws gcp '
+         'analytics dashboard mobile commerce payments search realtime chat streaming '
+         'machine learning vision pipeline api graphql rest auth portfolio game engine').split()
+CATEGORIES = ('web', 'mobile', 'desktop', 'data', 'ai', 'other')
+PASSWORD = 'load-test'
+
+# scenario -> (endpoint name used by the perf monitor, needs a logged-in user)
+SCENARIOS = {
+    'home': ('main.index', None),
+    'search': ('main.projects', None),
+    'project_detail': ('main.project_detail', None),
+    'like': ('main.like_project', 'user'),
+    'admin_dashboard': ('main.admin_dashboard', 'admin'),
+}
+
+def seed(db, models, args, rng):
+    from werkzeug.security import generate_password_hash
+    from stats import rebuild_site_stats
+    from tags import backfill_tags
+
+    password_hash = generate_password_hash(PASSWORD)
+    db.session.execute(db.insert(models.User), [
+        {'username': f'load{i}', 'email': f'load{i}@example.com', 'password_hash': password_hash, 'is_admin': i == 0}
+        for i in range(args.users)
+    ])
+    user_ids = db.session.execute(db.select(models.User.id).where(models.User.username.like('load%'))).scalars().all()
+
+    def sentence(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+    db.session.execute(db.insert(models.Project), [{
+        'title': sentence(3).title(),
+        'description': sentence(20),
+        'content': sentence(120),
+        'category': rng.choice(CATEGORIES),
+        'tags': ', '.join(rng.sample(WORDS, 4)),
+        'is_published': rng.random() < 0.9,
+        'is_featured': rng.random() < 0.05,
+    } for _ in range(args.projects)])
+    project_ids = db.session.execute(db.select(models.Project.id)).scalars().all()
+
+    db.session.execute(db.insert(models.Comment), [
+        {'content': sentence(15), 'user_id': rng.choice(user_ids), 'project_id': rng.choice(project_ids)}
+        for _ in range(args.comments)
+    ])
+    pairs = set()
+    while len(pairs) < min(args.likes, len(user_ids) * len(project_ids)):
+        pairs.add((rng.choice(user_ids), rng.choice(project_ids)))
+    db.session.execute(db.insert(models.Like), [{'user_id': u, 'project_id': p} for u, p in pairs])
+    db.session.execute(db.insert(models.Notification), [
+        {'title': 'New Like', 'message': sentence(6), 'is_read': rng.random() < 0.7, 'project_id': rng.choice(project_ids)}
+        for _ in range(args.notifications)
+    ])
+    db.session.commit()
+
+    # Bulk inserts bypass the mapper events, so rebuild what they maintain
+    models.Project.reconcile_counters()
+    backfill_tags()
+    rebuild_site_stats()
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class TestClientDriver:
+    """Issues requests in-process through Flask's test client"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self, email=None):
+        client = self.app.test_client()
+        if email:
+            client.post('/login', data={'email': email, 'password': PASSWORD})
+        return lambda method, path: getattr(client, method)(path).status_code
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Report redirects (e.g. to /login) like the test client does instead of following them
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class HTTPDriver:
+    """Issues requests to a running server over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def session(self, email=None):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect)
+
+        def send(method, path, data=None):
+            body = urllib.parse.urlencode(data).encode() if data is not None else (b'' if method == 'post' else None)
+            request = urllib.request.Request(self.base_url + path, data=body, method=method.upper())
+            try:
+                with opener.open(request) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as exc:
+                return exc.code
+
+        if email:
+            with opener.open(self.base_url + '/login') as response:
+                page = response.read().decode()
+            token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', page)
+            send('post', '/login', {'email': email, 'password': PASSWORD, 'csrf_token': token.group(1) if token else ''})
+        return lambda method, path: send(method, path)
+
+def run_scenario(driver, paths, method, email, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    chunks = [paths[n::concurrency] for n in range(concurrency)]
+
+    def worker(chunk):
+        send = driver.session(email)
+        local = []
+        for path in chunk:
+            started = time.perf_counter()
+            status = send(method, path)
+            local.append(time.perf_counter() - started)
+            # Every scenario expects a 200; a redirect means a lost login or a hidden project
+            if status >= 300:
+                errors.append(status)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks if chunk]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(1000 * percentile(latencies, 0.50), 2),
+        'p95_ms': round(1000 * percentile(latencies, 0.95), 2),
+        'p99_ms': round(1000 * percentile(latencies, 0.99), 2),
+        'mean_ms': round(1000 * sum(latencies) / len(latencies), 2),
+    }
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for metric in ('p95_ms', 'queries_per_request'):
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f'{name}.{metric}: {old} -> {new}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--projects', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=20_000)
+    parser.add_argument('--likes', type=int, default=50_000)
+    parser.add_argument('--notifications', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db')
+    parser.add_argument('--seed-only', action='store_true')
+    parser.add_argument('--base-url')
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(tempfile.mkdtemp(prefix='load-test-'), 'bench.db')
+    needs_seed = not os.path.exists(db_path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'none')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from schema import init_db
+    import models
+    from perf import perf_monitor
+    app = create_app()
+    with app.app_context():
+        init_db()
+    logging.getLogger().setLevel(logging.WARNING)
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    rng = random.Random(args.seed)
+    report = {'database': db_path, 'target': args.base_url or 'test_client', 'concurrency': args.concurrency}
+    with app.app_context():
+        if needs_seed:
+            started = time.perf_counter()
+            seed(db, models, args, rng)
+            report['seed_seconds'] = round(time.perf_counter() - started, 2)
+        if args.seed_only:
+            print(json.dumps(report, indent=2))
+            return
+        published = db.session.execute(
+            db.select(models.Project.id).where(models.Project.is_published.is_(True))
+        ).scalars().all()
+        report['rows'] = {model.__tablename__: db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+                          for model in (models.User, models.Project, models.Comment, models.Like, models.Notification)}
+        admin_email = db.session.execute(
+            db.select(models.User.email).where(models.User.is_admin.is_(True)).order_by(models.User.id.desc())
+        ).scalars().first()
+
+    user_email = 'load1@example.com'
+    paths = {
+        'home': ('get', ['/'] * args.requests, None),
+        'search': ('get', [f'/projects?search={rng.choice(WORDS)}' for _ in range(args.requests)], None),
+        'project_detail': ('get', [f'/project/{rng.choice(published)}' for _ in range(args.requests)], None),
+        'like': ('post', [f'/like_project/{rng.choice(published)}' for _ in range(args.requests)], user_email),
+        'admin_dashboard': ('get', ['/admin'] * args.requests, admin_email),
+    }
+    driver = HTTPDriver(args.base_url) if args.base_url else TestClientDriver(app)
+
+    def totals(endpoint):
+        stats = perf_monitor.endpoints.get(endpoint)
+        return (stats.requests, stats.queries) if stats else (0, 0)
+
+    report['scenarios'] = {}
+    for name in args.scenarios:
+        method, scenario_paths, email = paths[name]
+        if SCENARIOS[name][1] == 'admin' and email is None:
+            continue
+        endpoint = SCENARIOS[name][0]
+        before = totals(endpoint)
+        result = run_scenario(driver, scenario_paths, method, email, args.concurrency)
+        after = totals(endpoint)
+        if not args.base_url and after[0] > before[0]:
+            result['queries_per_request'] = round((after[1] - before[1]) / (after[0] - before[0]), 2)
+        else:
+            result['queries_per_request'] = None
+        report['scenarios'][name] = result
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        if regressions:
+            print('Regressions: ' + '; '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
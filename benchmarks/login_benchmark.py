@@ -0,0 +1,112 @@
+"""Page latency while a burst of sign-ins is being hashed, inline vs. in the hashing pool.
+
+Usage: python benchmarks/login_benchmark.py [--logins 40] [--login-threads 8] [--page-threads 4]
+Seeds a throwaway SQLite database, then runs page readers (GET /about)
+alongside threads posting correct passwords to /login, once with
+PASSWORD_HASH_WORKERS = 0 (hashing on the request thread, holding the
+GIL) and once with the process pool. Login throttling is disabled for the
+burst. Prints page p50/p95 milliseconds and sign-ins per second as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+def percentile(durations, fraction):
+    durations = sorted(durations)
+    return round(1000 * durations[int(fraction * (len(durations) - 1))], 2)
+
+def run(profile, workers, args):
+    from app import create_app, db
+    from schema import init_db
+    from auth import password_hasher
+    from models import User
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='login-bench-'), 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'WTF_CSRF_ENABLED': False,
+        'PERF_ENABLED': False,
+        'RESPONSE_CACHE_BACKEND': 'none',
+        'PASSWORD_HASH_PROFILE': profile,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_PENDING': args.login_threads,
+        'LOGIN_LIMIT_PER_IP': 0,
+        'LOGIN_LIMIT_PER_EMAIL': 0,
+    })
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        init_db()
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('bench-password')
+        db.session.add(user)
+        db.session.commit()
+        # Warm the pool so process start-up isn't counted
+        password_hasher.hash('warm-up')
+
+    page_durations, login_durations = [], []
+    done = threading.Event()
+    remaining = iter(range(args.logins))
+    remaining_lock = threading.Lock()
+
+    def reader():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            assert client.get('/about').status_code == 200
+            page_durations.append(time.perf_counter() - started)
+
+    def signer():
+        client = app.test_client()
+        while True:
+            with remaining_lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            response = client.post('/login', data={'email': 'bench@example.com', 'password': 'bench-password'})
+            assert response.status_code == 302, response.status_code
+            login_durations.append(time.perf_counter() - started)
+            client.get('/logout')
+
+    readers = [threading.Thread(target=reader) for _ in range(args.page_threads)]
+    signers = [threading.Thread(target=signer) for _ in range(args.login_threads)]
+    for thread in readers:
+        thread.start()
+    started = time.perf_counter()
+    for thread in signers:
+        thread.start()
+    for thread in signers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in readers:
+        thread.join()
+    return {
+        'page_p50_ms': percentile(page_durations, 0.5),
+        'page_p95_ms': percentile(page_durations, 0.95),
+        'pages': len(page_durations),
+        'login_p95_ms': percentile(login_durations, 0.95),
+        'logins_per_second': round(args.logins / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--login-threads', type=int, default=8)
+    parser.add_argument('--page-threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--profile', default='standard')
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    report = {'profile': args.profile, 'logins': args.logins}
+    report['inline'] = run(args.profile, 0, args)
+    report['pool'] = run(args.profile, args.workers, args)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Outbox throughput: batched notification fan-out vs. one commit per event.
+
+Usage: python benchmarks/outbox_benchmark.py [--events 20000] [--batch-sizes 1 50 200 1000]
+Records synthetic comment/like/registration events in a throwaway SQLite
+database, drains them with the OutboxWorker at each batch size and
+prints events/second as JSON. The "inline" figure mimics the old
+behaviour of writing each Notification in its own request transaction.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 50, 200, 1000])
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='outbox-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from schema import init_db
+    from events import outbox_worker
+    from models import Notification, OutboxEvent
+    app = create_app()
+    with app.app_context():
+        init_db()
+
+    kinds = [
+        ('comment.created', {'comment_id': 1, 'user_id': 1, 'username': 'bench', 'project_id': 1, 'project_title': 'Bench'}),
+        ('project.liked', {'user_id': 1, 'username': 'bench', 'project_id': 1, 'project_title': 'Bench'}),
+        ('user.registered', {'user_id': 1, 'username': 'bench'}),
+    ]
+
+    def seed():
+        db.session.execute(db.delete(OutboxEvent))
+        db.session.execute(db.delete(Notification))
+        db.session.execute(db.insert(OutboxEvent), [
+            {'kind': kinds[i % 3][0], 'payload': kinds[i % 3][1]} for i in range(args.events)
+        ])
+        db.session.commit()
+
+    report = {'events': args.events, 'drain': {}}
+    with app.app_context():
+        seed()
+        started = time.perf_counter()
+        for event in OutboxEvent.query.yield_per(1000):
+            db.session.add(Notification(title='New Comment', message='inline', user_id=1, project_id=1))
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+        report['inline_commit_per_event'] = {'seconds': round(elapsed, 3), 'events_per_second': round(args.events / elapsed)}
+
+        for batch_size in args.batch_sizes:
+            seed()
+            app.config['OUTBOX_BATCH_SIZE'] = batch_size
+            started = time.perf_counter()
+            while outbox_worker.drain_batch():
+                pass
+            elapsed = time.perf_counter() - started
+            report['drain'][batch_size] = {
+                'seconds': round(elapsed, 3),
+                'events_per_second': round(args.events / elapsed),
+                'notifications': Notification.query.count(),
+            }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Cost of building and maintaining the related-projects index.
+
+Usage: python benchmarks/related_benchmark.py [--projects 5000] [--edits 20]
+Seeds a throwaway SQLite database with tagged projects, times a full
+`rebuild_related()` with the sparse matrix product and (for comparison)
+the pure-Python inverted index, then times `update_related()` for
+--edits single-project edits and the indexed lookup project_detail does.
+Prints the timings as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+WORDS = ('python flask react django postgres redis docker api dashboard mobile search realtime '
+         'graphql kafka rust golang typescript vue svelte tailwind ml vision nlp etl airflow spark').split()
+CATEGORIES = ['web', 'mobile', 'data', 'tools']
+
+def seed(app, projects):
+    from app import db
+    from models import Project
+    from tags import sync_project_tags
+    rng = random.Random(11)
+    with app.app_context():
+        db.session.execute(db.insert(Project), [{
+            'title': ' '.join(rng.sample(WORDS, 3)).title(),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(25)),
+            'content': 'benchmark',
+            'category': rng.choice(CATEGORIES),
+            'tags': ', '.join(rng.sample(WORDS, 3)),
+            'is_published': True,
+        } for _ in range(projects)])
+        rows = db.session.execute(db.select(Project.id, Project.tags)).all()
+        sync_project_tags(db.session.connection(), dict(rows))
+        db.session.commit()
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return round(time.perf_counter() - started, 3), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--edits', type=int, default=20)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import related
+    from app import create_app, db
+    from models import Project
+    from schema import init_db
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='related-bench-'), 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'PERF_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        # Updates are driven by hand below rather than by the background worker
+        'RELATED_ENABLED': False,
+    })
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        init_db()
+    seed(app, args.projects)
+
+    report = {'projects': args.projects, 'top_k': app.config['RELATED_TOP_K']}
+    with app.app_context():
+        if related.sparse is not None:
+            report['rebuild_sparse_s'], listed = timed(related.rebuild_related)
+        sparse = related.sparse
+        related.sparse = None
+        report['rebuild_python_s'], listed = timed(related.rebuild_related)
+        related.sparse = sparse
+        report['listed'] = listed
+
+        rng = random.Random(3)
+        ids = db.session.execute(db.select(Project.id)).scalars().all()
+        rewritten = []
+        started = time.perf_counter()
+        for project_id in rng.sample(ids, min(args.edits, len(ids))):
+            project = db.session.get(Project, project_id)
+            project.tags = ', '.join(rng.sample(WORDS, 3))
+            db.session.commit()
+            rewritten.append(len(related.update_related({project_id})))
+        report['update_per_edit_ms'] = round((time.perf_counter() - started) * 1000 / max(len(rewritten), 1), 1)
+        report['lists_rewritten_per_edit'] = round(sum(rewritten) / max(len(rewritten), 1), 1)
+
+        started = time.perf_counter()
+        for project_id in ids[:1000]:
+            related.related_projects(project_id)
+        report['lookup_ms'] = round((time.perf_counter() - started) * 1000 / min(len(ids), 1000), 3)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Dashboard range queries from the raw likes/comments tables vs. the activity rollups.
+
+Usage: python benchmarks/rollup_benchmark.py [--projects 500] [--likes 200000] [--comments 50000] [--days 90]
+Seeds a throwaway SQLite database with likes and comments spread over
+--days days, builds the rollups with `rebuild_rollups()`, then times the
+same questions answered both ways: site-wide likes/comments per day for
+30 days, one project's totals for 30 days, and a trending ranking over
+the last 72 hours. Also times buffering and flushing a burst of views.
+Prints milliseconds per query and rows read as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def seed(app, args):
+    from app import db
+    from models import Comment, Like, Project, User
+    rng = random.Random(5)
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(db.insert(Project), [
+            {'title': f'Project {i}', 'description': 'benchmark', 'tags': '', 'is_published': True}
+            for i in range(args.projects)])
+        users = max(args.likes // args.projects + 1, 50)
+        db.session.execute(db.insert(User), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x'} for i in range(users)])
+        project_ids = db.session.execute(db.select(Project.id)).scalars().all()
+        user_ids = db.session.execute(db.select(User.id)).scalars().all()
+
+        def moment():
+            return now - timedelta(seconds=rng.randrange(args.days * 86400))
+
+        pairs = set()
+        while len(pairs) < args.likes:
+            pairs.add((rng.choice(user_ids), rng.choice(project_ids)))
+        pairs = list(pairs)
+        for start in range(0, len(pairs), 20000):
+            db.session.execute(db.insert(Like), [{'user_id': user_id, 'project_id': project_id, 'created_at': moment()}
+                                                 for user_id, project_id in pairs[start:start + 20000]])
+        for start in range(0, args.comments, 20000):
+            db.session.execute(db.insert(Comment), [
+                {'content': 'Nice work', 'user_id': rng.choice(user_ids), 'project_id': rng.choice(project_ids),
+                 'created_at': moment()} for _ in range(start, min(start + 20000, args.comments))])
+        db.session.commit()
+        return project_ids
+
+def raw_daily(since):
+    from app import db
+    from models import Comment, Like
+    series = {}
+    for index, model in enumerate((Like, Comment)):
+        day = db.func.date(model.created_at)
+        for bucket, count in db.session.execute(
+            db.select(day, db.func.count()).where(model.created_at >= since).group_by(day)
+        ):
+            series.setdefault(bucket, [0, 0])[index] = count
+    return series
+
+def raw_project_totals(project_id, since):
+    from app import db
+    from models import Comment, Like
+    return [db.session.execute(db.select(db.func.count()).where(model.project_id == project_id, model.created_at >= since)).scalar()
+            for model in (Like, Comment)]
+
+def raw_trending(since, limit):
+    from app import db
+    from models import Comment, Like
+    scores = {}
+    for model, points in ((Like, 5), (Comment, 10)):
+        for project_id, count in db.session.execute(
+            db.select(model.project_id, db.func.count()).where(model.created_at >= since).group_by(model.project_id)
+        ):
+            scores[project_id] = scores.get(project_id, 0) + count * points
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return round((time.perf_counter() - started) * 1000 / repeat, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--likes', type=int, default=200000)
+    parser.add_argument('--comments', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--views', type=int, default=100000)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from models import ActivityRollup
+    from rollups import activity_rollups, activity_series, activity_totals, rebuild_rollups, trending_scores
+    from schema import init_db
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='rollup-bench-'), 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'PERF_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        # Flushes are driven by hand below
+        'ROLLUP_FLUSH_INTERVAL': 3600,
+        'ROLLUP_HOURLY_RETENTION_DAYS': args.days,
+    })
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        init_db()
+    project_ids = seed(app, args)
+
+    report = {'projects': args.projects, 'likes': args.likes, 'comments': args.comments, 'days': args.days}
+    with app.app_context():
+        started = time.perf_counter()
+        report['rollup_rows'] = rebuild_rollups()
+        report['rebuild_s'] = round(time.perf_counter() - started, 2)
+
+        now = datetime.utcnow()
+        month = now - timedelta(days=30)
+        recent = now - timedelta(hours=72)
+        project_id = project_ids[len(project_ids) // 2]
+        report['daily_series_30d_ms'] = {
+            'raw': timed(lambda: raw_daily(month), args.repeat),
+            'rollups': timed(lambda: activity_series(ActivityRollup.DAY, month, now), args.repeat),
+        }
+        report['project_totals_30d_ms'] = {
+            'raw': timed(lambda: raw_project_totals(project_id, month), args.repeat),
+            'rollups': timed(lambda: activity_totals(month, now, project_id), args.repeat),
+        }
+        report['trending_72h_ms'] = {
+            'raw': timed(lambda: raw_trending(recent, 10), args.repeat),
+            'rollups': timed(lambda: trending_scores(10, 72), args.repeat),
+        }
+
+        rng = random.Random(9)
+        started = time.perf_counter()
+        with app.test_request_context():
+            for _ in range(args.views):
+                activity_rollups.record_view(rng.choice(project_ids))
+        buffered = time.perf_counter() - started
+        started = time.perf_counter()
+        rows = activity_rollups.flush()
+        report['views'] = {
+            'count': args.views,
+            'record_us': round(buffered * 1e6 / args.views, 2),
+            'flush_ms': round((time.perf_counter() - started) * 1000, 1),
+            'rows_written': rows,
+        }
+    activity_rollups.stop()
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
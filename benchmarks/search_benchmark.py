@@ -0,0 +1,82 @@
+"""Compare /projects search: FTS index vs. the old LIKE '%term%' scan.
+
+Usage: python benchmarks/search_benchmark.py [--rows 100000] [--repeat 20]
+Seeds a throwaway SQLite database with synthetic projects and prints
+per-query timings for both strategies as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+WORDS = ('python flask react vue django postgres sqlite redis docker kubernetes aws gcp '
+         'analytics dashboard mobile commerce payments search realtime chat streaming '
+         'machine learning vision pipeline api graphql rest auth portfolio game engine').split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--terms', nargs='+', default=['kubernetes', 'realtime chat', 'dash', 'zorbal', 'quenti'])
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='search-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db
+    from schema import init_db
+    from models import Project
+    from search import apply_search
+    app = create_app()
+    with app.app_context():
+        init_db()
+
+    rng = random.Random(42)
+    syllables = ['ba', 'ko', 'ri', 'zor', 'quen', 'ti', 'lu', 'max', 'vel', 'dra', 'po', 'sen']
+    # A long tail of rare words keeps selective searches realistic
+    vocabulary = WORDS + [''.join(rng.choice(syllables) for _ in range(3)) for _ in range(20_000)]
+    def sentence(n):
+        return ' '.join(rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(vocabulary) for _ in range(n))
+
+    with app.app_context():
+        rows = [{
+            'title': sentence(4).title(),
+            'description': sentence(25),
+            'content': sentence(120),
+            'tags': ', '.join(rng.sample(WORDS, 4)),
+            'category': 'web',
+            'is_published': True,
+        } for _ in range(args.rows)]
+        started = time.perf_counter()
+        db.session.execute(db.insert(Project), rows)
+        db.session.commit()
+        seed_seconds = time.perf_counter() - started
+
+        def timed(build):
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                count = len(build().limit(50).all())
+                samples.append(time.perf_counter() - started)
+                db.session.expunge_all()
+            samples.sort()
+            return {'results': count, 'median_ms': round(samples[len(samples) // 2] * 1000, 3),
+                    'max_ms': round(samples[-1] * 1000, 3)}
+
+        report = {'rows': args.rows, 'seed_seconds': round(seed_seconds, 2),
+                  'backend': app.extensions.get('project_search'), 'queries': {}}
+        for term in args.terms:
+            base = Project.query.filter_by(is_published=True)
+            report['queries'][term] = {
+                'like_scan': timed(lambda: base.filter(Project.title.contains(term) | Project.description.contains(term))
+                                   .order_by(Project.created_at.desc())),
+                'full_text': timed(lambda: apply_search(base, term)),
+            }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
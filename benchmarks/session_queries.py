@@ -0,0 +1,80 @@
+"""SQL statements per request with and without the process-local About/session-user cache.
+
+Usage: python benchmarks/session_queries.py [--requests 50]
+Seeds a throwaway SQLite database, then requests a few pages as an
+anonymous visitor and as a signed-in admin (response cache disabled),
+first with LOCAL_CACHE_ENABLED off and then on, counting every statement
+issued per request. Prints the mean statements per request for each page
+and how many the cache saved as JSON.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+PAGES = [
+    ('anonymous', '/about'),
+    ('admin', '/about'),
+    ('admin', '/projects'),
+    ('admin', '/project/1'),
+    ('admin', '/admin'),
+    ('admin', '/admin/about'),
+]
+
+def measure(enabled, args):
+    from sqlalchemy import event
+    from app import create_app, db
+    from schema import init_db
+    from seed import seed_database
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='session-bench-'), 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'WTF_CSRF_ENABLED': False,
+        'PERF_ENABLED': False,
+        'RESPONSE_CACHE_BACKEND': 'none',
+        'PASSWORD_HASH_WORKERS': 0,
+        'LOCAL_CACHE_ENABLED': enabled,
+    })
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        init_db()
+        seed_database()
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    clients = {'anonymous': app.test_client(), 'admin': app.test_client()}
+    clients['admin'].post('/login', data={'email': 'admin@portfolio.com', 'password': 'admin123'})
+    results = {}
+    for role, path in PAGES:
+        client = clients[role]
+        # Conditional GETs would turn repeats into 304s; always ask for the full page
+        client.get(path)
+        statements.clear()
+        for _ in range(args.requests):
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+        results[f'{role} {path}'] = round(len(statements) / args.requests, 2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    uncached = measure(False, args)
+    cached = measure(True, args)
+    report = {'requests': args.requests, 'statements_per_request': {
+        page: {'uncached': uncached[page], 'local_cache': cached[page], 'saved': round(uncached[page] - cached[page], 2)}
+        for page in uncached
+    }}
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Cold start cost per worker: importing the app vs. importing and initializing the database.
+
+Usage: python benchmarks/startup_benchmark.py [--runs 10]
+Each run is a fresh interpreter, like a gunicorn worker without
+--preload. "import" times `import main` (create_app() only); "import +
+init" also runs init_db() and seed_database(), which is what every
+worker paid when app.py created the schema and seeded on import.
+Prints min/median/max milliseconds as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_ONLY = '''
+import time
+started = time.perf_counter()
+import main
+print((time.perf_counter() - started) * 1000)
+'''
+
+IMPORT_AND_INIT = '''
+import time
+started = time.perf_counter()
+import main
+from schema import init_db
+from seed import seed_database
+with main.app.app_context():
+    init_db()
+    seed_database()
+print((time.perf_counter() - started) * 1000)
+'''
+
+def measure(code, runs, env):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return {'min_ms': round(min(timings), 1), 'median_ms': round(statistics.median(timings), 1),
+            'max_ms': round(max(timings), 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='startup-bench-')
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+
+    report = {'runs': args.runs, 'import': measure(IMPORT_ONLY, args.runs, env)}
+    # The first run seeds; later runs see an existing database, like a worker restart
+    report['import_and_init'] = measure(IMPORT_AND_INIT, args.runs, env)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
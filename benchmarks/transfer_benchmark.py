@@ -0,0 +1,131 @@
+"""Throughput of `flask projects export/import` (streaming NDJSON, batched upserts).
+
+Usage: python benchmarks/transfer_benchmark.py [--projects 100000] [--batch-size 500] [--trace-memory]
+Seeds a throwaway SQLite database with tagged projects, one comment per
+five projects and one like per ten, exports it to an NDJSON file,
+imports that into a fresh database (all inserts), then imports it again
+(all updates). For comparison it also times creating --orm-sample
+projects one ORM commit at a time, as the admin form does. Prints rows
+per second for each step as JSON; with --trace-memory also the peak
+Python allocation during export and import (slower, so off by default).
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+WORDS = 'python flask react django postgres redis docker api dashboard mobile search realtime'.split()
+
+def make_app(path):
+    from app import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'PERF_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+    })
+
+def prepare(app):
+    from app import db
+    from schema import init_db
+    from models import User
+    with app.app_context():
+        init_db()
+        db.session.add(User(username='bench', email='bench@example.com', password_hash='x'))
+        db.session.commit()
+
+def seed(app, projects):
+    from app import db
+    from models import Comment, Like, Project, User
+    from tags import refresh_tag_counts, sync_project_tags
+    rng = random.Random(7)
+    with app.app_context():
+        user_id = User.query.filter_by(username='bench').one().id
+        for start in range(0, projects, 10000):
+            db.session.execute(db.insert(Project), [{
+                'title': ' '.join(rng.sample(WORDS, 3)).title(),
+                'description': ' '.join(rng.choice(WORDS) for _ in range(30)),
+                'content': 'benchmark',
+                'category': 'web',
+                'tags': ', '.join(rng.sample(WORDS, 3)),
+                'is_published': True,
+            } for _ in range(start, min(start + 10000, projects))])
+        ids = db.session.execute(db.select(Project.id)).scalars().all()
+        db.session.execute(db.insert(Comment), [{'content': 'Nice', 'user_id': user_id, 'project_id': project_id}
+                                                for project_id in ids[::5]])
+        db.session.execute(db.insert(Like), [{'user_id': user_id, 'project_id': project_id} for project_id in ids[::10]])
+        rows = db.session.execute(db.select(Project.id, Project.tags)).all()
+        for start in range(0, len(rows), 10000):
+            sync_project_tags(db.session.connection(), dict(rows[start:start + 10000]))
+        refresh_tag_counts(db.session.connection())
+        db.session.commit()
+        Project.reconcile_counters()
+
+def timed(rows, function, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    report = {'seconds': round(elapsed, 2), 'rows_per_second': round(rows / elapsed)}
+    if trace_memory:
+        report['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        tracemalloc.stop()
+    return report, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--orm-sample', type=int, default=200)
+    parser.add_argument('--trace-memory', action='store_true')
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import db
+    from models import Project
+    from transfer import export_projects, import_projects
+
+    workdir = tempfile.mkdtemp(prefix='transfer-bench-')
+    source = make_app(os.path.join(workdir, 'source.db'))
+    logging.getLogger().setLevel(logging.WARNING)
+    prepare(source)
+    seed(source, args.projects)
+    export_path = os.path.join(workdir, 'export.ndjson')
+
+    def export():
+        with source.app_context(), open(export_path, 'w', encoding='utf-8') as handle:
+            for line in export_projects(args.batch_size):
+                handle.write(line)
+
+    rows = args.projects + len(range(0, args.projects, 5)) + len(range(0, args.projects, 10))
+    report = {'projects': args.projects, 'rows': rows, 'batch_size': args.batch_size}
+    report['export'], _ = timed(rows, export, args.trace_memory)
+    report['export_mb'] = round(os.path.getsize(export_path) / 2 ** 20, 1)
+
+    target = make_app(os.path.join(workdir, 'target.db'))
+    prepare(target)
+
+    def run_import():
+        with target.app_context(), open(export_path, encoding='utf-8') as handle:
+            return import_projects(handle, args.batch_size)
+
+    report['import_insert'], counts = timed(rows, run_import, args.trace_memory)
+    assert counts['projects'] == args.projects and not counts['skipped'], counts
+    report['import_update'], _ = timed(rows, run_import, args.trace_memory)
+
+    def orm_one_by_one():
+        with target.app_context():
+            for i in range(args.orm_sample):
+                db.session.add(Project(title=f'ORM {i}', description='one at a time', tags='python, flask', is_published=True))
+                db.session.commit()
+
+    report['orm_one_at_a_time'], _ = timed(args.orm_sample, orm_one_by_one, False)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, g, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from background import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+class MemoryCacheBackend:
+    """Process-local LRU store with per-entry TTL and a bounded entry count"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, tags, value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def sweep(self):
+        """Drop expired entries; returns how many"""
+        with self._lock:
+            now = time.monotonic()
+            expired = [key for key, entry in self._entries.items() if entry[0] < now]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class SQLiteCacheBackend:
+    """File-backed store shared by every worker process on the host"""
+
+    def __init__(self, path, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry (expires_at);
+                CREATE TABLE IF NOT EXISTS cache_tag (
+                    tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_cache_tag_key ON cache_tag (key);
+            """)
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND expires_at >= ?', (key, time.time())).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl, tags):
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM cache_tag WHERE key = ?', (key,))
+            connection.execute('INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+                               (key, pickle.dumps(value), time.time() + ttl))
+            connection.executemany('INSERT OR IGNORE INTO cache_tag (tag, key) VALUES (?, ?)',
+                                   [(tag, key) for tag in tags])
+            # Both halves walk ix_cache_entry_expires; the evicted keys' tags go by ix_cache_tag_key
+            evicted = [row[0] for row in connection.execute(
+                'SELECT key FROM cache_entry WHERE expires_at < ? UNION '
+                'SELECT key FROM (SELECT key FROM cache_entry ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (time.time(), self.max_entries))]
+            self._delete_keys(connection, evicted)
+
+    def invalidate(self, tags):
+        connection = self._connect()
+        placeholders = ', '.join('?' * len(tags))
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            keys = [row[0] for row in connection.execute(
+                f'SELECT DISTINCT key FROM cache_tag WHERE tag IN ({placeholders})', list(tags))]
+            return self._delete_keys(connection, keys)
+
+    def sweep(self):
+        """Drop expired entries and any tag rows left without an entry; returns how many entries went.
+
+        set() and invalidate() delete the tags of the keys they remove, so
+        this full scan of cache_tag only runs from the background sweeper.
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            removed = connection.execute('DELETE FROM cache_entry WHERE expires_at < ?', (time.time(),)).rowcount
+            connection.execute('DELETE FROM cache_tag WHERE key NOT IN (SELECT key FROM cache_entry)')
+        return removed
+
+    @staticmethod
+    def _delete_keys(connection, keys, chunk_size=500):
+        removed = 0
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            removed += connection.execute(f'DELETE FROM cache_entry WHERE key IN ({placeholders})', chunk).rowcount
+            connection.execute(f'DELETE FROM cache_tag WHERE key IN ({placeholders})', chunk)
+        return removed
+
+    def clear(self):
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM cache_entry')
+            connection.execute('DELETE FROM cache_tag')
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+
+class CacheSweeper(PeriodicWorker):
+    """Drops expired response cache entries (and orphaned tags) every RESPONSE_CACHE_SWEEP_INTERVAL seconds"""
+
+    name = 'cache-sweeper'
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def run_once(self):
+        if self.cache.backend is not None:
+            self.cache.backend.sweep()
+        return False
+
+class ResponseCache:
+    """Caches rendered anonymous GET responses and drops them by tag.
+
+    Entries are keyed by endpoint, URL and auth state. Models
+    that expose a cache_tags() method are invalidated automatically when
+    a session that touched them commits.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 300
+        self.hits = self.misses = self.stores = self.invalidations = 0
+        self.sweeper = CacheSweeper(self)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_BACKEND', 'memory')
+        app.config.setdefault('RESPONSE_CACHE_TTL', 300)
+        app.config.setdefault('RESPONSE_CACHE_MAX_ENTRIES', 512)
+        app.config.setdefault('RESPONSE_CACHE_PATH', os.path.join(app.instance_path, 'response_cache.sqlite'))
+        app.config.setdefault('RESPONSE_CACHE_SWEEP_INTERVAL', 300)
+
+        kind = app.config['RESPONSE_CACHE_BACKEND']
+        if kind == 'memory':
+            self.backend = MemoryCacheBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+        elif kind == 'sqlite':
+            self.backend = SQLiteCacheBackend(app.config['RESPONSE_CACHE_PATH'], app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = None
+        self.default_ttl = app.config['RESPONSE_CACHE_TTL']
+        self.sweeper.interval = app.config['RESPONSE_CACHE_SWEEP_INTERVAL']
+        app.extensions['response_cache'] = self
+
+        event.listen(Session, 'after_flush', _collect_tags)
+        event.listen(Session, 'after_commit', self._invalidate_committed)
+        event.listen(Session, 'after_soft_rollback', _discard_tags)
+
+    def cached(self, *tags, ttl=None):
+        """Cache a view's response. Tags may use the view's arguments, e.g. 'project:{id}'"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or request.method != 'GET' or '_flashes' in session:
+                    return view(*args, **kwargs)
+                if current_user.is_authenticated:
+                    # Authenticated pages embed per-session CSRF tokens and user state
+                    return view(*args, **kwargs)
+
+                key = self._make_key()
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    response = Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self.misses += 1
+                g.cache_tags = {tag.format(**kwargs) for tag in tags}
+                response = view(*args, **kwargs)
+                if isinstance(response, str):
+                    response = Response(response)
+                if response.status_code == 200 and not response.is_streamed:
+                    entry_tags = set()
+                    for tag in g.cache_tags:
+                        entry_tags.update(tag() if callable(tag) else (tag,))
+                    self.backend.set(key, {'body': response.get_data(), 'status': response.status_code,
+                                           'mimetype': response.mimetype}, ttl or self.default_ttl, entry_tags)
+                    self.stores += 1
+                    self.sweeper.ensure_started(current_app._get_current_object())
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def add_tags(self, *tags):
+        """Attach extra tags to the response being cached; callables are resolved after rendering"""
+        if 'cache_tags' in g:
+            g.cache_tags.update(tags)
+
+    def invalidate(self, *tags):
+        if self.backend is None or not tags:
+            return 0
+        removed = self.backend.invalidate(set(tags))
+        self.invalidations += removed
+        logger.debug('Invalidated %d cached responses for %s', removed, sorted(tags))
+        return removed
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'entries': len(self.backend) if self.backend else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'stores': self.stores,
+            'invalidations': self.invalidations,
+        }
+
+    def _make_key(self):
+        auth = f'user:{current_user.get_id()}' if current_user.is_authenticated else 'anon'
+        args = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+        return f'{request.endpoint}|{request.path}?{args}|{auth}'
+
+    def _invalidate_committed(self, db_session):
+        tags = db_session.info.pop('cache_tags', None)
+        if tags:
+            self.invalidate(*tags)
+
+def _collect_tags(db_session, flush_context):
+    tags = db_session.info.setdefault('cache_tags', set())
+    for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        cache_tags = getattr(obj, 'cache_tags', None)
+        if cache_tags is not None:
+            tags.update(cache_tags())
+
+def _discard_tags(db_session, previous_transaction):
+    if previous_transaction.parent is None:
+        db_session.info.pop('cache_tags', None)
+
+response_cache = ResponseCache()
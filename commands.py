@@ -0,0 +1,198 @@
+import click
+from flask.cli import AppGroup, with_appcontext
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create the tables, indexes and search index (safe to re-run)."""
+    from schema import init_db
+    init_db()
+    click.echo('Database initialized.')
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Initialize the database and add the admin account and sample projects."""
+    from schema import init_db
+    from seed import seed_database
+    from related import rebuild_related
+    init_db()
+    if seed_database():
+        # Built here rather than by the background worker, which won't outlive this command
+        rebuild_related()
+        click.echo('Admin user and sample content created: admin@portfolio.com / admin123')
+    else:
+        click.echo('Database already seeded.')
+
+@click.command('reconcile-counters')
+@with_appcontext
+def reconcile_counters_command():
+    """Rebuild the denormalized project counters and dashboard totals."""
+    from models import Project
+    from stats import rebuild_site_stats
+    updated = Project.reconcile_counters()
+    rebuild_site_stats()
+    click.echo(f'Reconciled counters for {updated} project(s) and the dashboard totals.')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Re-index all projects for full-text search."""
+    from search import rebuild_search_index
+    rebuild_search_index()
+    click.echo('Search index rebuilt.')
+
+@click.command('backfill-tags')
+@with_appcontext
+def backfill_tags_command():
+    """Build the normalized tag tables from the projects' tag strings."""
+    from tags import backfill_tags
+    processed = backfill_tags()
+    click.echo(f'Backfilled tags for {processed} project(s).')
+
+@click.command('rebuild-related')
+@with_appcontext
+def rebuild_related_command():
+    """Recompute the related-projects lists for every published project."""
+    from related import rebuild_related, sparse
+    listed = rebuild_related()
+    click.echo(f'Related projects computed for {listed} project(s)'
+               f'{"" if sparse is not None else " (SciPy not installed, run `uv sync`; used the pure-Python index)"}.')
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Recount the hourly/daily like and comment rollups from their tables."""
+    from rollups import rebuild_rollups
+    written = rebuild_rollups()
+    click.echo(f'Rebuilt {written} rollup row(s); view counts were kept.')
+
+@click.command('compact-notifications')
+@click.option('--days', type=int, help='Retention in days (defaults to NOTIFICATION_RETENTION_DAYS).')
+@with_appcontext
+def compact_notifications_command(days):
+    """Delete read notifications past the retention window."""
+    from flask import current_app
+    from notifications import compact_notifications
+    days = current_app.config['NOTIFICATION_RETENTION_DAYS'] if days is None else days
+    batch_size = current_app.config['NOTIFICATION_COMPACT_BATCH']
+    total = 0
+    while True:
+        deleted = compact_notifications(days, batch_size)
+        total += deleted
+        if deleted < batch_size:
+            break
+    click.echo(f'Deleted {total} read notification(s) older than {days} day(s).')
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minify, fingerprint and precompress the CSS/JS under static/."""
+    from assets import brotli, rebuild
+    manifest = rebuild()
+    for source, built in sorted(manifest.items()):
+        click.echo(f'{source} -> {built}')
+    if brotli is None:
+        click.echo('brotli is not installed (run `uv sync`); only gzip variants were written.')
+
+@click.command('clear-cache')
+@with_appcontext
+def clear_cache_command():
+    """Drop every cached page, e.g. after deploying template changes."""
+    from cache import response_cache
+    response_cache.clear()
+    click.echo('Response cache cleared.')
+
+@click.command('process-images')
+@click.option('--all', 'process_all', is_flag=True, help='Regenerate variants that already exist.')
+@with_appcontext
+def process_images_command(process_all):
+    """Generate responsive variants for project images."""
+    from images import image_pipeline
+    from models import Project
+    if not image_pipeline.enabled:
+        raise click.ClickException('Pillow is not installed.')
+    query = Project.query.filter(Project.image_url.isnot(None))
+    if not process_all:
+        query = query.filter(Project.image_variants.is_(None))
+    processed = 0
+    for project_id, image_url in query.with_entities(Project.id, Project.image_url).all():
+        if image_pipeline.process_now(project_id, image_url):
+            processed += 1
+    click.echo(f'Generated variants for {processed} image(s).')
+
+@click.command('gc-uploads')
+@click.option('--dry-run', is_flag=True, help='List unreferenced blobs without deleting them.')
+@click.option('--grace', default=3600, show_default=True, help='Keep blobs modified within this many seconds.')
+@with_appcontext
+def gc_uploads_command(dry_run, grace):
+    """Delete uploaded blobs that no project references anymore."""
+    from flask import current_app
+    from models import Project
+    from storage import collect_garbage
+    referenced = set()
+    for image_url, variants in Project.query.with_entities(Project.image_url, Project.image_variants):
+        if image_url:
+            referenced.add(image_url)
+        for variant in (variants or {}).values():
+            referenced.update(path for fmt, path in variant.items() if fmt != 'width')
+    removed = collect_garbage(current_app.config['UPLOAD_FOLDER'], referenced, grace, dry_run)
+    for name in removed:
+        click.echo(name)
+    click.echo(f'{"Would remove" if dry_run else "Removed"} {len(removed)} file(s).')
+
+@click.command('drain-outbox')
+@with_appcontext
+def drain_outbox_command():
+    """Deliver every pending outbox event now."""
+    from events import outbox_worker
+    delivered = 0
+    while True:
+        processed = outbox_worker.drain_batch()
+        if not processed:
+            break
+        delivered += processed
+    click.echo(f'Processed {delivered} event(s).')
+
+projects_cli = AppGroup('projects', help='Export and import projects as NDJSON.')
+
+@projects_cli.command('export')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--batch-size', default=500, show_default=True, help='Projects read per query.')
+def export_projects_command(output, batch_size):
+    """Write every project with its comments and likes to OUTPUT (default stdout)."""
+    from transfer import export_projects
+    for line in export_projects(batch_size):
+        output.write(line)
+
+@projects_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', default=500, show_default=True, help='Rows written per transaction.')
+def import_projects_command(source, batch_size):
+    """Upsert projects, comments and likes by id from an NDJSON export."""
+    from related import rebuild_related
+    from transfer import TransferError, import_projects
+    try:
+        counts = import_projects(source, batch_size)
+    except TransferError as error:
+        raise click.ClickException(f'{error} (earlier batches were imported; re-running the import is safe)')
+    finally:
+        rebuild_related()
+    click.echo('Imported {projects} project(s), {comments} comment(s) and {likes} like(s); '
+               'skipped {skipped} whose user or project does not exist.'.format(**counts))
+
+def init_app(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(backfill_tags_command)
+    app.cli.add_command(rebuild_related_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(compact_notifications_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(clear_cache_command)
+    app.cli.add_command(process_images_command)
+    app.cli.add_command(gc_uploads_command)
+    app.cli.add_command(drain_outbox_command)
+    app.cli.add_command(projects_cli)
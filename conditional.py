@@ -0,0 +1,70 @@
+import hashlib
+import os
+from datetime import timezone
+from functools import wraps
+from flask import Response, current_app, make_response, request, session
+from flask_login import current_user
+
+def init_app(app):
+    app.config.setdefault('HTTP_CACHE_MAX_AGE', 0)
+    if 'HTTP_CACHE_SALT' not in app.config:
+        # Template edits must change every ETag even when the data didn't
+        mtimes = [os.path.getmtime(os.path.join(root, name))
+                  for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder))
+                  for name in files]
+        app.config['HTTP_CACHE_SALT'] = str(max(mtimes, default=0))
+
+def conditional(validators):
+    """Answer If-None-Match/If-Modified-Since for anonymous GETs without rendering.
+
+    validators(**view_args) must cheaply return (etag_parts, last_modified)
+    for the resource, or None to fall through to the view unchanged.
+    Authenticated responses embed user state and CSRF tokens, so they are
+    marked private and never validated.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or '_flashes' in session:
+                return view(*args, **kwargs)
+            if current_user.is_authenticated:
+                response = make_response(view(*args, **kwargs))
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+                return response
+
+            result = validators(**kwargs)
+            if result is None:
+                return view(*args, **kwargs)
+            etag_parts, last_modified = result
+            etag = _make_etag(etag_parts)
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+            if _is_not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config['HTTP_CACHE_MAX_AGE']
+            response.cache_control.must_revalidate = True
+            return response
+        return wrapper
+    return decorator
+
+def _make_etag(parts):
+    seed = repr((current_app.config['HTTP_CACHE_SALT'], request.full_path, parts))
+    return hashlib.sha1(seed.encode()).hexdigest()[:24]
+
+def _is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
@@ -0,0 +1,64 @@
+import logging
+from functools import partial
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app import db
+
+logger = logging.getLogger(__name__)
+
+def engine_options(uri, config):
+    """SQLAlchemy create_engine() options tuned for the database backend in uri"""
+    options = {'pool_recycle': 300, 'pool_pre_ping': True}
+    backend = make_url(uri).get_backend_name()
+    if backend == 'postgresql':
+        options.update(
+            pool_size=config['DB_POOL_SIZE'],
+            max_overflow=config['DB_MAX_OVERFLOW'],
+            pool_timeout=config['DB_POOL_TIMEOUT'],
+            # Runaway queries are cancelled server-side instead of pinning a worker
+            connect_args={'options': f'-c statement_timeout={config["DB_STATEMENT_TIMEOUT_MS"]}'
+                                     f' -c idle_in_transaction_session_timeout={config["DB_IDLE_TRANSACTION_TIMEOUT_MS"]}'},
+        )
+    elif backend == 'sqlite':
+        # pysqlite's own busy handler, in seconds; the PRAGMA below mirrors it
+        options['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    return options
+
+def _apply_sqlite_pragmas(config, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed while one writer commits; it is stored in the file
+        cursor.execute(f'PRAGMA journal_mode={config["SQLITE_JOURNAL_MODE"]}')
+        cursor.execute(f'PRAGMA synchronous={config["SQLITE_SYNCHRONOUS"]}')
+        cursor.execute(f'PRAGMA busy_timeout={int(config["SQLITE_BUSY_TIMEOUT_MS"])}')
+        cursor.execute(f'PRAGMA mmap_size={int(config["SQLITE_MMAP_SIZE"])}')
+    finally:
+        cursor.close()
+
+def init_app(app):
+    """Configure the engine for the backend and bind db to the app.
+
+    Replaces a plain db.init_app(app). Options already present in
+    SQLALCHEMY_ENGINE_OPTIONS take precedence over the tuned defaults.
+    """
+    app.config.setdefault('DB_POOL_SIZE', 5)
+    app.config.setdefault('DB_MAX_OVERFLOW', 10)
+    app.config.setdefault('DB_POOL_TIMEOUT', 10)
+    app.config.setdefault('DB_STATEMENT_TIMEOUT_MS', 15000)
+    app.config.setdefault('DB_IDLE_TRANSACTION_TIMEOUT_MS', 60000)
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    app.config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    db.init_app(app)
+
+    # Engines exist once db is bound; no connection is opened here
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', partial(_apply_sqlite_pragmas, app.config))
+                logger.debug('SQLite pragmas enabled for %s', engine.url)
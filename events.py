@@ -0,0 +1,259 @@
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app, g, has_request_context
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from app import db
+from background import PeriodicWorker
+from live import live_hub
+from models import Notification, OutboxEvent, adjust_site_stats
+from notifications import unread_count
+
+logger = logging.getLogger(__name__)
+
+def record_event(kind, **payload):
+    """Add a domain event to the current transaction.
+
+    It is only delivered if the caller commits. When the backlog is above
+    OUTBOX_HIGH_WATER the request waits after its commit (up to
+    OUTBOX_BACKPRESSURE_WAIT seconds) for the worker to catch up, so
+    producers slow down instead of letting the outbox grow unbounded.
+    """
+    db.session.add(OutboxEvent(kind=kind, payload=payload))
+    db.session.info['outbox_recorded'] = True
+    if outbox_worker.backlog > outbox_worker.high_water:
+        db.session.info['outbox_backpressure'] = True
+
+# Batch handlers: a list of events of one kind in, Notification rows out
+def _comment_notifications(events):
+    return [{
+        'title': 'New Comment',
+        'message': f'{event.payload["username"]} commented on "{event.payload["project_title"]}"',
+        'user_id': event.payload['user_id'],
+        'project_id': event.payload['project_id'],
+        'comment_id': event.payload['comment_id'],
+        'created_at': event.created_at,
+    } for event in events]
+
+def _like_notifications(events):
+    # A burst of likes on one project becomes a single notification
+    by_project = defaultdict(list)
+    for event in events:
+        by_project[event.payload['project_id']].append(event)
+    rows = []
+    for project_id, likes in by_project.items():
+        title = likes[-1].payload['project_title']
+        if len(likes) == 1:
+            message = f'{likes[0].payload["username"]} liked "{title}"'
+            user_id = likes[0].payload['user_id']
+        else:
+            message = f'{len(likes)} new likes on "{title}"'
+            user_id = None
+        rows.append({'title': 'New Like', 'message': message, 'user_id': user_id,
+                     'project_id': project_id, 'created_at': likes[-1].created_at})
+    return rows
+
+def _registration_notifications(events):
+    return [{
+        'title': 'New User',
+        'message': f'{event.payload["username"]} created an account',
+        'user_id': event.payload['user_id'],
+        'created_at': event.created_at,
+    } for event in events]
+
+HANDLERS = {
+    'comment.created': _comment_notifications,
+    'project.liked': _like_notifications,
+    'user.registered': _registration_notifications,
+}
+
+class OutboxWorker(PeriodicWorker):
+    """Drains the outbox in batches, writing Notification rows with executemany.
+
+    Batches are claimed with a lease, so several worker processes can
+    drain the same table without double delivery. A failed batch is
+    retried with exponential backoff and dead-lettered after
+    OUTBOX_MAX_ATTEMPTS (processed_at set, last_error kept).
+    """
+
+    name = 'outbox-worker'
+
+    def __init__(self):
+        super().__init__()
+        self.backlog = 0
+        self.delivered = 0
+        self.failed = 0
+        self.throttled = 0
+        self.high_water = 10000
+        self.backpressure_wait = 1.0
+        self._progress = threading.Condition()
+
+    def init_app(self, app):
+        app.config.setdefault('OUTBOX_WORKER', True)
+        app.config.setdefault('OUTBOX_BATCH_SIZE', 200)
+        app.config.setdefault('OUTBOX_POLL_INTERVAL', 2.0)
+        app.config.setdefault('OUTBOX_MAX_ATTEMPTS', 5)
+        app.config.setdefault('OUTBOX_LEASE_SECONDS', 60)
+        app.config.setdefault('OUTBOX_HIGH_WATER', 10000)
+        app.config.setdefault('OUTBOX_BACKPRESSURE_WAIT', 1.0)
+        app.config.setdefault('OUTBOX_RETENTION_DAYS', 7)
+        app.extensions['outbox_worker'] = self
+        self.interval = app.config['OUTBOX_POLL_INTERVAL']
+        self.high_water = app.config['OUTBOX_HIGH_WATER']
+        # Only wait for a worker thread that this process actually runs
+        self.backpressure_wait = app.config['OUTBOX_BACKPRESSURE_WAIT'] if app.config['OUTBOX_WORKER'] else 0
+
+        if app.config['OUTBOX_WORKER']:
+            @app.before_request
+            def _start_outbox_worker():
+                self.ensure_started(app)
+        app.after_request(self._apply_backpressure)
+        sa_event.listen(Session, 'after_commit', self._wake_after_commit)
+        sa_event.listen(Session, 'after_soft_rollback', self._discard_after_rollback)
+
+    def _wake_after_commit(self, session):
+        # Deliver right away instead of waiting for the next poll
+        if session.info.pop('outbox_recorded', False):
+            self.wake()
+        if session.info.pop('outbox_backpressure', False) and has_request_context():
+            g.outbox_backpressure = True
+
+    def _apply_backpressure(self, response):
+        # Runs once the view's transaction is committed and its connection returned: only the response waits
+        if g.pop('outbox_backpressure', False) and self.backpressure_wait:
+            self.throttled += 1
+            with self._progress:
+                self._progress.wait_for(lambda: self.backlog <= self.high_water, self.backpressure_wait)
+        return response
+
+    def _discard_after_rollback(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop('outbox_recorded', None)
+            session.info.pop('outbox_backpressure', None)
+
+    def run_once(self):
+        processed = self.drain_batch()
+        self.backlog = db.session.execute(
+            db.select(db.func.count(OutboxEvent.id)).where(OutboxEvent.processed_at.is_(None))
+        ).scalar()
+        with self._progress:
+            self._progress.notify_all()
+        if not processed:
+            self.purge_processed()
+        return processed == current_app.config['OUTBOX_BATCH_SIZE']
+
+    def purge_processed(self):
+        """Delete delivered events past the retention window (dead letters included)"""
+        cutoff = datetime.utcnow() - timedelta(days=current_app.config['OUTBOX_RETENTION_DAYS'])
+        deleted = db.session.execute(
+            db.delete(OutboxEvent).where(OutboxEvent.processed_at < cutoff)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return deleted
+
+    def drain_batch(self):
+        """Claim, deliver and acknowledge one batch; returns how many events it held.
+
+        The batch is delivered in one transaction. If that fails, its
+        events are delivered one at a time so only the ones that fail
+        again are retried (and eventually dead-lettered).
+        """
+        config = current_app.config
+        events = self._claim(config['OUTBOX_BATCH_SIZE'], config['OUTBOX_LEASE_SECONDS'])
+        if not events:
+            return 0
+
+        try:
+            rows = self._deliver(events)
+        except Exception:
+            db.session.rollback()
+            logger.warning('Outbox batch of %d events failed; delivering them one at a time', len(events), exc_info=True)
+            rows = []
+            for event in events:
+                try:
+                    rows.extend(self._deliver([event]))
+                except Exception as exc:
+                    db.session.rollback()
+                    self.failed += 1
+                    logger.exception('Outbox event %s (%s) failed', event.id, event.kind)
+                    self._schedule_retry([event], repr(exc), config['OUTBOX_MAX_ATTEMPTS'])
+        if rows:
+            self._push_notifications(rows)
+        return len(events)
+
+    def _deliver(self, events):
+        """Write the notifications for events and acknowledge them in one transaction"""
+        by_kind = defaultdict(list)
+        for event in events:
+            by_kind[event.kind].append(event)
+        rows = []
+        for kind, batch in by_kind.items():
+            handler = HANDLERS.get(kind)
+            if handler is None:
+                logger.warning('No outbox handler for %s events', kind)
+                continue
+            rows.extend(handler(batch))
+        if rows:
+            db.session.execute(db.insert(Notification), rows)
+            adjust_site_stats(db.session, unread_notifications=len(rows))
+        db.session.execute(
+            db.update(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in events]))
+            .values(processed_at=datetime.utcnow(), claim_token=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        self.delivered += len(events)
+        return rows
+
+    def _push_notifications(self, rows):
+        # Admins with an open stream see the batch without reloading the inbox
+        if not live_hub.has_subscribers('admin'):
+            return
+        live_hub.publish('admin', 'notifications', {
+            'unread': unread_count(),
+            'notifications': [{key: row.get(key) for key in ('title', 'message', 'project_id', 'created_at')}
+                              for row in rows],
+        })
+        db.session.rollback()
+
+    def _claim(self, batch_size, lease_seconds):
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        candidates = (
+            db.select(OutboxEvent.id)
+            .where(OutboxEvent.processed_at.is_(None), OutboxEvent.available_at <= now,
+                   db.or_(OutboxEvent.claimed_until.is_(None), OutboxEvent.claimed_until < now))
+            .order_by(OutboxEvent.id)
+            .limit(batch_size)
+        )
+        claimed = db.session.execute(
+            db.update(OutboxEvent)
+            .where(OutboxEvent.id.in_(candidates.scalar_subquery()),
+                   db.or_(OutboxEvent.claimed_until.is_(None), OutboxEvent.claimed_until < now))
+            .values(claim_token=token, claimed_until=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return []
+        return OutboxEvent.query.filter_by(claim_token=token).order_by(OutboxEvent.id).all()
+
+    def _schedule_retry(self, events, error, max_attempts):
+        now = datetime.utcnow()
+        for event in events:
+            event.attempts += 1
+            event.last_error = error
+            event.claim_token = None
+            event.claimed_until = None
+            if event.attempts >= max_attempts:
+                event.processed_at = now
+                logger.error('Dead-lettered outbox event %s after %d attempts', event.id, event.attempts)
+            else:
+                event.available_at = now + timedelta(seconds=2 ** event.attempts)
+        db.session.commit()
+
+outbox_worker = OutboxWorker()
@@ -0,0 +1,72 @@
+import logging
+import os
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from cache import MemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+CARD_TEMPLATE = 'macros/project_cards.html'
+
+class FragmentCache:
+    """Caches rendered project cards by (layout, id, updated_at, counters).
+
+    The key changes whenever anything shown on the card does (content
+    edits bump updated_at, counter updates change the counters), so
+    entries never need invalidating; stale ones age out of the LRU.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.hits = self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FRAGMENT_CACHE_ENABLED', True)
+        app.config.setdefault('FRAGMENT_CACHE_MAX_ENTRIES', 4096)
+        app.config.setdefault('TEMPLATE_PRECOMPILE', True)
+        app.config.setdefault('JINJA_BYTECODE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+        app.extensions['fragment_cache'] = self
+        self.backend = MemoryCacheBackend(app.config['FRAGMENT_CACHE_MAX_ENTRIES']) if app.config['FRAGMENT_CACHE_ENABLED'] else None
+        app.add_template_global(self.project_card)
+
+        # Compiled templates are shared by every worker through the filesystem
+        cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        if app.config['TEMPLATE_PRECOMPILE']:
+            precompile_templates(app.jinja_env)
+
+    def project_card(self, project, layout='listing'):
+        """Render one project card (a macro in macros/project_cards.html), cached"""
+        macro = getattr(current_app.jinja_env.get_template(CARD_TEMPLATE).module, layout)
+        if self.backend is None:
+            return macro(project)
+        key = f'{layout}|{project.id}|{project.updated_at}|{project.like_count}|{project.comment_count}'
+        html = self.backend.get(key)
+        if html is None:
+            self.misses += 1
+            html = str(macro(project))
+            # Versioned keys never go stale, so the TTL only bounds idle entries
+            self.backend.set(key, html, 86400, ())
+        else:
+            self.hits += 1
+        return Markup(html)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+def precompile_templates(env):
+    """Load every template once so workers forked after this start with them compiled"""
+    count = 0
+    for name in env.list_templates(extensions=('html',)):
+        env.get_template(name)
+        count += 1
+    logger.debug('Precompiled %d templates', count)
+    return count
+
+fragment_cache = FragmentCache()
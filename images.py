@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import db
+from storage import upload_url
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; uploads are then served as-is
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Width buckets generated for every upload (never upscaled past the original)
+VARIANT_WIDTHS = {'thumbnail': 400, 'card': 800, 'hero': 1600}
+FORMATS = {'webp': ('WEBP', {'quality': 80, 'method': 4}),
+           'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True})}
+
+def generate_variants(upload_folder, image_url):
+    """Write resized WebP/JPEG copies of an uploaded image and describe them.
+
+    Returns {"thumbnail": {"width": 400, "webp": "uploads/...", "jpeg": ...}, ...}.
+    """
+    source_path = os.path.join(upload_folder, os.path.basename(image_url))
+    stem = os.path.splitext(os.path.basename(image_url))[0]
+    url_dir = os.path.dirname(image_url)
+    variants = {}
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+        rendered = {}
+        for name, width in VARIANT_WIDTHS.items():
+            width = min(width, original.width)
+            if width not in rendered:
+                height = max(1, round(original.height * width / original.width))
+                resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+                files = {}
+                for fmt, (pil_format, options) in FORMATS.items():
+                    image = resized.convert('RGB') if pil_format == 'JPEG' and resized.mode != 'RGB' else resized
+                    filename = f'{stem}_{width}w.{"jpg" if fmt == "jpeg" else fmt}'
+                    target = os.path.join(upload_folder, filename)
+                    # Variants of a content-addressed blob are already up to date if present
+                    if not os.path.exists(target):
+                        image.save(target, pil_format, **options)
+                    files[fmt] = f'{url_dir}/{filename}'
+                rendered[width] = files
+            variants[name] = {'width': width, **rendered[width]}
+    return variants
+
+class ImagePipeline:
+    """Generates image variants on a background thread pool.
+
+    The pool is created lazily per process so it is safe to use from
+    forked gunicorn workers.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_WORKERS', 2)
+        app.extensions['image_pipeline'] = self
+        app.add_template_global(image_srcset)
+        app.add_template_global(image_variant_url)
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def submit(self, project_id, image_url):
+        if not self.enabled or not image_url:
+            return None
+        app = current_app._get_current_object()
+        return self._get_executor(app).submit(self._process, app, project_id, image_url)
+
+    def process_now(self, project_id, image_url):
+        return self._process(current_app._get_current_object(), project_id, image_url)
+
+    def _get_executor(self, app):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'],
+                                                    thread_name_prefix='image-pipeline')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _process(self, app, project_id, image_url):
+        from models import Project
+        with app.app_context():
+            try:
+                variants = generate_variants(app.config['UPLOAD_FOLDER'], image_url)
+            except Exception:
+                logger.exception('Could not generate variants for %s', image_url)
+                return None
+            project = db.session.get(Project, project_id)
+            # Skip if the image was replaced while we were working
+            if project is not None and project.image_url == image_url:
+                project.image_variants = variants
+                db.session.commit()
+            return variants
+
+def image_variant_url(project, name='card', fmt='jpeg'):
+    variant = (project.image_variants or {}).get(name)
+    if variant:
+        return upload_url(variant[fmt])
+    return upload_url(project.image_url)
+
+def image_srcset(project, fmt='webp'):
+    widths = {}
+    for variant in (project.image_variants or {}).values():
+        widths[variant['width']] = variant[fmt]
+    return ', '.join(f'{upload_url(path)} {width}w' for width, path in sorted(widths.items()))
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,146 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db
+from background import PeriodicWorker
+from cache import response_cache
+from models import Like, Project, adjust_site_stats
+from rollups import activity_rollups
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+class LikeEngine(PeriodicWorker):
+    """Toggles likes with single statements and coalesces counter updates.
+
+    Like rows are written immediately (they are the source of truth), but
+    the Project.like_count deltas are accumulated in memory and flushed in
+    one executemany every LIKE_FLUSH_INTERVAL seconds, so a burst of clicks
+    on a popular project costs one counter UPDATE instead of one per click.
+    Deltas still pending when a process dies are recovered by
+    `flask reconcile-counters`.
+    """
+
+    name = 'like-flusher'
+
+    def __init__(self):
+        super().__init__()
+        self._pending = defaultdict(int)
+        self._pending_lock = threading.Lock()
+        self.flushes = 0
+
+    def init_app(self, app):
+        app.config.setdefault('LIKE_FLUSH_INTERVAL', 1.0)
+        app.extensions['like_engine'] = self
+        self.interval = app.config['LIKE_FLUSH_INTERVAL']
+        app.add_template_global(self.count, 'like_count')
+        atexit.register(self._flush_at_exit, app)
+        sa_event.listen(Session, 'after_commit', self._publish_after_commit)
+        sa_event.listen(Session, 'after_soft_rollback', self._discard_after_rollback)
+
+    def toggle(self, user_id, project_id):
+        """Like or unlike; returns whether the user now likes the project.
+
+        The caller commits. Liking is a single INSERT ... ON CONFLICT DO
+        NOTHING; only when that inserts nothing does a DELETE follow. The
+        counter delta only becomes pending once the transaction commits.
+        """
+        if self._insert_ignore(user_id, project_id):
+            delta, liked, created = 1, True, [None]
+        else:
+            # RETURNING gives the rollups the hour the like was counted in
+            created = db.session.execute(
+                db.delete(Like).where(Like.user_id == user_id, Like.project_id == project_id)
+                .returning(Like.created_at).execution_options(synchronize_session=False)
+            ).scalars().all()
+            delta, liked = -len(created), False
+        if delta:
+            staged = db.session.info.setdefault('like_deltas', defaultdict(int))
+            staged[project_id] += delta
+            # Core statements skip the Like mapper events, so the rollups are told directly
+            for created_at in created:
+                activity_rollups.stage(db.session, project_id, likes=1 if liked else -1, at=created_at)
+            self.ensure_started(current_app._get_current_object())
+        return liked
+
+    def pending(self, project_id):
+        return self._pending.get(project_id, 0)
+
+    def count(self, project):
+        """Like count including this process's not yet flushed clicks"""
+        return project.like_count + self.pending(project.id)
+
+    def _publish_after_commit(self, session):
+        staged = session.info.pop('like_deltas', None)
+        if staged:
+            with self._pending_lock:
+                for project_id, delta in staged.items():
+                    self._pending[project_id] += delta
+
+    def _discard_after_rollback(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop('like_deltas', None)
+
+    def run_once(self):
+        self.flush()
+        return False
+
+    def flush(self):
+        with self._pending_lock:
+            deltas = {project_id: delta for project_id, delta in self._pending.items() if delta}
+            self._pending.clear()
+        if not deltas:
+            return 0
+        table = Project.__table__
+        try:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == db.bindparam('project_id'))
+                .values(like_count=table.c.like_count + db.bindparam('delta'),
+                        updated_at=table.c.updated_at, last_activity_at=datetime.utcnow()),
+                [{'project_id': project_id, 'delta': delta} for project_id, delta in deltas.items()],
+            )
+            adjust_site_stats(db.session, total_likes=sum(deltas.values()))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._pending_lock:
+                for project_id, delta in deltas.items():
+                    self._pending[project_id] += delta
+            raise
+        self.flushes += 1
+        response_cache.invalidate(*(f'project:{project_id}' for project_id in deltas))
+        return len(deltas)
+
+    def _insert_ignore(self, user_id, project_id):
+        values = {'user_id': user_id, 'project_id': project_id, 'created_at': datetime.utcnow()}
+        upsert = _UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if upsert is not None:
+            statement = upsert(Like).values(**values).on_conflict_do_nothing(index_elements=['user_id', 'project_id'])
+            return db.session.execute(statement).rowcount == 1
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(Like).values(**values))
+            return True
+        except IntegrityError:
+            return False
+
+    def _flush_at_exit(self, app):
+        if self._pending and self._pid in (None, os.getpid()):
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Could not flush pending like counts at exit')
+
+like_engine = LikeEngine()
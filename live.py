@@ -0,0 +1,151 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from app import db
+from background import PeriodicWorker
+from likes import like_engine
+from models import Project
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One open stream: the topics it listens to and a bounded outbox of frames"""
+
+    def __init__(self, topics, max_queued):
+        self.topics = frozenset(topics)
+        self.queue = queue.Queue(max_queued)
+        self.closed = False
+
+    def send(self, frame):
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            # A stalled client is dropped; EventSource reconnects and resyncs
+            self.closed = True
+
+class LiveHub(PeriodicWorker):
+    """In-process pub/sub behind the /events/stream Server-Sent Events endpoint.
+
+    Topics are 'project:<id>' for public counters and 'admin' for new
+    notifications. Like and comment changes are not sent one by one:
+    deltas are summed per project and published every
+    LIVE_COALESCE_INTERVAL seconds together with the current counts, so a
+    burst of clicks becomes one frame per project. The hub only reaches
+    streams held by this process, and each open stream holds one of its
+    request threads, so LIVE_MAX_STREAMS stays well below the thread count.
+    """
+
+    name = 'live-hub'
+
+    def __init__(self):
+        super().__init__()
+        self._subscriptions = set()
+        self._topics = defaultdict(set)
+        self._lock = threading.Lock()
+        self._deltas = defaultdict(lambda: {'likes': 0, 'comments': 0})
+        self._deltas_lock = threading.Lock()
+        self.published = 0
+
+    def init_app(self, app):
+        app.config.setdefault('LIVE_COALESCE_INTERVAL', 1.0)
+        app.config.setdefault('LIVE_MAX_STREAMS', 16)
+        app.config.setdefault('LIVE_HEARTBEAT', 15)
+        app.config.setdefault('LIVE_STREAM_MAX_AGE', 300)
+        app.config.setdefault('LIVE_MAX_QUEUED', 100)
+        app.extensions['live_hub'] = self
+        self.interval = app.config['LIVE_COALESCE_INTERVAL']
+
+    @property
+    def stream_count(self):
+        return len(self._subscriptions)
+
+    def has_subscribers(self, topic):
+        return bool(self._topics.get(topic))
+
+    def subscribe(self, topics):
+        """Register a stream; returns None when this process is at LIVE_MAX_STREAMS"""
+        config = current_app.config
+        subscription = Subscription(topics, config['LIVE_MAX_QUEUED'])
+        with self._lock:
+            if len(self._subscriptions) >= config['LIVE_MAX_STREAMS']:
+                return None
+            self._subscriptions.add(subscription)
+            for topic in subscription.topics:
+                self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def publish(self, topic, event, data):
+        """Send an event to every stream subscribed to topic"""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        if not subscribers:
+            return 0
+        frame = f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+        for subscription in subscribers:
+            subscription.send(frame)
+        self.published += 1
+        return len(subscribers)
+
+    def counter_changed(self, project_id, likes=0, comments=0):
+        """Queue a committed like/comment delta for the next coalesced frame"""
+        if not self.has_subscribers(f'project:{project_id}'):
+            return
+        with self._deltas_lock:
+            delta = self._deltas[project_id]
+            delta['likes'] += likes
+            delta['comments'] += comments
+        self.ensure_started(current_app._get_current_object())
+
+    def run_once(self):
+        with self._deltas_lock:
+            deltas, self._deltas = self._deltas, defaultdict(lambda: {'likes': 0, 'comments': 0})
+        if not deltas:
+            return False
+        counts = db.session.execute(
+            db.select(Project.id, Project.like_count, Project.comment_count).where(Project.id.in_(list(deltas)))
+        ).all()
+        db.session.rollback()
+        for project_id, like_count, comment_count in counts:
+            delta = deltas[project_id]
+            self.publish(f'project:{project_id}', 'counts', {
+                'project_id': project_id,
+                'like_count': like_count + like_engine.pending(project_id),
+                'comment_count': comment_count,
+                'like_delta': delta['likes'],
+                'comment_delta': delta['comments'],
+            })
+        return False
+
+    def stream(self, subscription, heartbeat, max_age):
+        """Yield SSE frames until the client goes away or max_age passes.
+
+        Idle streams only wake for heartbeats, which keep proxies from
+        closing the connection. Ending after max_age lets the worker
+        recycle the connection; EventSource reconnects on its own.
+        """
+        deadline = time.monotonic() + max_age
+        try:
+            yield 'retry: 3000\n\n'
+            while not subscription.closed and time.monotonic() < deadline:
+                try:
+                    yield subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+live_hub = LiveHub()
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app import db
+from models import About, CacheVersion, User
+
+logger = logging.getLogger(__name__)
+
+class LocalCache:
+    """Process-local cache of small, rarely written data, invalidated by version stamps.
+
+    Each namespace ('about', 'users') has a row in cache_version that is
+    bumped in the same transaction as any write to its model. A worker
+    reads all stamps in one query at most every LOCAL_CACHE_CHECK_INTERVAL
+    seconds and drops entries cached under an older stamp, so other
+    workers see a change within that interval; the writing process drops
+    its own entries as soon as the transaction commits.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.check_interval = 2.0
+        self._versions = {}
+        self._entries = {}  # namespace -> {key: (version, value)}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.version_checks = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LOCAL_CACHE_ENABLED', True)
+        app.config.setdefault('LOCAL_CACHE_CHECK_INTERVAL', 2.0)
+        app.extensions['local_cache'] = self
+        self.enabled = app.config['LOCAL_CACHE_ENABLED']
+        self.check_interval = app.config['LOCAL_CACHE_CHECK_INTERVAL']
+        self.clear()
+
+    def get(self, namespace, key, loader):
+        """The cached value for (namespace, key), calling loader() on a miss.
+
+        None results are not cached, so a missing row is looked up again.
+        """
+        if not self.enabled:
+            return loader()
+        version = self._current_version(namespace)
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            # Tagged with the stamp read before loading: a concurrent bump only causes a reload
+            with self._lock:
+                self._entries.setdefault(namespace, {})[key] = (version, value)
+        return value
+
+    def invalidate(self, *namespaces):
+        """Drop this process's entries now and re-read the stamps on the next lookup"""
+        with self._lock:
+            for namespace in namespaces:
+                self._entries.pop(namespace, None)
+            self._checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._checked_at = 0.0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': sum(len(entries) for entries in self._entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'version_checks': self.version_checks,
+        }
+
+    def _current_version(self, namespace):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            versions = dict(db.session.execute(db.select(CacheVersion.name, CacheVersion.version)).all())
+            with self._lock:
+                for name in list(self._entries):
+                    if versions.get(name, 0) != self._versions.get(name, 0):
+                        del self._entries[name]
+                self._versions = versions
+                self._checked_at = now
+            self.version_checks += 1
+        return self._versions.get(namespace, 0)
+
+class SessionUser(UserMixin):
+    """The identity Flask-Login needs on every request, without a User row.
+
+    Templates and views only read id, username and is_admin from
+    current_user; anything that needs the full row loads it explicitly.
+    """
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+
+    def __repr__(self):
+        return f'<SessionUser {self.username}>'
+
+def load_session_user(user_id):
+    """Flask-Login user loader backed by the 'users' namespace"""
+    def load():
+        row = db.session.execute(
+            db.select(User.id, User.username, User.is_admin).where(User.id == int(user_id))
+        ).first()
+        return SessionUser(row.id, row.username, bool(row.is_admin)) if row else None
+    return local_cache.get('users', int(user_id), load)
+
+def bump_cache_version(connection, *names):
+    """Advance the stamps for names in the caller's transaction"""
+    table = CacheVersion.__table__
+    for name in names:
+        updated = connection.execute(
+            table.update().where(table.c.name == name).values(version=table.c.version + 1)
+        ).rowcount
+        if not updated:
+            connection.execute(table.insert().values(name=name, version=1))
+
+def _bump_for(namespace):
+    def listener(mapper, connection, target):
+        bump_cache_version(connection, namespace)
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('local_cache_bumps', set()).add(namespace)
+    return listener
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(About, _event, _bump_for('about'))
+# A new user has no cached entry (misses aren't cached), so only changes and deletes bump
+for _event in ('after_update', 'after_delete'):
+    event.listen(User, _event, _bump_for('users'))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(db_session):
+    namespaces = db_session.info.pop('local_cache_bumps', None)
+    if namespaces:
+        local_cache.invalidate(*namespaces)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_bumps(db_session, previous_transaction):
+    if previous_transaction.parent is None:
+        db_session.info.pop('local_cache_bumps', None)
+
+local_cache = LocalCache()
@@ -1,7 +1,9 @@
+from collections import defaultdict
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
 from app import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -16,20 +18,51 @@ class User(UserMixin, db.Model):
     likes = db.relationship('Like', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from auth import password_hasher
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify the password, upgrading the stored hash if the cost profile changed.
+
+        The caller commits; an upgraded hash is only an attribute change.
+        """
+        from auth import password_hasher
+        matches, needs_rehash = password_hasher.verify(self.password_hash, password)
+        if needs_rehash:
+            self.password_hash = password_hasher.hash(password)
+        return matches
     
     def __repr__(self):
         return f'<User {self.username}>'
 
+# Normalized tags; Project.tags (the comma-separated string) stays the editable source
+project_tag = db.Table(
+    'project_tag',
+    db.Column('project_id', db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves project -> tags; this serves tag -> projects
+    db.Index('ix_project_tag_tag', 'tag_id', 'project_id'),
+)
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    slug = db.Column(db.String(64), unique=True, nullable=False)
+    # Published projects carrying this tag, refreshed by tags.py when projects change
+    project_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    __table_args__ = (db.Index('ix_tag_cloud', 'project_count', 'name'),)
+    
+    def __repr__(self):
+        return f'<Tag {self.slug}>'
+
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     content = db.Column(db.Text)
     image_url = db.Column(db.String(500))
+    image_variants = db.Column(db.JSON)  # Resized WebP/JPEG copies, see images.generate_variants
     demo_url = db.Column(db.String(500))
     github_url = db.Column(db.String(500))
     category = db.Column(db.String(100))
@@ -37,26 +70,50 @@ class Project(db.Model):
     is_published = db.Column(db.Boolean, default=False)
     is_featured = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Bumped by like/comment activity, which leaves updated_at alone
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # Denormalized counters, maintained by the Like/Comment mapper events below
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     comments = db.relationship('Comment', backref='project', lazy='dynamic', cascade='all, delete-orphan')
     likes = db.relationship('Like', backref='project', lazy='dynamic', cascade='all, delete-orphan')
+    tag_objects = db.relationship('Tag', secondary=project_tag, order_by='Tag.name', backref=db.backref('projects', lazy='dynamic'))
     
-    @property
-    def like_count(self):
-        return self.likes.count()
+    # Keyset pagination indexes for the public and admin listings
+    __table_args__ = (
+        db.Index('ix_project_published_created', 'is_published', 'created_at', 'id'),
+        db.Index('ix_project_created', 'created_at', 'id'),
+        # Featured strip on the home page
+        db.Index('ix_project_featured', 'is_published', 'is_featured', 'created_at'),
+    )
     
     def get_tags_list(self):
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
-        return []
+        return [tag.name for tag in self.tag_objects]
+    
+    def cache_tags(self):
+        return {'projects', f'project:{self.id}'}
     
     def is_liked_by(self, user):
         if user and user.is_authenticated:
             return self.likes.filter_by(user_id=user.id).first() is not None
         return False
     
+    @classmethod
+    def reconcile_counters(cls, project_ids=None):
+        """Rebuild like_count/comment_count from the likes and comments tables (all projects, or the given ids)"""
+        like_total = db.select(db.func.count(Like.id)).where(Like.project_id == cls.id).scalar_subquery()
+        comment_total = db.select(db.func.count(Comment.id)).where(Comment.project_id == cls.id).scalar_subquery()
+        statement = db.update(cls).values(like_count=like_total, comment_count=comment_total, updated_at=cls.updated_at)
+        if project_ids is not None:
+            statement = statement.where(cls.id.in_(list(project_ids)))
+        result = db.session.execute(statement.execution_options(synchronize_session=False))
+        db.session.commit()
+        return result.rowcount
+    
     def __repr__(self):
         return f'<Project {self.title}>'
 
@@ -70,6 +127,12 @@ class Comment(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     
+    # Keyset pagination of a project's comment thread
+    __table_args__ = (db.Index('ix_comment_project_created', 'project_id', 'created_at', 'id'),)
+    
+    def cache_tags(self):
+        return {f'project:{self.project_id}'}
+    
     def __repr__(self):
         return f'<Comment {self.id}>'
 
@@ -82,20 +145,100 @@ class Like(db.Model):
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     
     # Ensure one like per user per project
-    __table_args__ = (db.UniqueConstraint('user_id', 'project_id', name='unique_user_project_like'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'project_id', name='unique_user_project_like'),
+        # The unique constraint leads with user_id; per-project counts need their own index
+        db.Index('ix_like_project', 'project_id'),
+    )
+    
+    def cache_tags(self):
+        return {f'project:{self.project_id}'}
     
     def __repr__(self):
         return f'<Like {self.id}>'
 
+def _adjust_project_counter(connection, project_id, column, delta):
+    # Counter-only change: keep updated_at pinned so it still tracks content edits
+    table = Project.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == project_id)
+        .values({column: table.c[column] + delta, 'updated_at': table.c.updated_at,
+                 'last_activity_at': datetime.utcnow()})
+    )
+
+def adjust_site_stats(session, **deltas):
+    """Stage counter deltas for the SiteStats row; stats.site_stats_buffer writes them once session commits"""
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if session is None or not deltas:
+        return
+    staged = session.info.setdefault('site_stats_deltas', defaultdict(int))
+    for column, delta in deltas.items():
+        staged[column] += delta
+
+@event.listens_for(Like, 'after_insert')
+def _like_inserted(mapper, connection, target):
+    _adjust_project_counter(connection, target.project_id, 'like_count', 1)
+    adjust_site_stats(object_session(target), total_likes=1)
+
+@event.listens_for(Like, 'after_delete')
+def _like_deleted(mapper, connection, target):
+    _adjust_project_counter(connection, target.project_id, 'like_count', -1)
+    adjust_site_stats(object_session(target), total_likes=-1)
+
+@event.listens_for(Comment, 'after_insert')
+def _comment_inserted(mapper, connection, target):
+    _adjust_project_counter(connection, target.project_id, 'comment_count', 1)
+    adjust_site_stats(object_session(target), total_comments=1)
+
+@event.listens_for(Comment, 'after_delete')
+def _comment_deleted(mapper, connection, target):
+    _adjust_project_counter(connection, target.project_id, 'comment_count', -1)
+    adjust_site_stats(object_session(target), total_comments=-1)
+
+def _flag_change(target, attribute):
+    # +1 when the flag was switched on in this flush, -1 when switched off
+    history = inspect(target).attrs[attribute].history
+    if not history.has_changes():
+        return 0
+    return int(bool(history.added and history.added[0])) - int(bool(history.deleted and history.deleted[0]))
+
+@event.listens_for(Project, 'after_insert')
+def _project_inserted(mapper, connection, target):
+    adjust_site_stats(object_session(target), total_projects=1, published_projects=int(bool(target.is_published)))
+
+@event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, target):
+    adjust_site_stats(object_session(target), published_projects=_flag_change(target, 'is_published'))
+
+@event.listens_for(Project, 'after_delete')
+def _project_deleted(mapper, connection, target):
+    adjust_site_stats(object_session(target), total_projects=-1, published_projects=-int(bool(target.is_published)))
+
 class About(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    def cache_tags(self):
+        return {'about'}
+    
     @classmethod
     def get_content(cls):
+        return cls.cached()['content']
+    
+    @classmethod
+    def cached(cls):
+        """{'content', 'updated_at'} of the About row, from the process-local cache"""
+        from local_cache import local_cache
+        return local_cache.get('about', 'content', cls._load)
+    
+    @classmethod
+    def _load(cls):
         about = cls.query.first()
-        return about.content if about else "Welcome to my portfolio! More information coming soon."
+        if about is None:
+            return {'content': "Welcome to my portfolio! More information coming soon.", 'updated_at': None}
+        return {'content': about.content, 'updated_at': about.updated_at}
     
     @classmethod
     def update_content(cls, content):
@@ -118,6 +261,131 @@ class Notification(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # User who triggered the notification
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'))  # Related project
     comment_id = db.Column(db.Integer, db.ForeignKey('comment.id'))  # Related comment
+    archived_at = db.Column(db.DateTime)  # Hidden from the inbox, kept until compacted
+    
+    __table_args__ = (
+        # Retention compaction: old read rows
+        db.Index('ix_notification_read_created', 'is_read', 'created_at'),
+        # Keyset-paginated inbox and archive listings
+        db.Index('ix_notification_inbox', 'archived_at', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f'<Notification {self.title}>'
+
+@event.listens_for(Notification, 'after_insert')
+def _notification_inserted(mapper, connection, target):
+    adjust_site_stats(object_session(target), unread_notifications=int(not target.is_read))
+
+@event.listens_for(Notification, 'after_update')
+def _notification_updated(mapper, connection, target):
+    adjust_site_stats(object_session(target), unread_notifications=-_flag_change(target, 'is_read'))
+
+@event.listens_for(Notification, 'after_delete')
+def _notification_deleted(mapper, connection, target):
+    adjust_site_stats(object_session(target), unread_notifications=-int(not target.is_read))
+
+class OutboxEvent(db.Model):
+    """Domain event written in the same transaction as the change that caused it"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Delivery state, managed by events.OutboxWorker
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    claim_token = db.Column(db.String(32), index=True)
+    claimed_until = db.Column(db.DateTime)
+    processed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    
+    __table_args__ = (db.Index('ix_outbox_event_pending', 'processed_at', 'available_at'),)
+    
+    def __repr__(self):
+        return f'<OutboxEvent {self.kind} {self.id}>'
+
+class SiteStats(db.Model):
+    """Single-row snapshot of the admin dashboard totals.
+
+    Kept current by adjust_site_stats() from the mapper events above and
+    from the bulk writers (like flusher, outbox, mark-all-read), so reading
+    it costs one primary-key lookup however large the tables grow. The
+    deltas are coalesced by stats.site_stats_buffer rather than written by
+    every transaction, so the row isn't a lock every write waits on.
+    stats.rebuild_site_stats() recomputes it from scratch.
+    """
+    __tablename__ = 'site_stats'
+    
+    SINGLETON_ID = 1
+    
+    id = db.Column(db.Integer, primary_key=True)
+    total_projects = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    published_projects = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_comments = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_likes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SiteStats {self.updated_at}>'
+
+class ProjectNeighbor(db.Model):
+    """Precomputed "related projects": the top-k most similar published projects per project.
+
+    Maintained by related.py; the project page reads a project's list
+    with one primary-key range scan.
+    """
+    __tablename__ = 'project_neighbor'
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Incremental rebuilds look up the lists a changed project appears in
+    __table_args__ = (db.Index('ix_project_neighbor_neighbor', 'neighbor_id'),)
+    
+    def __repr__(self):
+        return f'<ProjectNeighbor {self.project_id}#{self.rank} -> {self.neighbor_id}>'
+
+class ActivityRollup(db.Model):
+    """Likes, comments and views per project per hour and per day.
+
+    Maintained by rollups.py from deltas buffered in memory; trending and
+    the dashboard charts read these rows instead of scanning likes and
+    comments. Hourly rows are pruned after ROLLUP_HOURLY_RETENTION_DAYS,
+    daily rows are kept.
+    """
+    __tablename__ = 'activity_rollup'
+    
+    HOUR = 'hour'
+    DAY = 'day'
+    
+    granularity = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)  # Start of the hour or day (UTC)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
+    likes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comments = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    views = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # The primary key serves site-wide ranges; this serves one project's series
+    __table_args__ = (db.Index('ix_activity_rollup_project', 'project_id', 'granularity', 'bucket'),)
+    
+    def __repr__(self):
+        return f'<ActivityRollup {self.granularity} {self.bucket} #{self.project_id}>'
+
+class CacheVersion(db.Model):
+    """Per-namespace version stamps for the process-local caches in local_cache.py.
+
+    Writes bump the stamp in their own transaction; workers compare it
+    with the version they cached at most every LOCAL_CACHE_CHECK_INTERVAL.
+    """
+    __tablename__ = 'cache_version'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
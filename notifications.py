@@ -0,0 +1,115 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from background import PeriodicWorker
+from models import Notification, SiteStats, adjust_site_stats
+from pagination import keyset_page
+from stats import site_stats_buffer
+
+logger = logging.getLogger(__name__)
+
+def inbox_page(cursor=None, per_page=50, archived=False):
+    """Newest-first keyset page of the inbox (or the archive), served from ix_notification_inbox"""
+    if archived:
+        query = Notification.query.filter(Notification.archived_at.isnot(None))
+    else:
+        query = Notification.query.filter(Notification.archived_at.is_(None))
+    return keyset_page(query, Notification, cursor, per_page)
+
+def unread_count():
+    """Unread notifications from the site_stats snapshot: one primary-key lookup"""
+    stored = db.session.execute(
+        db.select(SiteStats.unread_notifications).where(SiteStats.id == SiteStats.SINGLETON_ID)
+    ).scalar() or 0
+    return stored + site_stats_buffer.pending('unread_notifications')
+
+def mark_notifications_read(ids):
+    """Mark the given notifications read; returns how many were unread"""
+    if not ids:
+        return 0
+    marked = db.session.execute(
+        db.update(Notification).where(Notification.id.in_(ids), Notification.is_read.is_(False))
+        .values(is_read=True).execution_options(synchronize_session=False)
+    ).rowcount
+    adjust_site_stats(db.session, unread_notifications=-marked)
+    return marked
+
+def archive_notifications(ids):
+    """Move notifications out of the inbox; archiving also marks them read"""
+    if not ids:
+        return 0
+    mark_notifications_read(ids)
+    return db.session.execute(
+        db.update(Notification).where(Notification.id.in_(ids), Notification.archived_at.is_(None))
+        .values(archived_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    ).rowcount
+
+def delete_notifications(ids):
+    """Delete notifications in one statement, keeping the unread counter exact"""
+    if not ids:
+        return 0
+    unread = db.session.execute(
+        db.select(db.func.count(Notification.id)).where(Notification.id.in_(ids), Notification.is_read.is_(False))
+    ).scalar()
+    deleted = db.session.execute(
+        db.delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    adjust_site_stats(db.session, unread_notifications=-unread)
+    return deleted
+
+def compact_notifications(retention_days, batch_size=500):
+    """Delete one batch of read notifications older than retention_days; returns how many.
+
+    Unread rows are never touched, so the unread counter is unaffected.
+    The candidates come from ix_notification_read_created.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    candidates = (
+        db.select(Notification.id)
+        .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+        .limit(batch_size)
+    )
+    deleted = db.session.execute(
+        db.delete(Notification).where(Notification.id.in_(candidates.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+class NotificationCompactor(PeriodicWorker):
+    """Deletes read notifications past NOTIFICATION_RETENTION_DAYS in small batches.
+
+    Each batch is its own short transaction so compaction never holds the
+    write lock for long; a full batch is followed by the next one right away.
+    """
+
+    name = 'notification-compactor'
+
+    def __init__(self):
+        super().__init__()
+        self.compacted = 0
+
+    def init_app(self, app):
+        app.config.setdefault('NOTIFICATIONS_PER_PAGE', 50)
+        app.config.setdefault('NOTIFICATION_RETENTION_DAYS', 90)
+        app.config.setdefault('NOTIFICATION_COMPACT_BATCH', 500)
+        app.config.setdefault('NOTIFICATION_COMPACT_INTERVAL', 3600)
+        app.extensions['notification_compactor'] = self
+        self.interval = app.config['NOTIFICATION_COMPACT_INTERVAL']
+        app.add_template_global(unread_count, 'unread_notification_count')
+
+        if app.config['NOTIFICATION_RETENTION_DAYS'] > 0:
+            @app.before_request
+            def _start_notification_compactor():
+                self.ensure_started(app)
+
+    def run_once(self):
+        batch_size = current_app.config['NOTIFICATION_COMPACT_BATCH']
+        deleted = compact_notifications(current_app.config['NOTIFICATION_RETENTION_DAYS'], batch_size)
+        if deleted:
+            self.compacted += deleted
+            logger.info('Compacted %d read notification(s)', deleted)
+        return deleted == batch_size
+
+notification_compactor = NotificationCompactor()
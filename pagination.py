@@ -0,0 +1,73 @@
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import tuple_
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row shown into an opaque URL token"""
+    raw = '|'.join(value.isoformat() if isinstance(value, datetime) else str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return raw.split('|')
+
+class Page:
+    """A lazily fetched page of at most per_page rows.
+
+    Rows are pulled from the database while the template iterates, so a
+    streamed response can flush each card as soon as its row arrives.
+    next_cursor is known once iteration has finished.
+    """
+
+    def __init__(self, query, per_page, cursor_for):
+        self._query = query.limit(per_page + 1)
+        self._cursor_for = cursor_for
+        self._items = None
+        self.per_page = per_page
+        self.next_cursor = None
+
+    def __iter__(self):
+        if self._items is not None:
+            yield from self._items
+            return
+        items = []
+        for row in self._query.yield_per(self.per_page + 1):
+            if len(items) == self.per_page:
+                self.next_cursor = self._cursor_for(items[-1], len(items))
+                break
+            items.append(row)
+            yield row
+        self._items = items
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+def keyset_page(query, model, cursor=None, per_page=24):
+    """Newest-first page of model rows after the (created_at, id) cursor.
+
+    Backed by composite (created_at, id) indexes, so the cost of a page
+    does not depend on how deep into the listing it is.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    position = decode_cursor(cursor)
+    if position and len(position) == 2:
+        try:
+            created_at, last_id = datetime.fromisoformat(position[0]), int(position[1])
+        except ValueError:
+            pass
+        else:
+            query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, last_id))
+    return Page(query, per_page, lambda row, count: encode_cursor(row.created_at, row.id))
+
+def offset_page(query, cursor=None, per_page=24):
+    """Page over a query whose order has no stable key (e.g. search relevance)"""
+    position = decode_cursor(cursor)
+    offset = int(position[0]) if position and len(position) == 1 and position[0].isdigit() else 0
+    return Page(query.offset(offset), per_page, lambda row, count: encode_cursor(offset + count))
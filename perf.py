@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import before_render_template, g, has_request_context, request, request_finished, request_started, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float('inf'))
+
+class EndpointStats:
+    """Aggregated timings of one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.max_queries = 0
+        self.slowest = {}  # statement -> slowest duration seen
+
+    def record(self, duration, queries, db_time, render_time, statements, keep):
+        self.requests += 1
+        self.buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+        self.duration += duration
+        self.queries += queries
+        self.db_time += db_time
+        self.render_time += render_time
+        self.max_queries = max(self.max_queries, queries)
+        for statement, elapsed in statements:
+            if elapsed > self.slowest.get(statement, 0):
+                self.slowest[statement] = elapsed
+        if len(self.slowest) > keep:
+            self.slowest = dict(sorted(self.slowest.items(), key=lambda item: item[1], reverse=True)[:keep])
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of requests"""
+        target = fraction * self.requests
+        seen = 0
+        for bound, count in zip(DURATION_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return DURATION_BUCKETS[-1]
+
+    def as_dict(self):
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'avg_ms': round(1000 * self.duration / requests, 2),
+            'p50_ms': 1000 * self.percentile(0.5),
+            'p95_ms': 1000 * self.percentile(0.95),
+            'avg_queries': round(self.queries / requests, 2),
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(1000 * self.db_time / requests, 2),
+            'avg_render_ms': round(1000 * self.render_time / requests, 2),
+            'slowest': [{'statement': statement, 'ms': round(1000 * elapsed, 2)}
+                        for statement, elapsed in sorted(self.slowest.items(), key=lambda item: item[1], reverse=True)],
+        }
+
+class PerfMonitor:
+    """Per-request SQL and template timing, aggregated per endpoint.
+
+    SQLAlchemy cursor events count and time every statement issued while
+    a request is active; Flask signals time the request and its template
+    rendering. Statements slower than PERF_SLOW_QUERY_MS are logged; their
+    bound parameters (password hashes, emails, comment text) only with
+    PERF_LOG_PARAMETERS. Figures are kept in memory per process.
+    """
+
+    def __init__(self, app=None):
+        self.endpoints = {}
+        self.slow_queries = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PERF_ENABLED', True)
+        app.config.setdefault('PERF_SLOW_QUERY_MS', 250)
+        app.config.setdefault('PERF_SLOWEST_STATEMENTS', 5)
+        app.config.setdefault('PERF_LOG_PARAMETERS', False)
+        app.config.setdefault('PERF_METRICS_TOKEN', None)
+        app.extensions['perf_monitor'] = self
+        if not app.config['PERF_ENABLED']:
+            return
+        self.slow_query_seconds = app.config['PERF_SLOW_QUERY_MS'] / 1000
+        self.keep_statements = app.config['PERF_SLOWEST_STATEMENTS']
+        self.log_parameters = app.config['PERF_LOG_PARAMETERS']
+
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        request_started.connect(self._request_started, app)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        request_finished.connect(self._request_finished, app)
+
+    def _request_started(self, sender, **extra):
+        g.perf = {'started': time.perf_counter(), 'queries': 0, 'db_time': 0.0,
+                  'render_started': None, 'render_time': 0.0, 'statements': []}
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._perf_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_perf_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.slow_query_seconds:
+            self.slow_queries += 1
+            source = request.endpoint if has_request_context() else 'background'
+            if self.log_parameters:
+                logger.warning('Slow query (%.1f ms) on %s: %s params=%r', 1000 * elapsed, source, statement, parameters)
+            else:
+                logger.warning('Slow query (%.1f ms) on %s: %s', 1000 * elapsed, source, statement)
+        if has_request_context() and 'perf' in g:
+            g.perf['queries'] += 1
+            g.perf['db_time'] += elapsed
+            g.perf['statements'].append((statement, elapsed))
+
+    def _before_render(self, sender, template, context, **extra):
+        if 'perf' in g:
+            g.perf['render_started'] = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        if 'perf' in g and g.perf['render_started'] is not None:
+            g.perf['render_time'] += time.perf_counter() - g.perf['render_started']
+            g.perf['render_started'] = None
+
+    def _request_finished(self, sender, response, **extra):
+        perf = g.pop('perf', None)
+        if perf is None:
+            return
+        duration = time.perf_counter() - perf['started']
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            stats.record(duration, perf['queries'], perf['db_time'], perf['render_time'],
+                         perf['statements'], self.keep_statements)
+
+    def snapshot(self):
+        """Per-endpoint summaries, most DB-heavy endpoints first"""
+        with self._lock:
+            rows = {endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()}
+        return dict(sorted(rows.items(), key=lambda item: item[1]['avg_db_ms'] * item[1]['requests'], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.slow_queries = 0
+            self.started_at = time.time()
+
+    def prometheus(self):
+        """Render the counters in the Prometheus text exposition format"""
+        lines = [
+            '# HELP portfolio_request_duration_seconds Request latency by endpoint.',
+            '# TYPE portfolio_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for endpoint, stats in endpoints:
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'portfolio_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}')
+                lines.append(f'portfolio_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.duration:.6f}')
+                lines.append(f'portfolio_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.requests}')
+            for name, help_text, attribute, fmt in (
+                ('portfolio_db_queries_total', 'SQL statements issued by endpoint.', 'queries', '{}'),
+                ('portfolio_db_seconds_total', 'Time spent in SQL statements by endpoint.', 'db_time', '{:.6f}'),
+                ('portfolio_render_seconds_total', 'Time spent rendering templates by endpoint.', 'render_time', '{:.6f}'),
+            ):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for endpoint, stats in endpoints:
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {fmt.format(getattr(stats, attribute))}')
+            lines.append('# HELP portfolio_slow_queries_total Statements slower than PERF_SLOW_QUERY_MS.')
+            lines.append('# TYPE portfolio_slow_queries_total counter')
+            lines.append(f'portfolio_slow_queries_total {self.slow_queries}')
+        return '\n'.join(lines) + '\n'
+
+perf_monitor = PerfMonitor()
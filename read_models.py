@@ -0,0 +1,45 @@
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from models import Comment, Like, Project
+from pagination import keyset_page
+from related import related_projects
+
+# Queries project_detail may issue for a GET, whatever the number of comments:
+# project + viewer like state, its tags (selectin), one page of comments with authors,
+# and the precomputed related projects
+PROJECT_DETAIL_QUERY_BUDGET = 4
+
+class ProjectDetail:
+    """Everything the project page renders, loaded up front"""
+
+    def __init__(self, project, liked, comments, related):
+        self.project = project
+        self.liked = liked
+        self.comments = comments
+        self.related = related
+
+def load_project_detail(project_id, viewer=None, comments_cursor=None, comments_per_page=20):
+    """Fetch a project page in PROJECT_DETAIL_QUERY_BUDGET queries; None if there is no such project.
+
+    The like count comes from the denormalized Project.like_count and the
+    viewer's like state from an EXISTS in the same SELECT as the project.
+    Comments are a lazy keyset Page over approved comments, newest first,
+    with their authors joined in.
+    """
+    if viewer is not None and viewer.is_authenticated:
+        liked = db.select(Like.id).where(Like.project_id == Project.id, Like.user_id == viewer.id).exists()
+    else:
+        liked = db.false()
+    row = db.session.execute(
+        db.select(Project, liked.label('liked'))
+        .where(Project.id == project_id)
+        .options(selectinload(Project.tag_objects))
+    ).first()
+    if row is None:
+        return None
+
+    comments = keyset_page(
+        Comment.query.filter_by(project_id=project_id, is_approved=True).options(joinedload(Comment.author)),
+        Comment, comments_cursor, comments_per_page,
+    )
+    return ProjectDetail(row.Project, bool(row.liked), comments, related_projects(project_id))
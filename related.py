@@ -0,0 +1,309 @@
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event as sa_event, inspect
+from sqlalchemy.orm import Session, object_session
+from app import db
+from background import PeriodicWorker
+from cache import response_cache
+from models import Project, ProjectNeighbor
+from tags import parse_tags
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:  # declared in pyproject.toml; an environment without them scores in pure Python
+    numpy = sparse = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]+')
+STOPWORDS = frozenset('an and are as at be by for from has in is it its of on or that the this to with'.split())
+
+# Term weights per field; tags and the category are whole terms of their own
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+TAG_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.0
+
+# Scores are rounded before ranking so float summation order can't reorder ties
+SCORE_DIGITS = 9
+
+# Edits to other columns (counters, images, featured flag) don't change similarity
+RELEVANT_COLUMNS = ('title', 'description', 'tags', 'category', 'is_published')
+
+def project_terms(title, description, tags, category):
+    """Weighted term frequencies for one project"""
+    terms = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+        for token in _TOKEN_RE.findall((text or '').lower()):
+            if token not in STOPWORDS:
+                terms[token] += weight
+    for slug in parse_tags(tags):
+        terms[f'tag:{slug}'] += TAG_WEIGHT
+    if category:
+        terms[f'category:{category.lower()}'] += CATEGORY_WEIGHT
+    return terms
+
+def build_vectors(rows, max_df=0.5):
+    """L2-normalised TF-IDF vectors {id: {term: weight}} from (id, title, description, tags, category) rows.
+
+    Terms found in more than max_df of the projects are dropped once
+    there are enough projects for that to mean something: they add little
+    to the score but would make every project a candidate for every other.
+    """
+    counts = {row[0]: project_terms(*row[1:]) for row in rows}
+    document_frequency = Counter(term for terms in counts.values() for term in terms)
+    total = len(counts)
+    cutoff = max_df * total if total >= 20 else total
+    idf = {term: math.log((1 + total) / (1 + frequency)) + 1
+           for term, frequency in document_frequency.items() if frequency <= cutoff}
+    vectors = {}
+    for project_id, terms in counts.items():
+        weights = {term: (1 + math.log(frequency)) * idf[term] for term, frequency in terms.items() if term in idf}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if norm:
+            vectors[project_id] = {term: weight / norm for term, weight in weights.items()}
+    return vectors
+
+def top_neighbors(vectors, targets, k):
+    """{target: [(id, cosine), ...]} with the k most similar other projects, best first.
+
+    The vectors form a sparse CSR matrix X and each block of targets is
+    scored with one sparse product X[block] @ X.T, so only projects sharing
+    at least one term are candidates and memory stays proportional to the
+    non-zero weights. Ties go to the lower id. Without SciPy the same scores
+    come from a pure-Python inverted index.
+    """
+    targets = [target for target in targets if target in vectors]
+    if not targets:
+        return {}
+    if sparse is not None:
+        return _top_neighbors_sparse(vectors, targets, k)
+    return _top_neighbors_python(vectors, targets, k)
+
+def _top_neighbors_sparse(vectors, targets, k, block_size=1024):
+    columns = {}
+    indptr, indices, data = [0], [], []
+    for vector in vectors.values():
+        for term, weight in vector.items():
+            indices.append(columns.setdefault(term, len(columns)))
+            data.append(weight)
+        indptr.append(len(indices))
+    ids = numpy.fromiter(vectors, dtype=numpy.int64, count=len(vectors))
+    positions = {project_id: index for index, project_id in enumerate(vectors)}
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(ids), len(columns)))
+    transposed = matrix.T.tocsr()
+    result = {}
+    for start in range(0, len(targets), block_size):
+        block = targets[start:start + block_size]
+        rows = [positions[target] for target in block]
+        scores = (matrix[rows] @ transposed).tocsr()
+        for offset, target in enumerate(block):
+            begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+            candidates = scores.indices[begin:end]
+            values = numpy.round(scores.data[begin:end], SCORE_DIGITS)
+            keep = candidates != rows[offset]
+            candidates, values = candidates[keep], values[keep]
+            if len(values) > k:
+                kth = numpy.partition(values, len(values) - k)[len(values) - k]
+                keep = values >= kth
+                candidates, values = candidates[keep], values[keep]
+            order = numpy.lexsort((ids[candidates], -values))[:k]
+            result[target] = [(int(ids[candidates[i]]), float(values[i])) for i in order]
+    return result
+
+def _top_neighbors_python(vectors, targets, k):
+    postings = defaultdict(list)
+    for project_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((project_id, weight))
+    result = {}
+    for target in targets:
+        scores = defaultdict(float)
+        for term, weight in vectors[target].items():
+            for project_id, other in postings[term]:
+                scores[project_id] += weight * other
+        scores.pop(target, None)
+        scored = ((project_id, round(score, SCORE_DIGITS)) for project_id, score in scores.items())
+        result[target] = heapq.nlargest(k, scored, key=lambda item: (item[1], -item[0]))
+    return result
+
+def _published_vectors():
+    rows = db.session.execute(
+        db.select(Project.id, Project.title, Project.description, Project.tags, Project.category)
+        .where(Project.is_published.is_(True))
+    ).all()
+    return build_vectors(rows, current_app.config['RELATED_MAX_DF'])
+
+def _store(lists, replace_all=False, chunk_size=5000):
+    """Replace the stored lists for lists' keys (or the whole table) with executemany inserts"""
+    now = datetime.utcnow()
+    if replace_all:
+        db.session.execute(db.delete(ProjectNeighbor))
+    else:
+        ids = list(lists)
+        for start in range(0, len(ids), chunk_size):
+            db.session.execute(db.delete(ProjectNeighbor).where(ProjectNeighbor.project_id.in_(ids[start:start + chunk_size])))
+    rows = [{'project_id': project_id, 'rank': rank, 'neighbor_id': neighbor_id, 'score': score, 'computed_at': now}
+            for project_id, neighbors in lists.items() for rank, (neighbor_id, score) in enumerate(neighbors)]
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(db.insert(ProjectNeighbor), rows[start:start + chunk_size])
+
+def rebuild_related():
+    """Recompute every published project's list from scratch; returns how many have one"""
+    vectors = _published_vectors()
+    lists = top_neighbors(vectors, list(vectors), current_app.config['RELATED_TOP_K'])
+    _store(lists, replace_all=True)
+    db.session.commit()
+    response_cache.invalidate(*(f'project:{project_id}' for project_id in vectors))
+    return sum(1 for neighbors in lists.values() if neighbors)
+
+def update_related(changed_ids):
+    """Refresh only the lists that edits to changed_ids can affect; returns the rewritten project ids.
+
+    That is the changed projects' own lists, the lists they currently
+    appear in (their score moved, or they left the index), and the lists
+    they now beat the last entry of. IDF weights come from the current
+    corpus, so other lists drift slightly until the next full rebuild.
+    """
+    k = current_app.config['RELATED_TOP_K']
+    vectors = _published_vectors()
+    changed = set(changed_ids)
+    targets = set(changed)
+    targets.update(db.session.execute(
+        db.select(ProjectNeighbor.project_id).where(ProjectNeighbor.neighbor_id.in_(list(changed)))
+    ).scalars())
+
+    entering = {}
+    for project_id, scored in top_neighbors(vectors, list(changed), len(vectors)).items():
+        for other_id, score in scored:
+            entering[other_id] = max(score, entering.get(other_id, 0.0))
+    candidates = list(entering)
+    for start in range(0, len(candidates), 500):
+        chunk = candidates[start:start + 500]
+        current = {row.project_id: row for row in db.session.execute(
+            db.select(ProjectNeighbor.project_id, db.func.count().label('entries'), db.func.min(ProjectNeighbor.score).label('lowest'))
+            .where(ProjectNeighbor.project_id.in_(chunk)).group_by(ProjectNeighbor.project_id)
+        )}
+        for other_id in chunk:
+            row = current.get(other_id)
+            if row is None or row.entries < k or entering[other_id] > row.lowest:
+                targets.add(other_id)
+
+    lists = top_neighbors(vectors, list(targets), k)
+    # Unpublished, deleted or now-empty projects lose their list
+    lists.update({project_id: [] for project_id in targets if project_id not in lists})
+    _store(lists)
+    db.session.commit()
+    response_cache.invalidate(*(f'project:{project_id}' for project_id in targets))
+    return targets
+
+def related_projects(project_id, limit=None):
+    """Published neighbours of a project, best first: one range scan of the primary key"""
+    query = (db.select(Project)
+             .join(ProjectNeighbor, ProjectNeighbor.neighbor_id == Project.id)
+             .where(ProjectNeighbor.project_id == project_id, Project.is_published.is_(True))
+             .order_by(ProjectNeighbor.rank))
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).scalars().all()
+
+class RelatedIndex(PeriodicWorker):
+    """Keeps project_neighbor current as projects are edited.
+
+    Commits that change a project's text, tags, category or publication
+    hand its id to this worker, which refreshes the affected lists every
+    RELATED_UPDATE_DELAY seconds, so a burst of edits is one update.
+    """
+
+    name = 'related-index'
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self._dirty = set()
+        self._full = False
+        self._dirty_lock = threading.Lock()
+        self.updates = 0
+
+    def init_app(self, app):
+        app.config.setdefault('RELATED_ENABLED', True)
+        app.config.setdefault('RELATED_TOP_K', 3)
+        app.config.setdefault('RELATED_MAX_DF', 0.5)
+        app.config.setdefault('RELATED_UPDATE_DELAY', 2.0)
+        app.extensions['related_index'] = self
+        self.enabled = app.config['RELATED_ENABLED']
+        self.interval = app.config['RELATED_UPDATE_DELAY']
+
+    def submit(self, project_ids):
+        """Queue changed projects for the next incremental update"""
+        if not self.enabled or not project_ids:
+            return
+        with self._dirty_lock:
+            self._dirty.update(project_ids)
+        if has_app_context():
+            self.ensure_started(current_app._get_current_object())
+
+    def request_rebuild(self):
+        """Queue a full rebuild, e.g. after a bulk import that bypassed the ORM"""
+        if not self.enabled:
+            return
+        with self._dirty_lock:
+            self._full = True
+        if has_app_context():
+            self.ensure_started(current_app._get_current_object())
+            self.wake()
+
+    def run_once(self):
+        with self._dirty_lock:
+            full, dirty = self._full, self._dirty
+            self._full, self._dirty = False, set()
+        if not full and not dirty:
+            return False
+        try:
+            if full:
+                rebuild_related()
+            else:
+                update_related(dirty)
+        except Exception:
+            db.session.rollback()
+            with self._dirty_lock:
+                self._full |= full
+                self._dirty |= dirty
+            raise
+        self.updates += 1
+        return False
+
+def _mark(session, project_id):
+    if session is not None and project_id is not None:
+        session.info.setdefault('related_dirty', set()).add(project_id)
+
+@sa_event.listens_for(Project, 'after_insert')
+@sa_event.listens_for(Project, 'after_delete')
+def _project_added_or_removed(mapper, connection, target):
+    _mark(object_session(target), target.id)
+
+@sa_event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in RELEVANT_COLUMNS):
+        _mark(object_session(target), target.id)
+
+@sa_event.listens_for(Session, 'after_commit')
+def _submit_after_commit(session):
+    dirty = session.info.pop('related_dirty', None)
+    if dirty:
+        related_index.submit(dirty)
+
+@sa_event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('related_dirty', None)
+
+related_index = RelatedIndex()
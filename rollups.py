@@ -0,0 +1,378 @@
+import atexit
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, has_app_context, make_response, request
+from flask_login import current_user
+from sqlalchemy import event as sa_event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+from app import db
+from background import PeriodicWorker
+from cache import response_cache
+from models import ActivityRollup, Comment, Like, Project
+
+logger = logging.getLogger(__name__)
+
+HOUR, DAY = ActivityRollup.HOUR, ActivityRollup.DAY
+STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+COUNT_COLUMNS = ('likes', 'comments', 'views')
+KEY_COLUMNS = ('granularity', 'bucket', 'project_id')
+
+# Trending points per event; a comment says more than a like, a like more than a view
+POINTS = {'likes': 5, 'comments': 10, 'views': 1}
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def bucket_start(moment, granularity):
+    """The start of the hour or day containing moment"""
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == DAY else moment
+
+def _new_counts():
+    return [0, 0, 0]
+
+class ActivityRollups(PeriodicWorker):
+    """Buffers per-project activity and folds it into activity_rollup.
+
+    Views are counted in memory as pages are served; like and comment
+    deltas are staged on the session and only counted once their
+    transaction commits. Every ROLLUP_FLUSH_INTERVAL seconds the buffer is
+    written with one executemany upsert into both the hourly and the daily
+    rows, so a busy page costs one UPDATE per flush instead of one per hit.
+    Counts still buffered when a process dies are lost; `flask
+    rebuild-rollups` recounts likes and comments (not views) from their
+    tables.
+    """
+
+    name = 'rollup-flusher'
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self._pending = defaultdict(_new_counts)  # (project_id, hour) -> [likes, comments, views]
+        self._pending_lock = threading.Lock()
+        self._pruned_at = 0.0
+        self._trending = None  # (computed_at, project ids)
+        self.flushes = 0
+
+    def init_app(self, app):
+        app.config.setdefault('ROLLUPS_ENABLED', True)
+        app.config.setdefault('ROLLUP_FLUSH_INTERVAL', 10.0)
+        app.config.setdefault('ROLLUP_HOURLY_RETENTION_DAYS', 14)
+        app.config.setdefault('TRENDING_LIMIT', 3)
+        app.config.setdefault('TRENDING_WINDOW_HOURS', 72)
+        app.config.setdefault('TRENDING_HALF_LIFE_HOURS', 24)
+        app.config.setdefault('TRENDING_REFRESH_SECONDS', 60)
+        app.extensions['activity_rollups'] = self
+        self.enabled = app.config['ROLLUPS_ENABLED']
+        self.interval = app.config['ROLLUP_FLUSH_INTERVAL']
+        atexit.register(self._flush_at_exit, app)
+
+    def record_view(self, project_id):
+        """Count a page view; it reaches the database with the next flush"""
+        if not self.enabled:
+            return
+        with self._pending_lock:
+            self._pending[(project_id, bucket_start(datetime.utcnow(), HOUR))][2] += 1
+        self.ensure_started(current_app._get_current_object())
+
+    def stage(self, session, project_id, likes=0, comments=0, at=None):
+        """Count like/comment deltas once session's transaction commits.
+
+        at is when the like or comment was created: a removal is taken off
+        the bucket its creation was counted in, not the current one, so the
+        rows keep matching what rebuild_rollups() recounts.
+        """
+        if not self.enabled or session is None or not (likes or comments):
+            return
+        staged = session.info.setdefault('activity_deltas', defaultdict(_new_counts))
+        counts = staged[(project_id, bucket_start(at or datetime.utcnow(), HOUR))]
+        counts[0] += likes
+        counts[1] += comments
+
+    def _publish(self, staged):
+        with self._pending_lock:
+            for key, counts in staged.items():
+                pending = self._pending[key]
+                for index, delta in enumerate(counts):
+                    pending[index] += delta
+        if has_app_context():
+            self.ensure_started(current_app._get_current_object())
+
+    def run_once(self):
+        self.flush()
+        if time.monotonic() - self._pruned_at >= 3600:
+            self.prune()
+        return False
+
+    def flush(self):
+        """Write the buffered counts to the hourly and daily rows; returns how many rows changed"""
+        with self._pending_lock:
+            pending = {key: counts for key, counts in self._pending.items() if any(counts)}
+            self._pending = defaultdict(_new_counts)
+        if not pending:
+            return 0
+        try:
+            # Deltas for projects deleted since they were counted are dropped
+            existing = set(db.session.execute(
+                db.select(Project.id).where(Project.id.in_(list({project_id for project_id, _ in pending})))
+            ).scalars())
+            cutoff = _hourly_cutoff()
+            daily = defaultdict(_new_counts)
+            rows = []
+            for (project_id, hour), counts in pending.items():
+                if project_id not in existing:
+                    continue
+                # Removals of old likes/comments only reach the daily row once the hourly one is pruned
+                if hour >= cutoff:
+                    rows.append(_row(HOUR, hour, project_id, counts))
+                day_counts = daily[(project_id, bucket_start(hour, DAY))]
+                for index, delta in enumerate(counts):
+                    day_counts[index] += delta
+            rows.extend(_row(DAY, day, project_id, counts) for (project_id, day), counts in daily.items())
+            if rows:
+                _upsert(db.session.connection(), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the counts back so the next flush retries them
+            self._publish(pending)
+            raise
+        self.flushes += 1
+        return len(rows)
+
+    def prune(self):
+        """Delete hourly rows past ROLLUP_HOURLY_RETENTION_DAYS; daily rows are kept"""
+        cutoff = _hourly_cutoff()
+        deleted = db.session.execute(
+            db.delete(ActivityRollup).where(ActivityRollup.granularity == HOUR, ActivityRollup.bucket < cutoff)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        self._pruned_at = time.monotonic()
+        return deleted
+
+    def trending_ids(self):
+        """Ids of the trending projects, recomputed at most every TRENDING_REFRESH_SECONDS.
+
+        Pages tagged 'trending' are dropped from the response cache when
+        the ranking changes.
+        """
+        config = current_app.config
+        now = time.monotonic()
+        if self._trending is not None and now - self._trending[0] < config['TRENDING_REFRESH_SECONDS']:
+            return self._trending[1]
+        ids = [project_id for project_id, _ in trending_scores(
+            config['TRENDING_LIMIT'], config['TRENDING_WINDOW_HOURS'], config['TRENDING_HALF_LIFE_HOURS'])]
+        if self._trending is not None and ids != self._trending[1]:
+            response_cache.invalidate('trending')
+        self._trending = (now, ids)
+        return ids
+
+    def expire_trending(self):
+        """Recompute the ranking on the next trending_ids() call"""
+        if self._trending is not None:
+            self._trending = (float('-inf'), self._trending[1])
+
+    def trending_projects(self):
+        """The trending projects in rank order (one primary-key IN query)"""
+        ids = self.trending_ids()
+        if not ids:
+            return []
+        projects = {project.id: project for project in
+                    Project.query.filter(Project.id.in_(ids), Project.is_published.is_(True))}
+        return [projects[project_id] for project_id in ids if project_id in projects]
+
+    def _flush_at_exit(self, app):
+        if self._pending and self._pid in (None, os.getpid()):
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Could not flush pending activity counts at exit')
+
+def _hourly_cutoff():
+    """Start of the oldest hourly bucket kept under ROLLUP_HOURLY_RETENTION_DAYS"""
+    return bucket_start(datetime.utcnow() - timedelta(days=current_app.config['ROLLUP_HOURLY_RETENTION_DAYS']), HOUR)
+
+def _row(granularity, bucket, project_id, counts):
+    return dict(zip(KEY_COLUMNS + COUNT_COLUMNS, (granularity, bucket, project_id, *counts)))
+
+def _upsert(connection, rows, add=True):
+    """executemany insert-or-update by (granularity, bucket, project_id).
+
+    With add=True the counts are added to the stored ones, otherwise the
+    columns present in rows replace them.
+    """
+    table = ActivityRollup.__table__
+    names = [name for name in rows[0] if name not in KEY_COLUMNS]
+    insert = _UPSERT_DIALECTS.get(connection.dialect.name)
+    if insert is not None:
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={name: table.c[name] + statement.excluded[name] if add else statement.excluded[name] for name in names})
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        key = [table.c[name] == row[name] for name in KEY_COLUMNS]
+        values = {name: table.c[name] + row[name] if add else row[name] for name in names}
+        if not connection.execute(table.update().where(*key).values(values)).rowcount:
+            connection.execute(table.insert().values(row))
+
+def rebuild_rollups(batch_size=5000):
+    """Recount likes and comments per hour and day from their tables; view counts are kept.
+
+    Returns how many rows were written. Hourly rows are only rebuilt
+    within the retention window.
+    """
+    # This process's buffered counts are already in the tables being counted
+    activity_rollups.flush()
+    cutoff = _hourly_cutoff()
+    counts = defaultdict(lambda: [0, 0])
+    for index, model in enumerate((Like, Comment)):
+        for project_id, created_at in db.session.execute(
+            db.select(model.project_id, model.created_at).execution_options(yield_per=batch_size)
+        ):
+            if created_at is None:
+                continue
+            counts[(DAY, bucket_start(created_at, DAY), project_id)][index] += 1
+            if created_at >= cutoff:
+                counts[(HOUR, bucket_start(created_at, HOUR), project_id)][index] += 1
+
+    table = ActivityRollup.__table__
+    connection = db.session.connection()
+    connection.execute(table.update().values(likes=0, comments=0))
+    rows = [{'granularity': granularity, 'bucket': bucket, 'project_id': project_id, 'likes': likes, 'comments': comments}
+            for (granularity, bucket, project_id), (likes, comments) in counts.items()]
+    for start in range(0, len(rows), batch_size):
+        _upsert(connection, rows[start:start + batch_size], add=False)
+    connection.execute(table.delete().where(table.c.likes == 0, table.c.comments == 0, table.c.views == 0))
+    db.session.commit()
+    activity_rollups.expire_trending()
+    return len(rows)
+
+def trending_scores(limit, window_hours=72, half_life_hours=24, now=None):
+    """[(project_id, score), ...] for the most active published projects, best first.
+
+    Each hourly bucket in the window contributes its POINTS, halved for
+    every half_life_hours of age, so a burst of activity fades instead of
+    dropping off at the window's edge.
+    """
+    now = now or datetime.utcnow()
+    since = bucket_start(now - timedelta(hours=window_hours), HOUR)
+    rows = db.session.execute(
+        db.select(ActivityRollup.project_id, ActivityRollup.bucket,
+                  ActivityRollup.likes, ActivityRollup.comments, ActivityRollup.views)
+        .join(Project, Project.id == ActivityRollup.project_id)
+        .where(ActivityRollup.granularity == HOUR, ActivityRollup.bucket >= since, Project.is_published.is_(True))
+    ).all()
+    scores = defaultdict(float)
+    for row in rows:
+        points = row.likes * POINTS['likes'] + row.comments * POINTS['comments'] + row.views * POINTS['views']
+        age_hours = max((now - row.bucket).total_seconds() / 3600, 0)
+        scores[row.project_id] += points * 0.5 ** (age_hours / half_life_hours)
+    ranked = ((project_id, round(score, 3)) for project_id, score in scores.items() if score > 0)
+    return heapq.nlargest(limit, ranked, key=lambda item: (item[1], -item[0]))
+
+def activity_series(granularity, since, until=None, project_id=None):
+    """Zero-filled [{'bucket', 'likes', 'comments', 'views'}, ...], one point per hour or day.
+
+    Site-wide series read a primary-key range; one project's series reads
+    ix_activity_rollup_project.
+    """
+    until = until or datetime.utcnow()
+    start = bucket_start(since, granularity)
+    query = (db.select(ActivityRollup.bucket, *(db.func.sum(ActivityRollup.__table__.c[name]) for name in COUNT_COLUMNS))
+             .where(ActivityRollup.granularity == granularity, ActivityRollup.bucket >= start, ActivityRollup.bucket <= until)
+             .group_by(ActivityRollup.bucket))
+    if project_id is not None:
+        query = query.where(ActivityRollup.project_id == project_id)
+    found = {bucket: counts for bucket, *counts in db.session.execute(query)}
+    points = []
+    bucket = start
+    while bucket <= until:
+        counts = found.get(bucket) or (0, 0, 0)
+        points.append({'bucket': bucket, **{name: int(value or 0) for name, value in zip(COUNT_COLUMNS, counts)}})
+        bucket += STEPS[granularity]
+    return points
+
+def activity_totals(since, until=None, project_id=None):
+    """{'likes', 'comments', 'views'} between since and until, to the hour, in one query.
+
+    Whole days come from the daily rows and only the partial days at
+    either end from the hourly ones, so a year costs about 365 + 48 rows
+    per project rather than a scan of every like and comment.
+    """
+    until = until or datetime.utcnow()
+    since = bucket_start(since, HOUR)
+    first_day = bucket_start(since, DAY)
+    if first_day < since:
+        first_day += STEPS[DAY]
+    last_day = bucket_start(until, DAY)
+    if first_day < last_day:
+        ranges = db.or_(
+            db.and_(ActivityRollup.granularity == DAY, ActivityRollup.bucket >= first_day, ActivityRollup.bucket < last_day),
+            db.and_(ActivityRollup.granularity == HOUR, ActivityRollup.bucket >= since, ActivityRollup.bucket < first_day),
+            db.and_(ActivityRollup.granularity == HOUR, ActivityRollup.bucket >= last_day, ActivityRollup.bucket <= until),
+        )
+    else:
+        ranges = db.and_(ActivityRollup.granularity == HOUR, ActivityRollup.bucket >= since, ActivityRollup.bucket <= until)
+    query = db.select(*(db.func.coalesce(db.func.sum(ActivityRollup.__table__.c[name]), 0) for name in COUNT_COLUMNS)).where(ranges)
+    if project_id is not None:
+        query = query.where(ActivityRollup.project_id == project_id)
+    return dict(zip(COUNT_COLUMNS, (int(value) for value in db.session.execute(query).one())))
+
+def counts_views(view):
+    """Count a view of the project named by the id argument, including cached and 304 responses.
+
+    Goes outside @conditional and @response_cache.cached; admins
+    previewing their own pages are not counted.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if (request.method == 'GET' and response.status_code in (200, 304)
+                and not (current_user.is_authenticated and current_user.is_admin)):
+            activity_rollups.record_view(kwargs['id'])
+        return response
+    return wrapper
+
+def _created_at(target):
+    # Read from the loaded state: after a delete the row is gone, so nothing can be refreshed
+    return inspect(target).dict.get('created_at')
+
+@sa_event.listens_for(Like, 'after_insert')
+def _like_inserted(mapper, connection, target):
+    activity_rollups.stage(object_session(target), target.project_id, likes=1, at=_created_at(target))
+
+@sa_event.listens_for(Like, 'after_delete')
+def _like_deleted(mapper, connection, target):
+    activity_rollups.stage(object_session(target), target.project_id, likes=-1, at=_created_at(target))
+
+@sa_event.listens_for(Comment, 'after_insert')
+def _comment_inserted(mapper, connection, target):
+    activity_rollups.stage(object_session(target), target.project_id, comments=1, at=_created_at(target))
+
+@sa_event.listens_for(Comment, 'after_delete')
+def _comment_deleted(mapper, connection, target):
+    activity_rollups.stage(object_session(target), target.project_id, comments=-1, at=_created_at(target))
+
+@sa_event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    staged = session.info.pop('activity_deltas', None)
+    if staged:
+        activity_rollups._publish(staged)
+
+@sa_event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('activity_deltas', None)
+
+activity_rollups = ActivityRollups()
@@ -1,69 +1,142 @@
+import hmac
+import mimetypes
 import os
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, jsonify, Response, stream_template, stream_with_context, abort, send_file, send_from_directory
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash
-from app import app, db
-from models import User, Project, Comment, Like, About, Notification
+from sqlalchemy.orm import selectinload
+from app import db
+from models import User, Project, ProjectNeighbor, Comment, About, Notification, Tag, project_tag, adjust_site_stats
 from forms import LoginForm, RegisterForm, ProjectForm, CommentForm, AboutForm
+from search import apply_search, search_terms
+from pagination import keyset_page, offset_page
+from assets import asset_manifest
+from cache import response_cache
+from conditional import conditional
+from images import image_pipeline
+from storage import IMMUTABLE_MAX_AGE, is_blob, store_upload
+from events import record_event
+from likes import like_engine
+from live import live_hub
+from local_cache import local_cache
+from stats import dashboard_stats, recent_activity
+from tags import tag_cloud
+from read_models import load_project_detail
+from perf import perf_monitor
+from auth import HashingUnavailable, rate_limiter, throttle_login
+from related import related_index
+from rollups import activity_rollups, activity_series, activity_totals, counts_views, trending_scores
+from transfer import TransferError, export_projects, import_projects
+from notifications import inbox_page, mark_notifications_read, archive_notifications, delete_notifications
+
+bp = Blueprint('main', __name__)
 
 # Helper function for file uploads
 def save_uploaded_file(file):
     if file and file.filename:
-        filename = secure_filename(file.filename)
-        # Add timestamp to prevent filename conflicts
-        import time
-        timestamp = str(int(time.time()))
-        name, ext = os.path.splitext(filename)
-        filename = f"{name}_{timestamp}{ext}"
-        
-        upload_path = os.path.join(app.config['UPLOAD_FOLDER'])
-        os.makedirs(upload_path, exist_ok=True)
-        
-        file_path = os.path.join(upload_path, filename)
-        file.save(file_path)
-        return f"uploads/{filename}"
+        return store_upload(file, current_app.config['UPLOAD_FOLDER'])
     return None
 
+def render_listing(template, **context):
+    """Render a paginated listing, streaming it when STREAM_LISTINGS is enabled"""
+    if current_app.config['STREAM_LISTINGS']:
+        return Response(stream_template(template, **context))
+    return render_template(template, **context)
+
+# Conditional GET validators: one cheap query each, no rendering
+def listing_validators(**view_args):
+    # Scalar subqueries so each MAX() can be answered from its index
+    latest_edit, latest_activity, published = db.session.execute(db.select(
+        db.select(db.func.max(Project.updated_at)).scalar_subquery(),
+        db.select(db.func.max(Project.last_activity_at)).scalar_subquery(),
+        db.select(db.func.count(Project.id)).where(Project.is_published.is_(True)).scalar_subquery(),
+    )).one()
+    last_modified = max(filter(None, (latest_edit, latest_activity)), default=None)
+    return (latest_edit, latest_activity, published), last_modified
+
+def index_validators(**view_args):
+    # The trending ranking moves with views too, which leave the project rows alone
+    etag_parts, last_modified = listing_validators()
+    return (*etag_parts, tuple(activity_rollups.trending_ids())), last_modified
+
+def project_validators(id):
+    # The related list is rewritten in the background; its stamp comes from the same primary-key range
+    related_at = db.select(db.func.max(ProjectNeighbor.computed_at)).where(ProjectNeighbor.project_id == id).scalar_subquery()
+    row = db.session.execute(
+        db.select(Project.is_published, Project.updated_at, Project.last_activity_at, related_at.label('related_at'))
+        .where(Project.id == id)
+    ).first()
+    if row is None or not row.is_published:
+        return None
+    last_modified = max(filter(None, (row.updated_at, row.last_activity_at, row.related_at)), default=None)
+    return (id, row.updated_at, row.last_activity_at, row.related_at), last_modified
+
+def about_validators(**view_args):
+    updated_at = About.cached()['updated_at']
+    return (updated_at,), updated_at
+
 # Public routes
-@app.route('/')
+@bp.route('/')
+@conditional(index_validators)
+@response_cache.cached('projects', 'trending')
 def index():
     featured_projects = Project.query.filter_by(is_published=True, is_featured=True).order_by(Project.created_at.desc()).limit(3).all()
     recent_projects = Project.query.filter_by(is_published=True).order_by(Project.created_at.desc()).limit(6).all()
-    return render_template('index.html', featured_projects=featured_projects, recent_projects=recent_projects)
+    trending_projects = activity_rollups.trending_projects()
+    response_cache.add_tags(*(f'project:{project.id}' for project in featured_projects + recent_projects + trending_projects))
+    return render_template('index.html', featured_projects=featured_projects, recent_projects=recent_projects,
+                           trending_projects=trending_projects)
 
-@app.route('/about')
+@bp.route('/about')
+@conditional(about_validators)
+@response_cache.cached('about')
 def about():
     about_content = About.get_content()
     return render_template('about.html', about_content=about_content)
 
-@app.route('/projects')
+@bp.route('/projects')
+@conditional(listing_validators)
+@response_cache.cached('projects')
 def projects():
     category = request.args.get('category')
+    tag = request.args.get('tag')
     search = request.args.get('search')
+    cursor = request.args.get('cursor')
     
-    query = Project.query.filter_by(is_published=True)
+    query = Project.query.filter_by(is_published=True).options(selectinload(Project.tag_objects))
     
     if category:
         query = query.filter_by(category=category)
+    if tag:
+        # Index lookup on project_tag (tag_id, project_id)
+        query = query.join(project_tag, project_tag.c.project_id == Project.id).join(Tag).filter(Tag.slug == tag)
     
-    if search:
-        query = query.filter(Project.title.contains(search) | Project.description.contains(search))
-    
-    projects = query.order_by(Project.created_at.desc()).all()
+    per_page = current_app.config['PROJECTS_PER_PAGE']
+    if search_terms(search):
+        page = offset_page(apply_search(query, search), cursor, per_page)
+    else:
+        page = keyset_page(query, Project, cursor, per_page)
     categories = ['web', 'mobile', 'desktop', 'data', 'ai', 'other']
+    # Counters shown on each card: resolved once the page has been rendered
+    response_cache.add_tags(lambda: {f'project:{project.id}' for project in page})
     
-    return render_template('projects.html', projects=projects, categories=categories, 
-                         current_category=category, search_term=search)
+    return render_listing('projects.html', projects=page, categories=categories, 
+                          current_category=category, current_tag=tag, tag_cloud=tag_cloud(),
+                          search_term=search, cursor=cursor)
 
-@app.route('/project/<int:id>')
+@bp.route('/project/<int:id>', methods=['GET', 'POST'])
+@counts_views
+@conditional(project_validators)
+@response_cache.cached('project:{id}')
 def project_detail(id):
-    project = Project.query.get_or_404(id)
+    detail = load_project_detail(id, current_user, request.args.get('comments'), current_app.config['COMMENTS_PER_PAGE'])
+    if detail is None:
+        abort(404)
+    project = detail.project
     if not project.is_published and (not current_user.is_authenticated or not current_user.is_admin):
         flash('Project not found.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
-    comments = Comment.query.filter_by(project_id=id, is_approved=True).order_by(Comment.created_at.desc()).all()
     comment_form = CommentForm()
     
     if comment_form.validate_on_submit() and current_user.is_authenticated:
@@ -73,66 +146,135 @@ def project_detail(id):
             project_id=project.id
         )
         db.session.add(comment)
+        db.session.flush()
         
-        # Create notification for admin
-        notification = Notification(
-            title='New Comment',
-            message=f'{current_user.username} commented on "{project.title}"',
-            user_id=current_user.id,
-            project_id=project.id,
-            comment_id=comment.id
-        )
-        db.session.add(notification)
+        # Admin notification is written by the outbox worker
+        record_event('comment.created', comment_id=comment.id, user_id=current_user.id,
+                     username=current_user.username, project_id=project.id, project_title=project.title)
         
         db.session.commit()
+        live_hub.counter_changed(project.id, comments=1)
         flash('Comment added successfully!', 'success')
-        return redirect(url_for('project_detail', id=id))
+        return redirect(url_for('main.project_detail', id=id))
     
-    return render_template('project_detail.html', project=project, comments=comments, comment_form=comment_form)
+    return render_template('project_detail.html', project=project, liked=detail.liked,
+                           comments=detail.comments, comments_cursor=request.args.get('comments'),
+                           comment_form=comment_form, related=detail.related)
 
-@app.route('/like_project/<int:id>', methods=['POST'])
+@bp.route('/like_project/<int:id>', methods=['POST'])
 @login_required
 def like_project(id):
     project = Project.query.get_or_404(id)
-    existing_like = Like.query.filter_by(user_id=current_user.id, project_id=id).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        liked = False
-    else:
-        like = Like(user_id=current_user.id, project_id=id)
-        db.session.add(like)
-        liked = True
+    persisted_count = project.like_count
     
+    liked = like_engine.toggle(current_user.id, id)
+    if liked:
+        record_event('project.liked', user_id=current_user.id, username=current_user.username,
+                     project_id=id, project_title=project.title)
     db.session.commit()
-    return jsonify({'liked': liked, 'like_count': project.like_count})
+    live_hub.counter_changed(id, likes=1 if liked else -1)
+    
+    # Persisted count plus this process's unflushed clicks: no COUNT query
+    return jsonify({'liked': liked, 'like_count': persisted_count + like_engine.pending(id)})
+
+# Server-Sent Events: live like/comment counts for ?projects=1,2,3 and new notifications for admins
+@bp.route('/events/stream')
+def event_stream():
+    ids = [value for value in request.args.get('projects', '').split(',') if value.isdigit()][:50]
+    topics = {f'project:{project_id}' for project_id in ids}
+    if current_user.is_authenticated and current_user.is_admin:
+        topics.add('admin')
+    if not topics:
+        abort(400)
+    
+    subscription = live_hub.subscribe(topics)
+    if subscription is None:
+        return Response('Too many open streams', status=503, headers={'Retry-After': '30'})
+    
+    config = current_app.config
+    # The generator holds no app context or DB connection while it waits
+    response = Response(live_hub.stream(subscription, config['LIVE_HEARTBEAT'], config['LIVE_STREAM_MAX_AGE']),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Fingerprinted CSS/JS from `flask build-assets`, precompressed variant picked by Accept-Encoding
+@bp.route('/assets/<path:filename>')
+def asset(filename):
+    resolved = asset_manifest.resolve(filename, request.accept_encodings)
+    if resolved is None:
+        abort(404)
+    path, encoding = resolved
+    
+    # send_file streams through wsgi.file_wrapper (sendfile under gunicorn) and sets Content-Length
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# Content-addressed uploads: the name is the hash, so they never change
+@bp.route('/media/<filename>')
+def media(filename):
+    if not is_blob(filename):
+        abort(404)
+    response = send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 # Authentication routes
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     form = LoginForm()
     if form.validate_on_submit():
+        # Throttled before any hashing, so guessing costs the attacker and not the worker
+        retry_after = throttle_login(request.remote_addr, form.email.data)
+        if retry_after:
+            flash(f'Too many sign-in attempts. Try again in {retry_after} seconds.', 'error')
+            response = current_app.make_response((render_template('auth/login.html', form=form), 429))
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
         user = User.query.filter_by(email=form.email.data).first()
-        if user and user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except HashingUnavailable:
+            flash('Sign-in is busy right now, please try again in a moment.', 'error')
+            return render_template('auth/login.html', form=form), 503
+        if valid:
+            # check_password may have upgraded the hash to the current cost profile
+            db.session.commit()
             login_user(user, remember=form.remember_me.data)
             next_page = request.args.get('next')
             if next_page:
                 return redirect(next_page)
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         flash('Invalid email or password', 'error')
     
     return render_template('auth/login.html', form=form)
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     form = RegisterForm()
     if form.validate_on_submit():
+        retry_after = rate_limiter.hit(f'register-ip:{request.remote_addr}', current_app.config['LOGIN_LIMIT_PER_IP'],
+                                       current_app.config['LOGIN_LIMIT_PERIOD'])
+        if retry_after:
+            flash(f'Too many attempts. Try again in {retry_after} seconds.', 'error')
+            response = current_app.make_response((render_template('auth/register.html', form=form), 429))
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
         # Check if user already exists
         if User.query.filter_by(email=form.email.data).first():
             flash('Email already registered', 'error')
@@ -144,72 +286,179 @@ def register():
         
         user = User(
             username=form.username.data,
-            email=form.email.data,
-            password_hash=generate_password_hash(form.password.data)
+            email=form.email.data
         )
+        try:
+            user.set_password(form.password.data)
+        except HashingUnavailable:
+            flash('Registration is busy right now, please try again in a moment.', 'error')
+            return render_template('auth/register.html', form=form), 503
         db.session.add(user)
+        db.session.flush()
+        record_event('user.registered', user_id=user.id, username=user.username)
         db.session.commit()
         
         flash('Registration successful! Please log in.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('auth/register.html', form=form)
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     logout_user()
     flash('You have been logged out.', 'info')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/forgot_password')
+@bp.route('/forgot_password')
 def forgot_password():
     return render_template('auth/forgot_password.html')
 
 # Admin routes
-@app.route('/admin')
+@bp.route('/admin')
 @login_required
 def admin_dashboard():
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
-    
-    total_projects = Project.query.count()
-    published_projects = Project.query.filter_by(is_published=True).count()
-    total_comments = Comment.query.count()
-    total_likes = Like.query.count()
-    unread_notifications = Notification.query.filter_by(is_read=False).count()
-    
-    recent_projects = Project.query.order_by(Project.created_at.desc()).limit(5).all()
-    recent_comments = Comment.query.order_by(Comment.created_at.desc()).limit(5).all()
-    recent_notifications = Notification.query.order_by(Notification.created_at.desc()).limit(5).all()
-    
-    return render_template('admin/dashboard.html', 
-                         total_projects=total_projects,
-                         published_projects=published_projects,
-                         total_comments=total_comments,
-                         total_likes=total_likes,
-                         unread_notifications=unread_notifications,
-                         recent_projects=recent_projects,
-                         recent_comments=recent_comments,
-                         recent_notifications=recent_notifications)
-
-@app.route('/admin/projects')
+        return redirect(url_for('main.index'))
+    
+    week = activity_totals(datetime.utcnow() - timedelta(days=7))
+    return render_template('admin/dashboard.html', **dashboard_stats(), **recent_activity(), week=week)
+
+# Time series for the dashboard charts, answered from the hourly/daily rollups
+@bp.route('/admin/analytics/activity')
+@login_required
+def admin_activity_series():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ('hour', 'day'):
+        return jsonify({'error': 'granularity must be hour or day'}), 400
+    # Hourly rows are only kept for the retention window
+    max_days = current_app.config['ROLLUP_HOURLY_RETENTION_DAYS'] if granularity == 'hour' else 366
+    days = min(max(request.args.get('days', 30 if granularity == 'day' else 2, type=int), 1), max_days)
+    project_id = request.args.get('project', type=int)
+    until = datetime.utcnow()
+    since = until - timedelta(days=days)
+    points = activity_series(granularity, since, until, project_id)
+    return jsonify({
+        'granularity': granularity,
+        'project_id': project_id,
+        'points': [dict(point, bucket=point['bucket'].isoformat()) for point in points],
+        'totals': activity_totals(since, until, project_id),
+    })
+
+@bp.route('/admin/analytics/trending')
+@login_required
+def admin_trending():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    config = current_app.config
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    hours = min(max(request.args.get('hours', config['TRENDING_WINDOW_HOURS'], type=int), 1),
+                config['ROLLUP_HOURLY_RETENTION_DAYS'] * 24)
+    scores = trending_scores(limit, hours, config['TRENDING_HALF_LIFE_HOURS'])
+    titles = dict(db.session.execute(
+        db.select(Project.id, Project.title).where(Project.id.in_([project_id for project_id, _ in scores]))).all())
+    return jsonify({'window_hours': hours, 'projects': [
+        {'id': project_id, 'title': titles.get(project_id), 'score': score} for project_id, score in scores]})
+
+@bp.route('/admin/cache')
+@login_required
+def admin_cache_stats():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    return jsonify({**response_cache.stats(), 'local_cache': local_cache.stats()})
+
+@bp.route('/admin/perf')
+@login_required
+def admin_perf():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    return render_template('admin/perf.html', endpoints=perf_monitor.snapshot(),
+                           slow_queries=perf_monitor.slow_queries,
+                           started_at=datetime.fromtimestamp(perf_monitor.started_at))
+
+@bp.route('/admin/perf/reset', methods=['POST'])
+@login_required
+def admin_perf_reset():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    perf_monitor.reset()
+    flash('Performance counters reset.', 'success')
+    return redirect(url_for('main.admin_perf'))
+
+# Prometheus scrape target: a bearer token (PERF_METRICS_TOKEN) or an admin session
+@bp.route('/metrics')
+def metrics():
+    token = current_app.config['PERF_METRICS_TOKEN']
+    authorized = token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized and not (current_user.is_authenticated and current_user.is_admin):
+        abort(403)
+    
+    return Response(perf_monitor.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/admin/projects')
 @login_required
 def admin_projects():
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
+    
+    page = keyset_page(Project.query, Project, request.args.get('cursor'), current_app.config['ADMIN_PROJECTS_PER_PAGE'])
+    return render_listing('admin/projects.html', projects=page, cursor=request.args.get('cursor'))
+
+@bp.route('/admin/projects/export')
+@login_required
+def admin_export_projects():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
     
-    projects = Project.query.order_by(Project.created_at.desc()).all()
-    return render_template('admin/projects.html', projects=projects)
+    # Streamed: the generator reads one batch of projects at a time
+    filename = f'projects-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson'
+    return Response(stream_with_context(export_projects()), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@bp.route('/admin/projects/import', methods=['POST'])
+@login_required
+def admin_import_projects():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Choose an NDJSON export to import.', 'error')
+        return redirect(url_for('main.admin_projects'))
+    try:
+        counts = import_projects(upload.stream)
+    except TransferError as error:
+        flash(f'Import stopped at {error}. Earlier batches were saved; fix the file and import it again.', 'error')
+        return redirect(url_for('main.admin_projects'))
+    finally:
+        # Bulk writes bypass the ORM events that keep related projects current
+        related_index.request_rebuild()
+    flash('Imported {projects} project(s), {comments} comment(s) and {likes} like(s); '
+          '{skipped} skipped because their user or project does not exist.'.format(**counts), 'success')
+    return redirect(url_for('main.admin_projects'))
 
-@app.route('/admin/project/new', methods=['GET', 'POST'])
+@bp.route('/admin/project/new', methods=['GET', 'POST'])
 @login_required
 def admin_new_project():
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     form = ProjectForm()
     if form.validate_on_submit():
@@ -231,18 +480,19 @@ def admin_new_project():
         )
         db.session.add(project)
         db.session.commit()
+        image_pipeline.submit(project.id, project.image_url)
         
         flash('Project created successfully!', 'success')
-        return redirect(url_for('admin_projects'))
+        return redirect(url_for('main.admin_projects'))
     
     return render_template('admin/project_form.html', form=form, title='New Project')
 
-@app.route('/admin/project/<int:id>/edit', methods=['GET', 'POST'])
+@bp.route('/admin/project/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
 def admin_edit_project(id):
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     project = Project.query.get_or_404(id)
     form = ProjectForm(obj=project)
@@ -250,87 +500,116 @@ def admin_edit_project(id):
     if form.validate_on_submit():
         form.populate_obj(project)
         
+        image_url = None
         if form.image.data:
             image_url = save_uploaded_file(form.image.data)
             if image_url:
                 project.image_url = image_url
+                project.image_variants = None
         
         db.session.commit()
+        if image_url:
+            image_pipeline.submit(project.id, image_url)
         flash('Project updated successfully!', 'success')
-        return redirect(url_for('admin_projects'))
+        return redirect(url_for('main.admin_projects'))
     
     return render_template('admin/project_form.html', form=form, project=project, title='Edit Project')
 
-@app.route('/admin/project/<int:id>/delete', methods=['POST'])
+@bp.route('/admin/project/<int:id>/delete', methods=['POST'])
 @login_required
 def admin_delete_project(id):
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     project = Project.query.get_or_404(id)
     db.session.delete(project)
     db.session.commit()
     
     flash('Project deleted successfully!', 'success')
-    return redirect(url_for('admin_projects'))
+    return redirect(url_for('main.admin_projects'))
 
-@app.route('/admin/about', methods=['GET', 'POST'])
+@bp.route('/admin/about', methods=['GET', 'POST'])
 @login_required
 def admin_about():
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     form = AboutForm()
     if form.validate_on_submit():
         About.update_content(form.content.data)
         flash('About section updated successfully!', 'success')
-        return redirect(url_for('admin_about'))
+        return redirect(url_for('main.admin_about'))
     
     form.content.data = About.get_content()
     return render_template('admin/about_form.html', form=form)
 
 # LinkedIn sharing route
-@app.route('/share_linkedin/<int:id>')
+@bp.route('/share_linkedin/<int:id>')
 def share_linkedin(id):
     project = Project.query.get_or_404(id)
     if not project.is_published:
         flash('Project not found.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     # Generate LinkedIn sharing URL
-    project_url = url_for('project_detail', id=id, _external=True)
+    project_url = url_for('main.project_detail', id=id, _external=True)
     linkedin_url = f"https://www.linkedin.com/sharing/share-offsite/?url={project_url}"
     
     return redirect(linkedin_url)
 
 # Notifications management
-@app.route('/admin/notifications')
+@bp.route('/admin/notifications')
 @login_required
 def admin_notifications():
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
-    notifications = Notification.query.order_by(Notification.created_at.desc()).all()
+    archived = request.args.get('view') == 'archived'
+    page = inbox_page(request.args.get('cursor'), current_app.config['NOTIFICATIONS_PER_PAGE'], archived)
+    items = list(page)
     
-    # Mark all as read
-    Notification.query.filter_by(is_read=False).update({'is_read': True})
-    db.session.commit()
+    # Only the rows on this page count as seen; they keep their unread marker for this render
+    unread_ids = {notification.id for notification in items if not notification.is_read}
+    if unread_ids:
+        mark_notifications_read(unread_ids)
+        db.session.commit()
     
-    return render_template('admin/notifications.html', notifications=notifications)
+    return render_template('admin/notifications.html', notifications=items, unread_ids=unread_ids,
+                           next_cursor=page.next_cursor, cursor=request.args.get('cursor'), archived=archived)
+
+@bp.route('/admin/notifications/bulk', methods=['POST'])
+@login_required
+def admin_bulk_notifications():
+    if not current_user.is_admin:
+        flash('Access denied.', 'error')
+        return redirect(url_for('main.index'))
+    
+    # Bounded by what one page can show
+    ids = [int(value) for value in request.form.getlist('ids') if value.isdigit()][:current_app.config['NOTIFICATIONS_PER_PAGE']]
+    action = request.form.get('action')
+    actions = {'read': mark_notifications_read, 'archive': archive_notifications, 'delete': delete_notifications}
+    if not ids or action not in actions:
+        flash('Select at least one notification.', 'error')
+    else:
+        changed = actions[action](ids)
+        db.session.commit()
+        labels = {'read': 'marked as read', 'archive': 'archived', 'delete': 'deleted'}
+        flash(f'{changed} notification(s) {labels[action]}.', 'success')
+    return redirect(url_for('main.admin_notifications', view='archived' if request.form.get('view') == 'archived' else None))
 
-@app.route('/admin/notification/<int:id>/delete', methods=['POST'])
+@bp.route('/admin/notification/<int:id>/delete', methods=['POST'])
 @login_required
 def admin_delete_notification(id):
     if not current_user.is_admin:
         flash('Access denied.', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     notification = Notification.query.get_or_404(id)
     db.session.delete(notification)
     db.session.commit()
     
     flash('Notification deleted successfully!', 'success')
-    return redirect(url_for('admin_notifications'))
+    return redirect(url_for('main.admin_notifications'))
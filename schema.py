@@ -0,0 +1,72 @@
+import logging
+from sqlalchemy import inspect, text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+def upgrade_schema():
+    """Add columns and indexes that db.create_all() skips on existing tables.
+
+    Only additive changes are handled; returns the list of "table.column"
+    names that were added so callers can backfill them.
+    """
+    added = []
+    engine = db.engine
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f' DEFAULT {column.server_default.arg}'
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                connection.execute(text(ddl))
+                added.append(f'{table.name}.{column.name}')
+                logger.info('Added column %s.%s', table.name, column.name)
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=connection)
+                    logger.info('Created index %s', index.name)
+    return added
+
+def init_db():
+    """Create or upgrade the schema and the derived structures that depend on it.
+
+    Idempotent: run by `flask init-db` / `flask seed` on deploy rather than
+    on every import of the app.
+    """
+    from models import ActivityRollup, Comment, Like, Project, ProjectNeighbor, SiteStats, Tag
+    from related import rebuild_related
+    from rollups import rebuild_rollups
+    from search import init_search_index
+    from stats import rebuild_site_stats
+    from tags import backfill_tags
+
+    db.create_all()
+    if any(column.startswith('project.') and column.endswith('_count') for column in upgrade_schema()):
+        # Counter columns were just added to an existing database
+        Project.reconcile_counters()
+    init_search_index()
+    if Tag.query.first() is None and Project.query.filter(Project.tags != '').first():
+        # Tag tables were just created next to existing projects
+        backfill_tags()
+    if db.session.get(SiteStats, SiteStats.SINGLETON_ID) is None:
+        # Seed the dashboard snapshot; mapper events keep it current from here on
+        rebuild_site_stats()
+    if ProjectNeighbor.query.first() is None and Project.query.filter_by(is_published=True).first():
+        # The related-projects table was just created next to existing projects
+        rebuild_related()
+    if ActivityRollup.query.first() is None and (Like.query.first() or Comment.query.first()):
+        # The rollup table was just created next to existing likes and comments
+        rebuild_rollups()
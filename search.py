@@ -0,0 +1,130 @@
+import logging
+import re
+from flask import current_app
+from sqlalchemy import column, func, inspect, literal_column, or_, table
+from app import db
+from models import Project
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE project_fts USING fts5(
+        title, description, content, tags,
+        content='project', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN
+        INSERT INTO project_fts(rowid, title, description, content, tags)
+        VALUES (new.id, new.title, new.description, new.content, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN
+        INSERT INTO project_fts(project_fts, rowid, title, description, content, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.tags);
+    END""",
+    # Only indexed columns fire this trigger, so counter updates don't touch the index
+    """CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE OF title, description, content, tags ON project BEGIN
+        INSERT INTO project_fts(project_fts, rowid, title, description, content, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.tags);
+        INSERT INTO project_fts(rowid, title, description, content, tags)
+        VALUES (new.id, new.title, new.description, new.content, new.tags);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE project ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'D')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_project_search_vector ON project USING GIN (search_vector)",
+]
+
+def _sqlite_has_fts5(connection):
+    options = connection.exec_driver_sql('PRAGMA compile_options').scalars().all()
+    return 'ENABLE_FTS5' in options
+
+def init_search_index():
+    """Create the full-text index for the active backend and keep it in sync.
+
+    SQLite gets an external-content FTS5 table maintained by triggers,
+    PostgreSQL a generated tsvector column with a GIN index. Any other
+    backend (or SQLite built without FTS5) falls back to LIKE scans.
+    """
+    engine = db.engine
+    backend = 'like'
+    with engine.begin() as connection:
+        if engine.dialect.name == 'sqlite' and _sqlite_has_fts5(connection):
+            created = 'project_fts' not in inspect(connection).get_table_names()
+            if created:
+                connection.exec_driver_sql(_SQLITE_DDL[0])
+            for statement in _SQLITE_DDL[1:]:
+                connection.exec_driver_sql(statement)
+            if created:
+                # Column weights: title, description, content, tags
+                connection.exec_driver_sql("INSERT INTO project_fts(project_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 3.0)')")
+                connection.exec_driver_sql("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+            backend = 'fts5'
+        elif engine.dialect.name == 'postgresql':
+            for statement in _POSTGRES_DDL:
+                connection.exec_driver_sql(statement)
+            backend = 'postgres'
+    current_app.extensions['project_search'] = backend
+    logger.info('Project search backend: %s', backend)
+    return backend
+
+def search_backend():
+    """Backend set up by init_search_index(), detected once per process"""
+    backend = current_app.extensions.get('project_search')
+    if backend is None:
+        engine = db.engine
+        with engine.connect() as connection:
+            inspector = inspect(connection)
+            if engine.dialect.name == 'sqlite' and 'project_fts' in inspector.get_table_names():
+                backend = 'fts5'
+            elif engine.dialect.name == 'postgresql' and 'search_vector' in {col['name'] for col in inspector.get_columns('project')}:
+                backend = 'postgres'
+            else:
+                backend = 'like'
+        current_app.extensions['project_search'] = backend
+    return backend
+
+def rebuild_search_index():
+    """Re-index every project (SQLite only; PostgreSQL's column is generated)"""
+    if search_backend() == 'fts5':
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+
+def search_terms(search):
+    return _TOKEN_RE.findall((search or '').lower())
+
+def apply_search(query, search):
+    """Filter a Project query by a search string and order it by relevance.
+
+    Every term must match; the last one is treated as a prefix so that
+    results update sensibly while the user is still typing.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query
+
+    backend = search_backend()
+    if backend == 'fts5':
+        fts = table('project_fts', column('rowid'), column('rank'))
+        expression = ' '.join(f'"{term}"' for term in terms[:-1])
+        expression = f'{expression} "{terms[-1]}"*'.strip()
+        return (query.join(fts, fts.c.rowid == Project.id)
+                .filter(literal_column('project_fts').op('MATCH')(expression))
+                .order_by(fts.c.rank, Project.id.desc()))
+
+    if backend == 'postgres':
+        vector = literal_column('project.search_vector')
+        tsquery = func.to_tsquery('simple', ' & '.join(terms[:-1] + [f'{terms[-1]}:*']))
+        return (query.filter(vector.op('@@')(tsquery))
+                .order_by(func.ts_rank(vector, tsquery).desc(), Project.id.desc()))
+
+    for term in terms:
+        query = query.filter(or_(Project.title.contains(term), Project.description.contains(term),
+                                 Project.content.contains(term), Project.tags.contains(term)))
+    return query.order_by(Project.created_at.desc())
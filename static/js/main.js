@@ -302,6 +302,57 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         });
     });
+
+    // Live counters and admin notifications over Server-Sent Events. Every open stream holds a
+    // server thread, so only pages marked data-live-stream (project detail) and admins' bell subscribe
+    const liveRoot = document.querySelector('[data-live-stream]');
+    const liveCounters = liveRoot ? liveRoot.querySelectorAll('[data-live-likes], [data-live-comments]') : [];
+    const notificationBadge = document.getElementById('notification-badge');
+    const projectIds = new Set();
+    liveCounters.forEach(function(element) {
+        projectIds.add(element.dataset.liveLikes || element.dataset.liveComments);
+    });
+    
+    if (window.EventSource && (projectIds.size || notificationBadge)) {
+        const ids = Array.from(projectIds).slice(0, 50).join(',');
+        const source = new EventSource(`/events/stream?projects=${ids}`);
+        
+        source.addEventListener('counts', function(event) {
+            const data = JSON.parse(event.data);
+            document.querySelectorAll(`[data-live-likes="${data.project_id}"]`).forEach(function(element) {
+                element.textContent = data.like_count;
+            });
+            document.querySelectorAll(`[data-live-comments="${data.project_id}"]`).forEach(function(element) {
+                element.textContent = data.comment_count;
+            });
+        });
+        
+        source.addEventListener('notifications', function(event) {
+            const data = JSON.parse(event.data);
+            if (notificationBadge) {
+                notificationBadge.textContent = data.unread;
+                notificationBadge.classList.toggle('d-none', !data.unread);
+            }
+            const banner = document.getElementById('live-notifications');
+            if (banner) {
+                const pending = parseInt(banner.dataset.count || '0', 10) + data.notifications.length;
+                banner.dataset.count = pending;
+                banner.querySelector('.live-count').textContent = pending;
+                banner.classList.remove('d-none');
+            } else {
+                data.notifications.forEach(function(notification) {
+                    showToast(`${notification.title}: ${notification.message}`, 'info');
+                });
+            }
+        });
+        
+        // The server closes full or long-lived streams; don't hammer it when it is at capacity
+        source.onerror = function() {
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('Live updates unavailable');
+            }
+        };
+    }
 });
 
 // Utility functions
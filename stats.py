@@ -0,0 +1,148 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, joinedload
+from app import db
+from background import PeriodicWorker
+from models import Comment, Like, Notification, Project, SiteStats
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = ('total_projects', 'published_projects', 'total_comments', 'total_likes', 'unread_notifications')
+
+class SiteStatsBuffer(PeriodicWorker):
+    """Coalesces SiteStats counter deltas and writes them in one UPDATE.
+
+    Every project, comment, like and notification write changes the single
+    site_stats row, so updating it in each transaction would make every
+    writer queue on one row lock. adjust_site_stats() stages the deltas on
+    the session instead; once the transaction commits they are summed in
+    memory and flushed every SITE_STATS_FLUSH_INTERVAL seconds. Reads add
+    this process's pending deltas. Deltas still pending when a process
+    dies are recovered by `flask reconcile-counters`.
+    """
+
+    name = 'site-stats-flusher'
+
+    def __init__(self):
+        super().__init__()
+        self._pending = defaultdict(int)
+        self._pending_lock = threading.Lock()
+        self.flushes = 0
+
+    def init_app(self, app):
+        app.config.setdefault('SITE_STATS_FLUSH_INTERVAL', 1.0)
+        app.extensions['site_stats_buffer'] = self
+        self.interval = app.config['SITE_STATS_FLUSH_INTERVAL']
+        atexit.register(self._flush_at_exit, app)
+
+    def pending(self, column):
+        return self._pending.get(column, 0)
+
+    def discard(self):
+        """Forget pending deltas; used when the row is recomputed from the tables"""
+        with self._pending_lock:
+            self._pending.clear()
+
+    def _publish(self, staged):
+        with self._pending_lock:
+            for column, delta in staged.items():
+                self._pending[column] += delta
+        if has_app_context():
+            self.ensure_started(current_app._get_current_object())
+
+    def run_once(self):
+        self.flush()
+        return False
+
+    def flush(self):
+        with self._pending_lock:
+            deltas = {column: delta for column, delta in self._pending.items() if delta}
+            self._pending.clear()
+        if not deltas:
+            return 0
+        table = SiteStats.__table__
+        try:
+            db.session.execute(
+                table.update().where(table.c.id == SiteStats.SINGLETON_ID)
+                .values(updated_at=datetime.utcnow(), **{column: table.c[column] + delta for column, delta in deltas.items()})
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the deltas back so the next flush retries them
+            self._publish(deltas)
+            raise
+        self.flushes += 1
+        return len(deltas)
+
+    def _flush_at_exit(self, app):
+        if self._pending and self._pid in (None, os.getpid()):
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Could not flush pending dashboard totals at exit')
+
+def compute_stats():
+    """Count everything from the base tables in a single round trip"""
+    def count(model, *criteria):
+        return db.select(db.func.count(model.id)).where(*criteria).scalar_subquery()
+
+    row = db.session.execute(db.select(
+        count(Project).label('total_projects'),
+        count(Project, Project.is_published.is_(True)).label('published_projects'),
+        count(Comment).label('total_comments'),
+        count(Like).label('total_likes'),
+        count(Notification, Notification.is_read.is_(False)).label('unread_notifications'),
+    )).one()
+    return dict(row._mapping)
+
+def rebuild_site_stats():
+    """Recompute the SiteStats snapshot, creating the row if needed"""
+    # Pending deltas are already reflected in the tables being counted
+    site_stats_buffer.discard()
+    totals = compute_stats()
+    snapshot = db.session.get(SiteStats, SiteStats.SINGLETON_ID)
+    if snapshot is None:
+        snapshot = SiteStats(id=SiteStats.SINGLETON_ID)
+        db.session.add(snapshot)
+    for column, value in totals.items():
+        setattr(snapshot, column, value)
+    db.session.commit()
+    return totals
+
+def dashboard_stats():
+    """Dashboard totals from the snapshot row (one primary-key lookup)"""
+    snapshot = db.session.get(SiteStats, SiteStats.SINGLETON_ID)
+    if snapshot is None:
+        return rebuild_site_stats()
+    return {column: getattr(snapshot, column) + site_stats_buffer.pending(column) for column in STAT_COLUMNS}
+
+def recent_activity(limit=5):
+    """Latest projects, comments and notifications, with comment authors/projects eager-loaded"""
+    return {
+        'recent_projects': Project.query.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit).all(),
+        'recent_comments': Comment.query.options(joinedload(Comment.author), joinedload(Comment.project))
+                                        .order_by(Comment.created_at.desc()).limit(limit).all(),
+        'recent_notifications': (Notification.query.filter(Notification.archived_at.is_(None))
+                                  .order_by(Notification.created_at.desc()).limit(limit).all()),
+    }
+
+@sa_event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    staged = session.info.pop('site_stats_deltas', None)
+    if staged:
+        site_stats_buffer._publish(staged)
+
+@sa_event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('site_stats_deltas', None)
+
+site_stats_buffer = SiteStatsBuffer()
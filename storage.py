@@ -0,0 +1,83 @@
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from flask import url_for
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+# Year-long caching is safe because a blob's name is derived from its bytes
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# <sha256>.<ext> for originals, <sha256>_<width>w.<ext> for derived variants
+BLOB_NAME_RE = re.compile(r'^(?P<digest>[0-9a-f]{64})(?:_\d+w)?\.[a-z0-9]+$')
+
+def store_upload(file, upload_folder):
+    """Stream an upload into the content-addressed store.
+
+    The SHA-256 is computed while the bytes are written, and the blob is
+    named after it, so re-uploading an image reuses the existing file.
+    Returns the "uploads/<sha256>.<ext>" path stored on Project.image_url.
+    """
+    ext = os.path.splitext(secure_filename(file.filename))[1].lower()
+    ext = '.jpg' if ext == '.jpeg' else ext
+    os.makedirs(upload_folder, exist_ok=True)
+
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(upload_folder, f'.{uuid.uuid4().hex}.part')
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        filename = f'{digest.hexdigest()}{ext}'
+        path = os.path.join(upload_folder, filename)
+        if os.path.exists(path):
+            # Refresh the mtime so a pending garbage collection keeps the blob
+            os.utime(path)
+            logger.debug('Deduplicated upload %s', filename)
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return f'uploads/{filename}'
+
+def is_blob(path):
+    return bool(path) and BLOB_NAME_RE.match(os.path.basename(path)) is not None
+
+def upload_url(path):
+    """URL for an uploaded file: immutable /media/ URL for blobs, static URL for legacy names"""
+    if is_blob(path):
+        return url_for('main.media', filename=os.path.basename(path))
+    return url_for('static', filename=path)
+
+def collect_garbage(upload_folder, referenced, grace_seconds=3600, dry_run=False):
+    """Delete blobs (and their variants) that no project references.
+
+    referenced is the set of upload paths still in use. Blobs younger than
+    grace_seconds are kept so an upload whose project has not been
+    committed yet is never removed. Legacy, non-hashed files are ignored.
+    """
+    live_digests = {BLOB_NAME_RE.match(os.path.basename(path)).group('digest')
+                    for path in referenced if is_blob(path)}
+    cutoff = time.time() - grace_seconds
+    removed = []
+    for entry in os.scandir(upload_folder):
+        match = BLOB_NAME_RE.match(entry.name)
+        if not match or not entry.is_file() or match.group('digest') in live_digests:
+            continue
+        if entry.stat().st_mtime > cutoff:
+            continue
+        removed.append(entry.name)
+        if not dry_run:
+            os.remove(entry.path)
+    return removed
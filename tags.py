@@ -0,0 +1,118 @@
+import re
+from sqlalchemy import event as sa_event, inspect
+from sqlalchemy.orm import Session, selectinload
+from app import db
+from models import Project, Tag, project_tag
+
+def parse_tags(raw):
+    """Split a comma-separated tag string into unique, stripped names"""
+    names = {}
+    for name in (raw or '').split(','):
+        name = ' '.join(name.split())[:64]
+        slug = slugify(name)
+        if slug and slug not in names:
+            names[slug] = name
+    return names
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9+#.]+', '-', name.lower()).strip('-')[:64]
+
+def _get_or_create_tags(session, names):
+    existing = {tag.slug: tag for tag in session.query(Tag).filter(Tag.slug.in_(list(names)))} if names else {}
+    # Tags created earlier in this flush cycle are not in the database yet
+    for obj in session.new:
+        if isinstance(obj, Tag) and obj.slug in names:
+            existing.setdefault(obj.slug, obj)
+    tags = []
+    for slug, name in names.items():
+        tag = existing.get(slug)
+        if tag is None:
+            tag = existing[slug] = Tag(name=name, slug=slug)
+            session.add(tag)
+        tags.append(tag)
+    return tags
+
+def refresh_tag_counts(connection, tag_ids=None):
+    """Recompute Tag.project_count (published projects) for the given tags, or all of them"""
+    published = (
+        db.select(db.func.count(project_tag.c.project_id))
+        .select_from(project_tag.join(Project, Project.id == project_tag.c.project_id))
+        .where(project_tag.c.tag_id == Tag.id, Project.is_published.is_(True))
+        .scalar_subquery()
+    )
+    statement = db.update(Tag).values(project_count=published)
+    if tag_ids is not None:
+        statement = statement.where(Tag.id.in_(tag_ids))
+    return connection.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+def sync_project_tags(connection, tag_strings):
+    """Set-based tag sync for rows written with Core: {project_id: tag string} -> touched tag ids.
+
+    Creates missing tags and replaces the projects' project_tag rows with
+    a few executemany statements; the caller refreshes the counts.
+    """
+    parsed = {project_id: parse_tags(raw) for project_id, raw in tag_strings.items()}
+    names = {}
+    for tags in parsed.values():
+        for slug, name in tags.items():
+            names.setdefault(slug, name)
+    ids = {}
+    if names:
+        ids = dict(connection.execute(db.select(Tag.slug, Tag.id).where(Tag.slug.in_(list(names)))).all())
+        missing = [{'name': names[slug], 'slug': slug, 'project_count': 0} for slug in names if slug not in ids]
+        if missing:
+            connection.execute(db.insert(Tag), missing)
+            ids.update(connection.execute(
+                db.select(Tag.slug, Tag.id).where(Tag.slug.in_([row['slug'] for row in missing]))).all())
+    touched = set(connection.execute(
+        db.select(project_tag.c.tag_id).where(project_tag.c.project_id.in_(list(parsed)))).scalars())
+    connection.execute(project_tag.delete().where(project_tag.c.project_id.in_(list(parsed))))
+    rows = [{'project_id': project_id, 'tag_id': ids[slug]} for project_id, tags in parsed.items() for slug in tags]
+    if rows:
+        connection.execute(project_tag.insert(), rows)
+    return touched | {row['tag_id'] for row in rows}
+
+def _sync_tags_before_flush(session, flush_context, instances):
+    touched = session.info.setdefault('touched_tags', set())
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Project):
+                continue
+            state = inspect(obj)
+            tags_changed = obj in session.new or state.attrs.tags.history.has_changes()
+            if tags_changed:
+                touched.update(obj.tag_objects)
+                obj.tag_objects = _get_or_create_tags(session, parse_tags(obj.tags))
+            if tags_changed or state.attrs.is_published.history.has_changes():
+                touched.update(obj.tag_objects)
+        for obj in session.deleted:
+            if isinstance(obj, Project):
+                touched.update(obj.tag_objects)
+
+def _refresh_counts_after_flush(session, flush_context):
+    touched = session.info.pop('touched_tags', None)
+    tag_ids = {tag.id for tag in touched or () if tag.id is not None}
+    if tag_ids:
+        refresh_tag_counts(session.connection(), tag_ids)
+        for tag in touched:
+            session.expire(tag, ['project_count'])
+
+def backfill_tags():
+    """Populate tag/project_tag from every project's tag string; returns the number of projects"""
+    projects = Project.query.options(selectinload(Project.tag_objects)).all()
+    for project in projects:
+        # Only the association changes, so updated_at and the search index are left alone
+        project.tag_objects = _get_or_create_tags(db.session, parse_tags(project.tags))
+    db.session.flush()
+    refresh_tag_counts(db.session.connection())
+    db.session.commit()
+    return len(projects)
+
+def tag_cloud(limit=30):
+    """Most used tags with their precomputed counts, served from ix_tag_cloud"""
+    return (Tag.query.filter(Tag.project_count > 0)
+            .order_by(Tag.project_count.desc(), Tag.name).limit(limit).all())
+
+def init_app(app):
+    sa_event.listen(Session, 'before_flush', _sync_tags_before_flush)
+    sa_event.listen(Session, 'after_flush_postexec', _refresh_counts_after_flush)
@@ -0,0 +1,30 @@
+import pytest
+from app import create_app
+from schema import init_db
+from seed import seed_database
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'WTF_CSRF_ENABLED': False,
+        'PERF_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'JINJA_BYTECODE_CACHE_DIR': None,
+        # Tests drive the background workers by hand
+        'OUTBOX_WORKER': False,
+        'RELATED_ENABLED': False,
+    })
+    with app.app_context():
+        init_db()
+        seed_database()
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_client(client):
+    client.post('/login', data={'email': 'admin@portfolio.com', 'password': 'admin123'})
+    return client
@@ -0,0 +1,9 @@
+def test_admin_cache_stats(admin_client):
+    response = admin_client.get('/admin/cache')
+    assert response.status_code == 200
+    assert 'local_cache' in response.json
+    assert 'hits' in response.json['local_cache']
+
+def test_admin_cache_stats_requires_admin(client):
+    response = client.get('/admin/cache')
+    assert response.status_code == 302
@@ -0,0 +1,50 @@
+import gzip
+import os
+import pytest
+from assets import build_assets, minify_css, minify_js
+
+def test_regex_after_keyword_keeps_following_strings():
+    source = 'function f(s){ return /"/.test(s); } var url = "http://example.com";'
+    assert minify_js(source) == source + '\n'
+
+def test_regex_after_typeof_and_in_ternaries():
+    source = "if (typeof x === 'y') x = a ? /a/ : /b'/;\nvar url = 'https://example.com';\n"
+    assert minify_js(source) == source
+
+def test_regex_with_slash_in_character_class():
+    source = 'var parts = path.split(/[/]+/g); // split\nvar u = "a//b";\n'
+    assert minify_js(source) == 'var parts = path.split(/[/]+/g);\nvar u = "a//b";\n'
+
+def test_division_is_not_a_regex():
+    source = "var half = total / 2 / count; // average\nvar s = '//';\n"
+    assert minify_js(source) == "var half = total / 2 / count;\nvar s = '//';\n"
+
+def test_urls_and_comment_markers_in_strings_survive():
+    source = "var a = 'http://x.test/*not a comment*/';\n    var b = \"// nor this\"; /* gone */\n"
+    assert minify_js(source) == "var a = 'http://x.test/*not a comment*/';\nvar b = \"// nor this\";\n"
+
+def test_template_literals_are_copied_verbatim():
+    source = "var t = `line // kept\n  ${ '`' + \"//\" + { a: 1 }.a } /* kept */`;\n"
+    assert minify_js(source) == source
+
+def test_css_whitespace_and_comments_are_dropped():
+    source = '.a , .b > p {\n  color: red ;  /* note */\n  margin: 0 auto;\n}\n'
+    assert minify_css(source) == '.a,.b>p{color:red;margin:0 auto}'
+
+def test_css_strings_and_urls_are_untouched():
+    source = 'a::before { content: "a ; b" ; background: url( "x y.png" ) , url(a,b.png); font-family: "A  B", serif; }'
+    assert minify_css(source) == 'a::before{content:"a ; b";background:url( "x y.png" ),url(a,b.png);font-family:"A  B",serif}'
+
+def test_css_comment_markers_in_strings_are_kept():
+    assert minify_css(".x { content: '/* not a comment */'; }") == ".x{content:'/* not a comment */'}"
+
+def test_build_writes_precompressed_variants(app, tmp_path):
+    brotli = pytest.importorskip('brotli')
+    manifest = build_assets(app.static_folder, str(tmp_path))
+    built = os.path.join(tmp_path, manifest['css/style.css'])
+    with open(built, 'rb') as handle:
+        data = handle.read()
+    with open(built + '.gz', 'rb') as handle:
+        assert gzip.decompress(handle.read()) == data
+    with open(built + '.br', 'rb') as handle:
+        assert brotli.decompress(handle.read()) == data
@@ -0,0 +1,37 @@
+import time
+from cache import SQLiteCacheBackend
+
+def _tag_rows(backend):
+    return sorted(backend._connect().execute('SELECT tag, key FROM cache_tag').fetchall())
+
+def test_set_does_not_scan_the_tag_table(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'), max_entries=10)
+    statements = []
+    backend._connect().set_trace_callback(statements.append)
+    backend.set('page:1', {'body': b'x'}, 60, {'projects', 'project:1'})
+    assert statements
+    assert not any('NOT IN' in statement for statement in statements)
+
+def test_evicted_entries_take_their_tags_along(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    for index in range(4):
+        backend.set(f'page:{index}', index, 60 + index, {'projects', f'project:{index}'})
+    assert len(backend) == 2
+    assert {key for _, key in _tag_rows(backend)} == {'page:2', 'page:3'}
+
+def test_invalidate_removes_every_tag_of_the_dropped_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'))
+    backend.set('page:1', 1, 60, {'projects', 'project:1'})
+    backend.set('page:2', 2, 60, {'projects', 'project:2'})
+    assert backend.invalidate({'project:1'}) == 1
+    assert _tag_rows(backend) == [('project:2', 'page:2'), ('projects', 'page:2')]
+
+def test_sweep_drops_expired_entries_and_orphaned_tags(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'))
+    backend.set('page:1', 1, 60, {'projects'})
+    backend.set('page:2', 2, 60, {'projects'})
+    connection = backend._connect()
+    connection.execute('UPDATE cache_entry SET expires_at = ? WHERE key = ?', (time.time() - 1, 'page:1'))
+    connection.execute("INSERT INTO cache_tag (tag, key) VALUES ('stale', 'gone')")
+    assert backend.sweep() == 1
+    assert _tag_rows(backend) == [('projects', 'page:2')]
@@ -0,0 +1,18 @@
+from live import live_hub
+
+def test_only_project_detail_opens_a_stream(client):
+    assert b'data-live-stream' in client.get('/project/1').data
+    assert b'data-live-stream' not in client.get('/projects').data
+    assert b'data-live-stream' not in client.get('/').data
+
+def test_streams_beyond_the_cap_are_refused(app, client):
+    app.config['LIVE_MAX_STREAMS'] = 2
+    with app.app_context():
+        held = [live_hub.subscribe({'project:1'}) for _ in range(2)]
+    try:
+        response = client.get('/events/stream?projects=1')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '30'
+    finally:
+        for subscription in held:
+            live_hub.unsubscribe(subscription)
@@ -0,0 +1,35 @@
+from app import db
+from events import outbox_worker, record_event
+from models import Notification, OutboxEvent
+
+def _registration(user_id, username):
+    return OutboxEvent(kind='user.registered', payload={'user_id': user_id, 'username': username})
+
+def test_bad_event_does_not_sink_its_batch(app):
+    with app.app_context():
+        good = [_registration(1, f'user{i}') for i in range(3)]
+        # Missing 'username': the handler raises KeyError for this one only
+        bad = OutboxEvent(kind='user.registered', payload={'user_id': 1})
+        db.session.add_all(good[:2] + [bad] + good[2:])
+        db.session.commit()
+        before = Notification.query.count()
+
+        assert outbox_worker.drain_batch() == 4
+
+        assert Notification.query.count() == before + 3
+        bad = db.session.get(OutboxEvent, bad.id)
+        assert bad.processed_at is None and bad.attempts == 1 and 'KeyError' in bad.last_error
+        assert all(db.session.get(OutboxEvent, event.id).processed_at is not None for event in good)
+
+def test_backpressure_leaves_the_callers_transaction_alone(app):
+    with app.app_context():
+        backlog = outbox_worker.backlog
+        outbox_worker.backlog = outbox_worker.high_water + 1
+        try:
+            record_event('user.registered', user_id=1, username='late')
+            # Nothing was committed on the caller's behalf
+            db.session.rollback()
+            assert OutboxEvent.query.count() == 0
+            assert 'outbox_backpressure' not in db.session.info
+        finally:
+            outbox_worker.backlog = backlog
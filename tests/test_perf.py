@@ -0,0 +1,29 @@
+import logging
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from perf import PerfMonitor
+
+@pytest.fixture
+def monitored(app):
+    monitor = PerfMonitor()
+    app.config.update(PERF_ENABLED=True, PERF_SLOW_QUERY_MS=0)
+    monitor.init_app(app)
+    yield app
+    event.remove(Engine, 'before_cursor_execute', monitor._before_cursor_execute)
+    event.remove(Engine, 'after_cursor_execute', monitor._after_cursor_execute)
+
+def test_slow_query_log_omits_parameters(monitored, caplog):
+    client = monitored.test_client()
+    with caplog.at_level(logging.WARNING, logger='perf'):
+        client.post('/login', data={'email': 'admin@portfolio.com', 'password': 'admin123'})
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+    assert slow
+    assert not any('admin@portfolio.com' in message or 'params=' in message for message in slow)
+
+def test_slow_query_log_parameters_opt_in(monitored, caplog):
+    monitored.extensions['perf_monitor'].log_parameters = True
+    client = monitored.test_client()
+    with caplog.at_level(logging.WARNING, logger='perf'):
+        client.post('/login', data={'email': 'admin@portfolio.com', 'password': 'admin123'})
+    assert any('admin@portfolio.com' in record.getMessage() for record in caplog.records)
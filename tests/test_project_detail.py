@@ -0,0 +1,71 @@
+import threading
+import pytest
+from flask import template_rendered
+from sqlalchemy import event
+import routes
+from app import db
+from models import Comment, Project, User
+from read_models import PROJECT_DETAIL_QUERY_BUDGET
+
+@pytest.fixture
+def popular(app):
+    """A project commented on by many distinct users, so an N+1 would show"""
+    with app.app_context():
+        project = Project(title='Popular', description='Query budget target', is_published=True,
+                          category='web', tags='Python, Flask')
+        db.session.add(project)
+        db.session.flush()
+        db.session.execute(db.insert(User), [
+            {'username': f'reader{i}', 'email': f'reader{i}@example.com', 'password_hash': 'x'} for i in range(30)
+        ])
+        for user_id in db.session.execute(db.select(User.id).where(User.username.like('reader%'))).scalars():
+            db.session.add(Comment(content='Nice work', user_id=user_id, project_id=project.id))
+        User.query.filter_by(username='reader0').one().set_password('reader')
+        db.session.commit()
+        return project.id
+
+@pytest.fixture
+def statements(app, monkeypatch):
+    """SQL issued from load_project_detail() until the page has rendered.
+
+    Session, conditional-GET and view-counting lookups happen outside
+    that window and aren't part of the budget, and neither are the
+    background workers' statements.
+    """
+    issued = []
+    counting = {'thread': None}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if counting['thread'] == threading.get_ident():
+            issued.append(statement)
+
+    load_project_detail = routes.load_project_detail
+
+    def counted_load(*args, **kwargs):
+        counting['thread'] = threading.get_ident()
+        return load_project_detail(*args, **kwargs)
+
+    def stop_counting(sender, template, context, **extra):
+        counting['thread'] = None
+
+    monkeypatch.setattr(routes, 'load_project_detail', counted_load)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    template_rendered.connect(stop_counting, app)
+    yield issued
+    template_rendered.disconnect(stop_counting, app)
+    event.remove(engine, 'before_cursor_execute', count)
+
+def test_anonymous_project_page_within_query_budget(client, popular, statements):
+    response = client.get(f'/project/{popular}')
+    assert response.status_code == 200
+    assert 0 < len(statements) <= PROJECT_DETAIL_QUERY_BUDGET, statements
+
+def test_logged_in_project_page_within_query_budget(client, popular, statements):
+    # A regular user: the admin navbar's unread badge is a layout query, not part of the page
+    client.post('/login', data={'email': 'reader0@example.com', 'password': 'reader'})
+    response = client.get(f'/project/{popular}')
+    assert response.status_code == 200
+    assert b'Leave a Comment' in response.data and b'Nice work' in response.data
+    assert 0 < len(statements) <= PROJECT_DETAIL_QUERY_BUDGET, statements
@@ -0,0 +1,38 @@
+import threading
+import time
+from auth import MemoryRateLimitBackend, RateLimiter, SQLiteRateLimitBackend
+
+def _burst(limiter, attempts, limit):
+    allowed = []
+    barrier = threading.Barrier(attempts)
+
+    def attempt():
+        barrier.wait()
+        if limiter.hit('login-ip:203.0.113.7', limit, 300) == 0:
+            allowed.append(1)
+
+    threads = [threading.Thread(target=attempt) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(allowed)
+
+def test_concurrent_attempts_cannot_exceed_the_limit(tmp_path):
+    for backend in (MemoryRateLimitBackend(), SQLiteRateLimitBackend(str(tmp_path / 'rate_limit.sqlite'))):
+        limiter = RateLimiter()
+        limiter.backend = backend
+        assert _burst(limiter, 50, 5) == 5
+        # Rejected attempts were taken back out: only the allowed ones are counted
+        assert backend.hit('login-ip:203.0.113.7', int(time.time() // 300), 0, 300)[1] == 5
+
+def test_memory_backend_forgets_idle_keys():
+    backend = MemoryRateLimitBackend(max_keys=100)
+    for i in range(500):
+        backend.hit(f'login-email:{i}@example.com', 10, 1, 300)
+    assert len(backend) == 100
+
+    # Both windows of every key are long over by now
+    backend._swept_at -= MemoryRateLimitBackend.SWEEP_INTERVAL
+    backend.hit('login-ip:203.0.113.7', int(time.time() // 300), 1, 300)
+    assert len(backend) == 1
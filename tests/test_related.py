@@ -0,0 +1,29 @@
+import random
+import pytest
+import related
+from related import build_vectors, top_neighbors
+
+WORDS = 'python flask react django postgres redis docker api dashboard mobile search realtime graphql kafka rust'.split()
+
+def _corpus(size=300):
+    rng = random.Random(7)
+    return [(project_id, ' '.join(rng.sample(WORDS, 3)), ' '.join(rng.choice(WORDS) for _ in range(12)),
+             ', '.join(rng.sample(WORDS, 2)), rng.choice(['web', 'data', 'tools']))
+            for project_id in range(1, size + 1)]
+
+def test_sparse_product_matches_inverted_index():
+    pytest.importorskip('scipy')
+    vectors = build_vectors(_corpus())
+    targets = list(vectors)
+    assert related._top_neighbors_sparse(vectors, targets, 5) == related._top_neighbors_python(vectors, targets, 5)
+
+def test_neighbors_exclude_self_and_prefer_lower_ids_on_ties():
+    vectors = build_vectors([
+        (1, 'alpha', '', 'python', 'web'),
+        (2, 'alpha', '', 'python', 'web'),
+        (3, 'alpha', '', 'python', 'web'),
+        (4, 'beta', '', 'rust', 'data'),
+    ])
+    lists = top_neighbors(vectors, [1, 4], 2)
+    assert [project_id for project_id, _ in lists[1]] == [2, 3]
+    assert lists[4] == []
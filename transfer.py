@@ -0,0 +1,235 @@
+import json
+import logging
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from cache import response_cache
+from models import Comment, Like, Project, User
+from rollups import rebuild_rollups
+from stats import rebuild_site_stats
+from tags import refresh_tag_counts, sync_project_tags
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Columns carried by the export; like_count/comment_count are rebuilt from the rows on import
+PROJECT_COLUMNS = ('id', 'title', 'description', 'content', 'image_url', 'image_variants', 'demo_url', 'github_url',
+                   'category', 'tags', 'is_published', 'is_featured', 'created_at', 'updated_at', 'last_activity_at')
+COMMENT_COLUMNS = ('id', 'project_id', 'content', 'is_approved', 'created_at')
+LIKE_COLUMNS = ('id', 'project_id', 'created_at')
+DATETIME_COLUMNS = ('created_at', 'updated_at', 'last_activity_at')
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+class TransferError(ValueError):
+    """A malformed import line; chunks before it have already been committed"""
+
+    def __init__(self, line_number, message):
+        super().__init__(f'line {line_number}: {message}')
+        self.line_number = line_number
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def _dump(record):
+    return json.dumps(record, default=_json_default, separators=(',', ':')) + '\n'
+
+def export_projects(batch_size=500):
+    """Yield the projects with their comments and likes as NDJSON lines.
+
+    A header line comes first, then per batch of projects (in id order)
+    their "project" lines followed by the batch's "comment" and "like"
+    lines. Rows are read with keyset queries and never become ORM
+    objects, so memory stays flat however many projects there are.
+    Comments and likes name their author by username, since user ids
+    differ between databases.
+    """
+    yield _dump({'type': 'header', 'version': FORMAT_VERSION, 'exported_at': datetime.utcnow()})
+    project_table = Project.__table__
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(*(project_table.c[name] for name in PROJECT_COLUMNS))
+            .where(project_table.c.id > last_id).order_by(project_table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = [row.id for row in rows]
+        last_id = ids[-1]
+        for row in rows:
+            yield _dump({'type': 'project', **row._mapping})
+        for record_type, model, columns in (('comment', Comment, COMMENT_COLUMNS), ('like', Like, LIKE_COLUMNS)):
+            related = db.session.execute(
+                db.select(*(model.__table__.c[name] for name in columns), User.username)
+                .join(User, User.id == model.user_id)
+                .where(model.project_id.in_(ids)).order_by(model.project_id, model.id)
+                .execution_options(yield_per=batch_size)
+            )
+            for row in related:
+                yield _dump({'type': record_type, **row._mapping})
+        # Nothing was loaded into the session, but end the read transaction between batches
+        db.session.rollback()
+
+def _parse(record, columns, defaults):
+    values = {}
+    for name in columns:
+        value = record.get(name, defaults.get(name))
+        if name in DATETIME_COLUMNS and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        values[name] = value
+    return values
+
+class _Importer:
+    """Buffers parsed rows and writes them chunk by chunk"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.projects, self.comments, self.likes = [], [], []
+        self.counts = {'projects': 0, 'comments': 0, 'likes': 0, 'skipped': 0}
+        self.touched_tags = set()
+
+    def add(self, line_number, record):
+        record_type = record.get('type')
+        now = datetime.utcnow()
+        try:
+            if record_type in ('project', 'comment', 'like'):
+                for name in ('id',) if record_type == 'project' else ('id', 'project_id'):
+                    if not isinstance(record.get(name), int):
+                        raise TransferError(line_number, f'{record_type} needs an integer {name}')
+            if record_type == 'project':
+                if not record.get('title') or record.get('description') is None:
+                    raise TransferError(line_number, 'project needs a title and a description')
+                self.projects.append(_parse(record, PROJECT_COLUMNS, {
+                    'tags': '', 'is_published': False, 'is_featured': False,
+                    'created_at': now, 'updated_at': now, 'last_activity_at': now}))
+            elif record_type == 'comment':
+                self.comments.append(dict(_parse(record, COMMENT_COLUMNS, {'is_approved': True, 'created_at': now}),
+                                          username=record.get('username')))
+            elif record_type == 'like':
+                self.likes.append(dict(_parse(record, LIKE_COLUMNS, {'created_at': now}),
+                                       username=record.get('username')))
+            elif record_type == 'header':
+                if record.get('version') != FORMAT_VERSION:
+                    raise TransferError(line_number, f'unsupported format version {record.get("version")!r}')
+            else:
+                raise TransferError(line_number, f'unknown record type {record_type!r}')
+        except (TypeError, ValueError) as error:
+            if isinstance(error, TransferError):
+                raise
+            raise TransferError(line_number, str(error))
+        if max(len(self.projects), len(self.comments), len(self.likes)) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows in one transaction: projects first, so later rows can reference them"""
+        if not (self.projects or self.comments or self.likes):
+            return
+        connection = db.session.connection()
+        touched_projects = set()
+        if self.projects:
+            _upsert(connection, Project.__table__, self.projects)
+            self.touched_tags |= sync_project_tags(connection, {row['id']: row['tags'] for row in self.projects})
+            touched_projects.update(row['id'] for row in self.projects)
+            self.counts['projects'] += len(self.projects)
+        for key, model, rows in (('comments', Comment, self.comments), ('likes', Like, self.likes)):
+            if not rows:
+                continue
+            usernames = {row['username'] for row in rows}
+            user_ids = dict(connection.execute(
+                db.select(User.username, User.id).where(User.username.in_(list(usernames)))).all())
+            project_ids = set(connection.execute(
+                db.select(Project.id).where(Project.id.in_(list({row['project_id'] for row in rows})))).scalars())
+            resolved = []
+            for row in rows:
+                user_id = user_ids.get(row.pop('username'))
+                if user_id is None or row['project_id'] not in project_ids:
+                    self.counts['skipped'] += 1
+                    continue
+                resolved.append(dict(row, user_id=user_id))
+            if resolved:
+                # Likes are unique per (user, project) as well as by id, so existing ones are kept as they are
+                _upsert(connection, model.__table__, resolved, update=model is Comment)
+                touched_projects.update(row['project_id'] for row in resolved)
+                self.counts[key] += len(resolved)
+        self.projects, self.comments, self.likes = [], [], []
+        # Commits the chunk together with its counters
+        Project.reconcile_counters(touched_projects)
+
+    def finish(self):
+        self.flush()
+        connection = db.session.connection()
+        if self.touched_tags:
+            refresh_tag_counts(connection, self.touched_tags)
+        if connection.dialect.name == 'postgresql':
+            # Rows were inserted with explicit ids; move the sequences past them
+            for table in ('project', 'comment', 'like'):
+                connection.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f"coalesce((SELECT max(id) FROM \"{table}\"), 1))")
+        db.session.commit()
+        rebuild_site_stats()
+        # Imported likes and comments keep their created_at, so recount them into their buckets
+        rebuild_rollups()
+        # Core statements bypass the session's cache tags
+        response_cache.clear()
+        return self.counts
+
+def _upsert(connection, table, rows, update=True):
+    """executemany insert-or-update by primary key (insert-or-ignore with update=False)"""
+    insert = _UPSERT_DIALECTS.get(connection.dialect.name)
+    if insert is not None:
+        statement = insert(table)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=['id'], set_={name: statement.excluded[name] for name in rows[0] if name != 'id'})
+        else:
+            statement = statement.on_conflict_do_nothing()
+        connection.execute(statement, rows)
+        return
+    existing = set(connection.execute(
+        db.select(table.c.id).where(table.c.id.in_([row['id'] for row in rows]))).scalars())
+    new_rows = [row for row in rows if row['id'] not in existing]
+    if new_rows:
+        connection.execute(table.insert(), new_rows)
+    if update and existing:
+        names = [name for name in rows[0] if name != 'id']
+        statement = (table.update().where(table.c.id == db.bindparam('b_id'))
+                     .values({name: db.bindparam(f'b_{name}') for name in names}))
+        connection.execute(statement, [{f'b_{name}': value for name, value in row.items()}
+                                       for row in rows if row['id'] in existing])
+
+def import_projects(lines, batch_size=500):
+    """Upsert projects, comments and likes from NDJSON lines (str or bytes); returns counts.
+
+    Rows are matched by id, so re-importing an export is idempotent.
+    Every batch_size rows are written with executemany in their own
+    transaction, which keeps memory flat and lets a failed import be
+    re-run from the start. Comments and likes by usernames that don't
+    exist here are skipped and counted. Counters, tag counts, the
+    dashboard totals and the activity rollups are rebuilt for what was
+    imported.
+    """
+    importer = _Importer(batch_size)
+    try:
+        for line_number, line in enumerate(lines, 1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise TransferError(line_number, f'invalid JSON ({error})')
+            if not isinstance(record, dict):
+                raise TransferError(line_number, 'expected a JSON object')
+            importer.add(line_number, record)
+        counts = importer.finish()
+    except Exception:
+        # Only the chunk in progress is lost; earlier chunks stay committed
+        db.session.rollback()
+        raise
+    logger.info('Imported %(projects)d projects, %(comments)d comments, %(likes)d likes (%(skipped)d skipped)', counts)
+    return counts